@@ -6,7 +6,8 @@ from app.database.core import *
 from app.config import settings
 from app.userapp.entities import DocumentUser
 from app.collectionapp.entities import DocumentCollection
-from app.fileapp.entities import DocumentCollectionFile
+from app.fileapp.entities import Blob, DocumentCollectionFile, UploadSession
+from app.audit.entities import AuditLog
 
 # alembic config obj
 config = context.config
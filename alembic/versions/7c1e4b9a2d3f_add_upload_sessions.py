@@ -0,0 +1,53 @@
+"""add upload_sessions and widen document_files.file_size
+
+Revision ID: 7c1e4b9a2d3f
+Revises: 0545f9092060
+Create Date: 2026-10-17 10:12:31.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4b9a2d3f'
+down_revision: Union[str, Sequence[str], None] = '0545f9092060'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('upload_sessions',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('filename', sa.String(length=100), nullable=False),
+    sa.Column('total_size', sa.BigInteger(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['document_collection.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['user_id'], ['document_users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_upload_sessions_expires_at'), 'upload_sessions', ['expires_at'], unique=False)
+    op.create_index(op.f('ix_upload_sessions_user_id'), 'upload_sessions', ['user_id'], unique=False)
+    op.alter_column('document_files', 'file_size',
+               existing_type=sa.Integer(),
+               type_=sa.BigInteger(),
+               existing_nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.alter_column('document_files', 'file_size',
+               existing_type=sa.BigInteger(),
+               type_=sa.Integer(),
+               existing_nullable=False)
+    op.drop_index(op.f('ix_upload_sessions_user_id'), table_name='upload_sessions')
+    op.drop_index(op.f('ix_upload_sessions_expires_at'), table_name='upload_sessions')
+    op.drop_table('upload_sessions')
@@ -0,0 +1,43 @@
+"""add audit_log range partitioned by month
+
+Revision ID: 9f3b2c7d1e84
+Revises: e41a7c2f9b05
+Create Date: 2026-10-17 19:48:31.402517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f3b2c7d1e84'
+down_revision: Union[str, Sequence[str], None] = 'e41a7c2f9b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        CREATE TABLE audit_log (
+            request_id VARCHAR(32) NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL,
+            user_id INTEGER,
+            method VARCHAR(10) NOT NULL,
+            path VARCHAR(255) NOT NULL,
+            status_code SMALLINT NOT NULL,
+            duration_ms DOUBLE PRECISION NOT NULL,
+            bytes_in BIGINT NOT NULL,
+            bytes_out BIGINT NOT NULL,
+            PRIMARY KEY (request_id, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+    """)
+    # catches rows for months whose partition was not created ahead of time
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+    op.execute("CREATE INDEX ix_audit_log_user_id_occurred_at ON audit_log (user_id, occurred_at)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TABLE audit_log")
@@ -0,0 +1,81 @@
+"""add blobs with refcount and drop document_files.file_path
+
+Revision ID: b3d58e0f6a17
+Revises: 7c1e4b9a2d3f
+Create Date: 2026-10-17 14:02:47.881203
+
+"""
+import os
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils import calculate_checksum
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d58e0f6a17'
+down_revision: Union[str, Sequence[str], None] = '7c1e4b9a2d3f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('blobs',
+    sa.Column('checksum', sa.String(length=64), nullable=False),
+    sa.Column('storage_path', sa.String(length=255), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=False),
+    sa.Column('mime_type', sa.String(length=100), nullable=False),
+    sa.Column('refcount', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('checksum')
+    )
+
+    conn = op.get_bind()
+
+    # rows written before checksums were mandatory: hash what is still on disk, deactivate the rest
+    legacy = conn.execute(sa.text(
+        "SELECT id, file_path FROM document_files WHERE checksum IS NULL"
+    )).all()
+    for row_id, file_path in legacy:
+        if os.path.exists(file_path):
+            conn.execute(
+                sa.text("UPDATE document_files SET checksum = :checksum WHERE id = :id"),
+                {"checksum": calculate_checksum(file_path), "id": row_id},
+            )
+        else:
+            conn.execute(
+                sa.text("UPDATE document_files SET is_active = false WHERE id = :id"),
+                {"id": row_id},
+            )
+
+    conn.execute(sa.text("""
+        INSERT INTO blobs (checksum, storage_path, size, mime_type, refcount)
+        SELECT checksum,
+               MIN(file_path),
+               MAX(file_size),
+               MIN(mime_type),
+               COUNT(*) FILTER (WHERE is_active)
+        FROM document_files
+        WHERE checksum IS NOT NULL
+        GROUP BY checksum
+    """))
+
+    op.create_foreign_key('fk_document_files_checksum_blobs', 'document_files', 'blobs', ['checksum'], ['checksum'])
+    op.drop_column('document_files', 'file_path')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('document_files', sa.Column('file_path', sa.String(length=255), nullable=True))
+    op.execute(
+        "UPDATE document_files SET file_path = blobs.storage_path "
+        "FROM blobs WHERE blobs.checksum = document_files.checksum"
+    )
+    op.execute("UPDATE document_files SET file_path = '' WHERE file_path IS NULL")
+    op.alter_column('document_files', 'file_path', existing_type=sa.String(length=255), nullable=False)
+    op.drop_constraint('fk_document_files_checksum_blobs', 'document_files', type_='foreignkey')
+    op.drop_table('blobs')
@@ -0,0 +1,43 @@
+"""make legacy blob storage paths relative to upload_dir
+
+Revision ID: c7e2a5d91f40
+Revises: 9f3b2c7d1e84
+Create Date: 2026-10-17 21:12:05.518734
+
+"""
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.config import settings
+from app.fileapp.storage_layout import legacy_key
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a5d91f40'
+down_revision: Union[str, Sequence[str], None] = '9f3b2c7d1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_UPDATE = sa.text("UPDATE blobs SET storage_path = :key WHERE checksum = :checksum")
+
+
+def upgrade() -> None:
+    """Upgrade data."""
+    # document_files.file_path was copied verbatim into blobs, e.g. uploads/<sha>.pdf,
+    # which the storage backend would resolve to uploads/uploads/<sha>.pdf
+    conn = op.get_bind()
+    for checksum, storage_path in conn.execute(sa.text("SELECT checksum, storage_path FROM blobs")).all():
+        key = legacy_key(storage_path, settings.upload_dir)
+        if key != storage_path:
+            conn.execute(_UPDATE, {"key": key, "checksum": checksum})
+
+
+def downgrade() -> None:
+    """Downgrade data."""
+    conn = op.get_bind()
+    for checksum, storage_path in conn.execute(sa.text("SELECT checksum, storage_path FROM blobs")).all():
+        if not Path(storage_path).is_absolute():
+            conn.execute(_UPDATE, {"key": (settings.upload_dir / storage_path).as_posix(), "checksum": checksum})
@@ -0,0 +1,32 @@
+"""add blob codec and stored_size for compression at rest
+
+Revision ID: e41a7c2f9b05
+Revises: b3d58e0f6a17
+Create Date: 2026-10-17 16:40:12.093114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e41a7c2f9b05'
+down_revision: Union[str, Sequence[str], None] = 'b3d58e0f6a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('blobs', sa.Column('codec', sa.String(length=16), server_default='identity', nullable=False))
+    op.add_column('blobs', sa.Column('stored_size', sa.BigInteger(), nullable=True))
+    op.execute("UPDATE blobs SET stored_size = size")
+    op.alter_column('blobs', 'stored_size', existing_type=sa.BigInteger(), nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('blobs', 'stored_size')
+    op.drop_column('blobs', 'codec')
@@ -0,0 +1,35 @@
+"""
+Create the upcoming monthly audit_log partitions and drop the ones past retention.
+
+    python -m app.audit.commands.audit_partitions [--months-ahead 2] [--retention-months 6]
+
+Run it from cron, e.g. daily; dropping a month is a single DROP TABLE. The app also creates
+the current and next month's partitions when it starts with AUDIT_LOG_ENABLED=true.
+"""
+import argparse
+from datetime import date
+
+from app.audit.partitions import add_months, drop_partitions_before, ensure_partitions, month_start
+from app.config import settings
+from app.database.core import SessionLocal
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=2, help="future months to create partitions for")
+    parser.add_argument("--retention-months", type=int, default=settings.audit_log_retention_months,
+                        help="whole months kept before the current one")
+    args = parser.parse_args()
+
+    today = date.today()
+    cutoff = add_months(month_start(today), -args.retention_months)
+    with SessionLocal() as db:
+        created = ensure_partitions(db, today, args.months_ahead)
+        dropped = drop_partitions_before(db, cutoff)
+
+    print(f"partitions ensured: {', '.join(created) or 'none'}")
+    print(f"partitions dropped: {', '.join(dropped) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, Float, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database.core import Base
+
+
+class AuditLog(Base):
+    """
+    one row per request, written in batches by AuditLogWriter.
+    on postgres the table is range partitioned by month on occurred_at (see app.audit.partitions),
+    which is why occurred_at is part of the primary key
+    """
+    __tablename__ = "audit_log"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+    request_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    user_id: Mapped[int | None] = mapped_column(Integer, nullable=True)  # no fk: rows outlive users
+    method: Mapped[str] = mapped_column(String(10), nullable=False)
+    path: Mapped[str] = mapped_column(String(255), nullable=False)
+    status_code: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False)
+    bytes_in: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    bytes_out: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f"<AuditLog(request_id={self.request_id}, path={self.path}, status_code={self.status_code})>"
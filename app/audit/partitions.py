@@ -0,0 +1,115 @@
+from datetime import date
+from typing import List, cast
+
+from sqlalchemy import CursorResult, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.audit.entities import AuditLog
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+TABLE = AuditLog.__tablename__
+DEFAULT_PARTITION = f"{TABLE}_default"
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{TABLE}_{month:%Y_%m}"
+
+
+def _is_partitioned(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _create_partition(db: Session, month: date) -> None:
+    """
+    create the partition for `month`. rows of that month already caught by the default
+    partition would make a plain CREATE fail, so they are moved over with the default detached;
+    the table stays locked against writers until the commit
+    """
+    name = partition_name(month)
+    bounds = {"start": month, "end": add_months(month, 1)}
+    create = text(
+        f"CREATE TABLE {name} PARTITION OF {TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+    in_default = db.scalar(text(
+        f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE occurred_at >= :start AND occurred_at < :end)"
+    ), bounds)
+    if not in_default:
+        db.execute(create)
+        return
+
+    db.execute(text(f"ALTER TABLE {TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    db.execute(create)
+    moved = cast(CursorResult, db.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE occurred_at >= :start AND occurred_at < :end "
+        f"RETURNING *) INSERT INTO {TABLE} SELECT * FROM moved"
+    ), bounds)).rowcount
+    db.execute(text(f"ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+    logger.info("audit log rows moved out of the default partition", partition=name, rows=moved)
+
+
+def ensure_partitions(db: Session, today: date, months_ahead: int = 1) -> List[str]:
+    """
+    create the monthly partitions from this month to `months_ahead` months out.
+    rows outside them land in the default partition, so a missed run never loses rows; a
+    later run moves them into their month. each month is its own transaction and a failure is
+    logged and skipped, so one bad month does not hold up the others.
+    no-op on databases without partitioning
+    """
+    if not _is_partitioned(db):
+        return []
+
+    created = []
+    current = month_start(today)
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        name = partition_name(month)
+        try:
+            if db.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is None:
+                _create_partition(db, month)
+            db.commit()
+        except SQLAlchemyError:
+            db.rollback()
+            logger.error("audit log partition could not be created", partition=name, exc_info=True)
+            continue
+        created.append(name)
+    return created
+
+
+def drop_partitions_before(db: Session, cutoff: date) -> List[str]:
+    """
+    drop the monthly partitions that end on or before the month of `cutoff`; this is the
+    whole of retention, there is no row-by-row delete
+    """
+    if not _is_partitioned(db):
+        return []
+
+    children = db.scalars(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": TABLE}).all()
+
+    oldest_kept = partition_name(month_start(cutoff))
+    expired = sorted(
+        name for name in children
+        if name != DEFAULT_PARTITION and name < oldest_kept
+    )
+    for name in expired:
+        db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+        logger.info("audit log partition dropped", partition=name)
+    db.commit()
+    return expired
@@ -0,0 +1,163 @@
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import AsyncIterator, Callable, Deque, Optional
+
+import anyio
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.audit.entities import AuditLog
+from app.audit.partitions import ensure_partitions
+from app.config import settings
+from app.database.core import SessionLocal
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AuditEntry:
+    request_id: str
+    occurred_at: datetime
+    user_id: Optional[int]
+    method: str
+    path: str
+    status_code: int
+    duration_ms: float
+    bytes_in: int
+    bytes_out: int
+
+
+@dataclass(frozen=True)
+class AuditWriterStats:
+    buffered: int
+    written: int
+    dropped: int
+    failed: int
+
+
+class AuditLogWriter:
+    """
+    collects audit entries in a bounded in-memory buffer and writes them in batches of
+    multi-row inserts. `record` never touches the database and never blocks: once the buffer
+    is full further entries are dropped and counted, as is a batch whose insert fails
+    """
+
+    def __init__(
+            self,
+            batch_size: int,
+            max_buffer: int,
+            session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.batch_size = batch_size
+        self.max_buffer = max_buffer
+        self.session_factory = session_factory
+        self._buffer: Deque[AuditEntry] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._written = 0
+        self._dropped = 0
+        self._failed = 0
+
+    def record(self, entry: AuditEntry) -> None:
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                self._dropped += 1
+                return
+            self._buffer.append(entry)
+
+    def __take_batch(self) -> list[AuditEntry]:
+        with self._lock:
+            return [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+
+    def flush(self) -> int:
+        """
+        write everything buffered so far; returns the number of rows written
+        """
+        written = 0
+        with self._flush_lock:
+            while batch := self.__take_batch():
+                try:
+                    with self.session_factory() as db:
+                        db.execute(insert(AuditLog), [asdict(entry) for entry in batch])
+                        db.commit()
+                except SQLAlchemyError:
+                    logger.error("audit log batch insert failed", rows=len(batch), exc_info=True)
+                    with self._lock:
+                        self._failed += len(batch)
+                    continue
+                written += len(batch)
+
+        with self._lock:
+            self._written += written
+        return written
+
+    def prepare(self) -> None:
+        """
+        make sure this and next month's partitions exist
+        """
+        try:
+            with self.session_factory() as db:
+                ensure_partitions(db, datetime.now().date())
+        except SQLAlchemyError:
+            logger.error("audit log partitions could not be created", exc_info=True)
+
+    async def run(self, interval: float) -> None:
+        """
+        flush every `interval` seconds, and re-check the partitions once a day so a long
+        running process keeps creating the upcoming months
+        """
+        prepared_on = datetime.now().date()
+        while True:
+            await anyio.sleep(interval)
+            await anyio.to_thread.run_sync(self.flush)
+            if datetime.now().date() != prepared_on:
+                prepared_on = datetime.now().date()
+                await anyio.to_thread.run_sync(self.prepare)
+
+    def stats(self) -> AuditWriterStats:
+        with self._lock:
+            return AuditWriterStats(
+                buffered=len(self._buffer),
+                written=self._written,
+                dropped=self._dropped,
+                failed=self._failed,
+            )
+
+
+@lru_cache
+def get_audit_writer() -> AuditLogWriter:
+    return AuditLogWriter(
+        batch_size=settings.audit_log_batch_size,
+        max_buffer=settings.audit_log_max_buffer,
+    )
+
+
+@asynccontextmanager
+async def audit_log_lifespan() -> AsyncIterator[None]:
+    """
+    flush the audit buffer every AUDIT_LOG_FLUSH_SECONDS while the app runs, and once more
+    on shutdown so buffered entries are not lost
+    """
+    if not settings.audit_log_enabled:
+        yield
+        return
+
+    writer = get_audit_writer()
+    await anyio.to_thread.run_sync(writer.prepare)
+
+    try:
+        async with anyio.create_task_group() as task_group:
+            task_group.start_soon(writer.run, settings.audit_log_flush_seconds)
+            try:
+                yield
+            finally:
+                task_group.cancel_scope.cancel()
+    finally:
+        await anyio.to_thread.run_sync(writer.flush)
+        logger.info("audit log flushed on shutdown", **asdict(writer.stats()))
@@ -0,0 +1,98 @@
+import resource
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from argon2 import PasswordHasher
+
+from app.auth.hashing import HASH_LEN, SALT_LEN
+
+# owasp floor for argon2id memory
+MIN_MEMORY_COST = 19 * 1024
+MAX_TIME_COST = 10
+
+_SAMPLE_PASSWORD = "calibration-password"
+
+
+@dataclass(frozen=True)
+class CalibrationResult:
+    time_cost: int
+    memory_cost: int
+    parallelism: int
+    median_ms: float
+    peak_rss_mib: float
+
+
+def measure_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    """
+    median wall time of one hash with these parameters on this machine
+    """
+    hasher = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=HASH_LEN,
+        salt_len=SALT_LEN,
+    )
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(_SAMPLE_PASSWORD)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _peak_rss_mib() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def calibrate(budget_ms: float, memory_cost: int, parallelism: int, samples: int = 5) -> CalibrationResult:
+    """
+    strongest parameters whose median hash time fits `budget_ms`: memory is kept at
+    `memory_cost` unless even time_cost=1 is over budget, in which case it is halved down to
+    the owasp floor; then time_cost is raised while the next step still fits
+    """
+    time_cost = 1
+    median = measure_ms(time_cost, memory_cost, parallelism, samples)
+    while median > budget_ms and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        median = measure_ms(time_cost, memory_cost, parallelism, samples)
+
+    while time_cost < MAX_TIME_COST:
+        next_median = measure_ms(time_cost + 1, memory_cost, parallelism, samples)
+        if next_median > budget_ms:
+            break
+        time_cost, median = time_cost + 1, next_median
+
+    return CalibrationResult(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        median_ms=median,
+        peak_rss_mib=_peak_rss_mib(),
+    )
+
+
+def env_lines(result: CalibrationResult) -> dict[str, str]:
+    return {
+        "ARGON2_TIME_COST": str(result.time_cost),
+        "ARGON2_MEMORY_COST": str(result.memory_cost),
+        "ARGON2_PARALLELISM": str(result.parallelism),
+    }
+
+
+def write_env(path: Path, result: CalibrationResult) -> None:
+    """
+    set the ARGON2_* lines of an env file, keeping everything else as it is
+    """
+    values = env_lines(result)
+    lines = path.read_text().splitlines() if path.exists() else []
+    written = set()
+    for i, line in enumerate(lines):
+        key = line.split("=", 1)[0].strip()
+        if key in values:
+            lines[i] = f"{key}={values[key]}"
+            written.add(key)
+    lines.extend(f"{key}={value}" for key, value in values.items() if key not in written)
+    path.write_text("\n".join(lines) + "\n")
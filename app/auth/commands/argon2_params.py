@@ -0,0 +1,68 @@
+"""
+Tune the argon2 cost for this hardware and see which cost stored password hashes use.
+
+    python -m app.auth.commands.argon2_params calibrate --budget-ms 50 [--write .env]
+    python -m app.auth.commands.argon2_params report
+
+Hashes made with other parameters are upgraded when their user next logs in.
+"""
+import argparse
+from pathlib import Path
+
+from app.auth.calibration import calibrate, env_lines, write_env
+from app.auth.hashing import current_parameter_version
+from app.config import settings
+from app.database.core import SessionLocal
+from app.userapp.service import UserService
+
+
+def _calibrate(args: argparse.Namespace) -> None:
+    result = calibrate(
+        budget_ms=args.budget_ms,
+        memory_cost=args.memory_mib * 1024,
+        parallelism=args.parallelism,
+        samples=args.samples,
+    )
+    print(f"median {result.median_ms:.1f} ms per hash, peak rss {result.peak_rss_mib:.0f} MiB")
+    for key, value in env_lines(result).items():
+        print(f"{key}={value}")
+    if args.write:
+        write_env(args.write, result)
+        print(f"written to {args.write}")
+
+
+def _report(_: argparse.Namespace) -> None:
+    with SessionLocal() as db:
+        distribution = UserService(db).password_parameter_distribution()
+
+    current = current_parameter_version()
+    total = sum(distribution.values()) or 1
+    print("time_cost  memory_kib  parallelism  users  share")
+    for version, count in distribution.most_common():
+        label = "not argon2" if version is None else "  ".join(str(part).rjust(9) for part in version)
+        marker = "  (current)" if version == current else ""
+        print(f"{label}  {count:5d}  {count / total:5.1%}{marker}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    calibrate_parser = commands.add_parser("calibrate", help="measure and suggest parameters")
+    calibrate_parser.add_argument("--budget-ms", type=float, default=50.0, help="target median hash time")
+    calibrate_parser.add_argument("--memory-mib", type=int, default=settings.argon2_memory_cost // 1024,
+                                  help="memory to start from, halved if even one pass is over budget")
+    calibrate_parser.add_argument("--parallelism", type=int, default=settings.argon2_parallelism)
+    calibrate_parser.add_argument("--samples", type=int, default=5, help="hashes timed per candidate")
+    calibrate_parser.add_argument("--write", type=Path, help="env file to write the ARGON2_* settings into")
+    calibrate_parser.set_defaults(run=_calibrate)
+
+    report_parser = commands.add_parser("report", help="parameter versions across document_users")
+    report_parser.set_defaults(run=_report)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,40 +1,53 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Annotated
 
 from app.database.core import DbSession
-from app.userapp.entities import DocumentUser
 from app.auth.service import AuthenticationService
+from app.auth.token_cache import verified_token_user
+from app.auth.user_cache import AuthenticatedUser, load_user
 from app.logger import get_logger
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='/api/users/login')
 logger = get_logger(__name__)
 
 
-def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: DbSession) -> DocumentUser:
+def get_current_user_id(request: Request, token: Annotated[str, Depends(oauth2_scheme)]) -> int:
     """
-    Get current user from JWT token
+    Get the user id from the JWT claims alone, without loading the user.
+    Reuses the verification the logging middleware already did for this request
+    :param request:
     :param token:
-    :param db:
     :return:
     """
-
-    try:
+    verified, user_id = verified_token_user(request, token)
+    if not verified:
         user_id = AuthenticationService.get_user_from_token(
             token,
             token_type='access'
         )
 
-        if not user_id:
-            logger.warning('Invalid or expired token')
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail='Invalid/expired token',
-                headers={'WWW-Authenticate': 'Bearer'}
-            )
+    if not user_id:
+        logger.warning('Invalid or expired token')
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail='Invalid/expired token',
+            headers={'WWW-Authenticate': 'Bearer'}
+        )
+    return user_id
+
+
+def get_current_user(user_id: Annotated[int, Depends(get_current_user_id)], db: DbSession) -> AuthenticatedUser:
+    """
+    Get current user from JWT token, served from the user cache when possible
+    :param user_id:
+    :param db:
+    :return:
+    """
 
-        user = db.get(DocumentUser, user_id)
+    try:
+        user = load_user(db, user_id)
         if not user:
             logger.warning(f'User-{user_id} not found')
             raise HTTPException(
@@ -51,4 +64,5 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: DbSessio
         ) from err
 
 
-CurrentUser = Annotated[DocumentUser, Depends(get_current_user)]
\ No newline at end of file
+CurrentUser = Annotated[AuthenticatedUser, Depends(get_current_user)]
+CurrentUserId = Annotated[int, Depends(get_current_user_id)]
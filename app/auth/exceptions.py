@@ -7,3 +7,13 @@ class AuthenticationError(AppException):
     """Custom exception for authentication errors."""
     def __init__(self, message: str = "Authentication failed"):
         super().__init__(message, status_code=status.HTTP_401_UNAUTHORIZED)
+
+
+class PasswordHashingBusyException(AppException):
+    """Password hashing pool is saturated."""
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(
+            message,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            headers={"Retry-After": str(retry_after)}
+        )
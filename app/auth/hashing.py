@@ -1,21 +1,52 @@
-from argon2 import PasswordHasher
+from collections import Counter
+from typing import Iterable, Optional, Tuple
+
+from argon2 import PasswordHasher, extract_parameters
 from argon2.exceptions import HashingError, InvalidHashError, VerifyMismatchError
 
-from app.auth.exceptions import AuthenticationError
+from app.config import settings
+
+from app.auth.exceptions import AuthenticationError, PasswordHashingBusyException
+from app.auth.hashing_pool import get_hashing_pool
 from app.logger import get_logger
 
 logger = get_logger(__name__)
 
+HASH_LEN = 32
+SALT_LEN = 16
+
+# (time_cost, memory_cost KiB, parallelism)
+ParameterVersion = Tuple[int, int, int]
+
 _pwd_hasher = PasswordHasher(
-    time_cost=3,
-    memory_cost=65536,
-    parallelism=2,
-    hash_len=32,
-    salt_len=16,
+    time_cost=settings.argon2_time_cost,
+    memory_cost=settings.argon2_memory_cost,
+    parallelism=settings.argon2_parallelism,
+    hash_len=HASH_LEN,
+    salt_len=SALT_LEN,
 )
 
 
-def hash_pwd(pwd_str: str) -> str:
+def current_parameter_version() -> ParameterVersion:
+    return _pwd_hasher.time_cost, _pwd_hasher.memory_cost, _pwd_hasher.parallelism
+
+
+def parameter_version(pwd_hashed: str) -> Optional[ParameterVersion]:
+    """
+    the argon2 cost a stored hash was made with, None when it is not an argon2 hash
+    """
+    try:
+        params = extract_parameters(pwd_hashed)
+    except InvalidHashError:
+        return None
+    return params.time_cost, params.memory_cost, params.parallelism
+
+
+def parameter_distribution(hashes: Iterable[str]) -> Counter:
+    return Counter(parameter_version(pwd_hashed) for pwd_hashed in hashes)
+
+
+async def hash_pwd(pwd_str: str) -> str:
     """
     Hash a password using argon2.
     :param pwd_str: Plain text password
@@ -27,13 +58,13 @@ def hash_pwd(pwd_str: str) -> str:
         raise ValueError('Password cannot be empty')
 
     try:
-        return _pwd_hasher.hash(pwd_str)
+        return await get_hashing_pool().run_async(_pwd_hasher.hash, pwd_str)
     except HashingError as err:
         logger.error(f'Password hashing failed: {err}')
         raise AuthenticationError(f'Password hashing failed: {err}') from err
 
 
-def verify_pwd(pwd_hashed: str, pwd_str: str) -> tuple[bool, bool]:
+async def verify_pwd(pwd_hashed: str, pwd_str: str) -> tuple[bool, bool]:
     """
     Verify password and check if rehash is needed.
     :param pwd_hashed: Hashed password from database
@@ -41,11 +72,13 @@ def verify_pwd(pwd_hashed: str, pwd_str: str) -> tuple[bool, bool]:
     :return: (is_valid, needs_rehash)
     """
     try:
-        if _pwd_hasher.verify(pwd_hashed, pwd_str):
+        if await get_hashing_pool().run_async(_pwd_hasher.verify, pwd_hashed, pwd_str):
             need_rehash = _pwd_hasher.check_needs_rehash(pwd_hashed)
             if need_rehash:
                 logger.info('Password needs rehash')
             return True, need_rehash
+    except PasswordHashingBusyException:
+        raise
     except VerifyMismatchError as ver_err:
         logger.warning(f'Verify mismatch error: {ver_err}')
     except InvalidHashError as invalid_err:
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, TypeVar
+
+from app.auth.exceptions import PasswordHashingBusyException
+from app.config import settings
+from app.logger import get_logger
+from app.metrics import (
+    PASSWORD_HASH_QUEUED,
+    PASSWORD_HASH_REJECTED,
+    PASSWORD_HASH_RUNNING,
+    PASSWORD_HASH_SECONDS,
+    PASSWORD_HASH_WAIT_SECONDS,
+)
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True)
+class HashingPoolStats:
+    workers: int
+    queue_size: int
+    queued: int
+    running: int
+    completed: int
+    rejected: int
+    wait_seconds_total: float
+    run_seconds_total: float
+
+
+class PasswordHashingPool:
+    """
+    dedicated, size-limited pool for argon2 work. argon2 releases the GIL, so threads hash in
+    parallel, and the worker count caps both the cores and the memory_cost-sized buffers in
+    use at once. at most `queue_size` calls wait behind busy workers; anything beyond that is
+    rejected immediately instead of piling up request threads behind a login burst.
+    request handlers await `run_async`, so no thread waits on the result while argon2 runs
+    """
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argon2")
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def submit(self, func: Callable[..., T], *args) -> Future[T]:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            PASSWORD_HASH_REJECTED.inc()
+            logger.warning("password hashing pool saturated", workers=self.workers, queue_size=self.queue_size)
+            raise PasswordHashingBusyException("too many concurrent sign-ins, retry shortly")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+        PASSWORD_HASH_QUEUED.inc()
+
+        def task() -> T:
+            started = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                self._wait_total += started - submitted
+            PASSWORD_HASH_QUEUED.dec()
+            PASSWORD_HASH_RUNNING.inc()
+            PASSWORD_HASH_WAIT_SECONDS.observe(started - submitted)
+            try:
+                return func(*args)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_total += elapsed
+                PASSWORD_HASH_RUNNING.dec()
+                PASSWORD_HASH_SECONDS.observe(elapsed)
+
+        future = self._executor.submit(task)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def run(self, func: Callable[..., T], *args) -> T:
+        return self.submit(func, *args).result()
+
+    async def run_async(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self) -> HashingPoolStats:
+        with self._lock:
+            return HashingPoolStats(
+                workers=self.workers,
+                queue_size=self.queue_size,
+                queued=self._queued,
+                running=self._running,
+                completed=self._completed,
+                rejected=self._rejected,
+                wait_seconds_total=self._wait_total,
+                run_seconds_total=self._run_total,
+            )
+
+
+@lru_cache
+def get_hashing_pool() -> PasswordHashingPool:
+    return PasswordHashingPool(settings.password_hash_workers, settings.password_hash_queue_size)
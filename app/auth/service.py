@@ -4,8 +4,9 @@ from typing import Optional
 
 from app.config import settings
 from app.database.core import DbSession
-from app.userapp.entities import DocumentUser
 from app.auth.exceptions import AuthenticationError
+from app.auth.token_cache import get_token_cache
+from app.auth.user_cache import load_user
 from app.logger import get_logger
 
 logger = get_logger(__name__)
@@ -91,6 +92,13 @@ class AuthenticationService:
             logger.warning('Expected token type is required')
             return None
 
+        cached = get_token_cache().get(token)
+        if cached is not None:
+            if cached.get('type') != expected_type:
+                logger.warning(f'Token type mismatch: expected {expected_type}, got {cached.get("type")}')
+                return None
+            return cached
+
         try:
             payload = jwt.decode(
                 token,
@@ -107,6 +115,7 @@ class AuthenticationService:
                 return None
 
             logger.info('Token verified successfully')
+            get_token_cache().put(token, payload)
             return payload
         except JWTError as jwt_err:
             logger.error(f"Token verification failed: {jwt_err}")
@@ -159,7 +168,7 @@ class AuthenticationService:
             logger.error('Invalid refresh token')
             raise AuthenticationError('Invalid refresh token')
 
-        user = db.get(DocumentUser, user_id)
+        user = load_user(db, user_id)
         if not user:
             raise AuthenticationError(f'User-{user_id} not found')
 
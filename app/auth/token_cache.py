@@ -0,0 +1,73 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from starlette.requests import Request
+
+from app.config import settings
+
+_VERIFIED_TOKEN_STATE = "verified_access_token"
+
+
+class TokenCache:
+    """
+    LRU of recently verified tokens and their claims. an entry lives until the token's own
+    exp, so a cached token is never accepted for longer than verifying it again would allow
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            payload, expires = entry
+            if expires <= time.time():
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return dict(payload)
+
+    def put(self, token: str, payload: dict) -> None:
+        expires = payload.get("exp")
+        if self.max_entries <= 0 or not isinstance(expires, (int, float)):
+            return
+        with self._lock:
+            self._entries[token] = (dict(payload), float(expires))
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def get_token_cache() -> TokenCache:
+    return TokenCache(settings.token_cache_max_entries)
+
+
+def remember_verified_token(request: Request, token: str, user_id: Optional[int]) -> None:
+    """
+    keep the outcome of verifying the request's access token on the request state,
+    so dependencies further down do not verify it again
+    """
+    setattr(request.state, _VERIFIED_TOKEN_STATE, (token, user_id))
+
+
+def verified_token_user(request: Request, token: str) -> Tuple[bool, Optional[int]]:
+    """
+    (True, user id or None if it was rejected) when this exact token was already
+    verified for the request, else (False, None)
+    """
+    verified = getattr(request.state, _VERIFIED_TOKEN_STATE, None)
+    if verified is None or verified[0] != token:
+        return False, None
+    return True, verified[1]
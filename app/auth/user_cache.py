@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.userapp.entities import DocumentUser
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """
+    what requests need to know about the caller; detached from any session, so it can be
+    shared across requests, and without the password hash
+    """
+    id: int
+    name: str
+    email: str
+
+
+class UserCache:
+    """
+    per-process LRU of authenticated users with a ttl. changes made through the ORM in this
+    process invalidate their entry right away; the ttl bounds how long other workers keep it
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, Tuple[AuthenticatedUser, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, user_id: int) -> Optional[AuthenticatedUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            user, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return user
+
+    def put(self, user: AuthenticatedUser) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache
+def get_user_cache() -> UserCache:
+    return UserCache(settings.user_cache_ttl_seconds, settings.user_cache_max_entries)
+
+
+def load_user(db: Session, user_id: int) -> Optional[AuthenticatedUser]:
+    """
+    the user from the cache, or from the database on a miss
+    """
+    cache = get_user_cache()
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+
+    entity = db.get(DocumentUser, user_id)
+    if entity is None:
+        return None
+    user = AuthenticatedUser(id=entity.id, name=entity.name, email=entity.email)
+    cache.put(user)
+    return user
+
+
+@event.listens_for(DocumentUser, "after_update")
+@event.listens_for(DocumentUser, "after_delete")
+def _invalidate_cached_user(mapper, connection, target: DocumentUser) -> None:
+    # bulk update()/delete() statements bypass these hooks and rely on the ttl
+    get_user_cache().invalidate(target.id)
+    logger.debug("cached user invalidated", user_id=target.id)
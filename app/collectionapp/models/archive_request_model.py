@@ -0,0 +1,5 @@
+from pydantic import BaseModel, Field
+
+
+class CollectionArchiveRequestModel(BaseModel):
+    file_ids: list[int] = Field(..., min_length=1, max_length=1000, description="Files of the collection to archive")
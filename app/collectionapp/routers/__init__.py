@@ -5,6 +5,7 @@ from app.collectionapp.routers.get_collection import router as collection_router
 from app.collectionapp.routers.delete_collection import router as delete_router
 from app.collectionapp.routers.update_collection import router as update_router
 from app.collectionapp.routers.get_all_collections import router as get_all_collections
+from app.collectionapp.routers.archive_collection import router as archive_router
 
 router = APIRouter(
     prefix="/api/collection",
@@ -14,4 +15,5 @@ router.include_router(create_col_router)
 router.include_router(collection_router)
 router.include_router(delete_router)
 router.include_router(update_router)
-router.include_router(get_all_collections)
\ No newline at end of file
+router.include_router(get_all_collections)
+router.include_router(archive_router)
\ No newline at end of file
@@ -0,0 +1,72 @@
+from typing import Optional
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from app.auth.dependencies import CurrentUserId
+from app.collectionapp.models.archive_request_model import CollectionArchiveRequestModel
+from app.fileapp.archive import stream_zip
+from app.fileapp.dependencies import DependsFileDownloadService
+from app.fileapp.responses import content_disposition
+from app.fileapp.services.download_service import FileDownloadService
+from app.logger import get_logger
+
+router = APIRouter()
+
+logger = get_logger(__name__)
+
+
+def _archive_response(
+    document_id: int,
+    user_id: int,
+    file_download_service: FileDownloadService,
+    file_ids: Optional[list[int]] = None,
+) -> StreamingResponse:
+    title, downloads = file_download_service.get_collection_downloads(
+        user_id=user_id,
+        collection_id=document_id,
+        file_ids=file_ids
+    )
+    logger.info("collection archive started", collection_id=document_id, files=len(downloads))
+    return StreamingResponse(
+        stream_zip(downloads, file_download_service.storage),
+        media_type="application/zip",
+        headers={"Content-Disposition": content_disposition(f"{title}.zip")}
+    )
+
+
+@router.get(
+    "/{document_id}/archive",
+    summary='Download a collection as ZIP',
+    description='Stream a ZIP of every file in the collection, built on the fly',
+    responses={
+        200: {'description': 'Archive streamed', 'content': {'application/zip': {}}},
+        404: {'description': 'Collection or file not found'},
+        500: {'description': 'Internal server error'}
+    }
+)
+def archive_collection(
+    document_id: int,
+    current_user_id: CurrentUserId,
+    file_download_service: DependsFileDownloadService
+) -> StreamingResponse:
+    return _archive_response(document_id, current_user_id, file_download_service)
+
+
+@router.post(
+    "/{document_id}/archive",
+    summary='Download selected files of a collection as ZIP',
+    description='Stream a ZIP of the given files of the collection, built on the fly',
+    responses={
+        200: {'description': 'Archive streamed', 'content': {'application/zip': {}}},
+        404: {'description': 'Collection or file not found'},
+        500: {'description': 'Internal server error'}
+    }
+)
+def archive_collection_files(
+    document_id: int,
+    payload: CollectionArchiveRequestModel,
+    current_user_id: CurrentUserId,
+    file_download_service: DependsFileDownloadService
+) -> StreamingResponse:
+    return _archive_response(document_id, current_user_id, file_download_service, payload.file_ids)
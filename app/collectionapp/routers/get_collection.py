@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.auth.dependencies import CurrentUser
+from app.auth.dependencies import CurrentUserId
 from app.collectionapp.dependencies import DependsDocumentService
 from app.collectionapp.models.read_document_model import DocumentResponseModel
 
@@ -21,8 +21,8 @@ router = APIRouter()
         500: {'description': 'Internal server error'}
     }
 )
-def get_collection(document_id: int, current_user: CurrentUser, document_service: DependsDocumentService) -> DocumentResponseModel:
-    task = document_service.fetch_document_by_id(document_id=document_id, user_id=current_user.id)
+def get_collection(document_id: int, current_user_id: CurrentUserId, document_service: DependsDocumentService) -> DocumentResponseModel:
+    task = document_service.fetch_document_by_id(document_id=document_id, user_id=current_user_id)
     return DocumentResponseModel(
         message='Collection retrieved successfully',
         data=task
@@ -1,10 +1,22 @@
-from typing import Set
+from typing import List, Literal, Optional, Set
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import BaseModel, Field
 from pathlib import Path
 from datetime import timedelta
 
+class RouteLogPolicy(BaseModel):
+    """
+    logging overrides for paths under `path_prefix`; unset fields keep the global LOG_* values
+    """
+    path_prefix: str
+    sample_rate: Optional[float] = Field(default=None, ge=0, le=1)
+    capture_errors: Optional[bool] = None
+    max_payload_bytes: Optional[int] = Field(default=None, ge=0)
+    header_allowlist: Optional[List[str]] = None
+    metadata_only: Optional[bool] = None
+
+
 class Settings(BaseSettings):
     # Logging
     log_level: str = Field()
@@ -16,6 +28,32 @@ class Settings(BaseSettings):
     def masking_keys_set(self) -> Set[str]:
         return set(s.strip() for s in self.masking_keys.split(",") if s.strip())
 
+    log_payload_max_bytes: int = Field(default=16384)  # larger bodies are not logged
+    log_sample_rate: float = Field(default=1.0, ge=0, le=1)  # share of requests whose payloads are logged
+    log_capture_errors: bool = Field(default=True)  # log payloads of 4xx/5xx even when not sampled
+    log_header_allowlist: str = Field(default="")  # empty logs every header
+    log_metadata_only: bool = Field(default=False)  # never log headers or payloads
+    log_route_policies: List[RouteLogPolicy] = Field(default_factory=list)
+    # records are written by a background thread; a full queue drops them or blocks the caller
+    log_queue_size: int = Field(default=10_000)
+    log_queue_full_policy: Literal["drop", "block"] = Field(default="drop")
+    log_queue_block_seconds: float = Field(default=1.0)  # longest a blocked caller waits before dropping
+
+    # per-request audit rows, buffered in memory and inserted in batches
+    audit_log_enabled: bool = Field(default=False)
+    audit_log_batch_size: int = Field(default=500)
+    audit_log_flush_seconds: float = Field(default=2.0)
+    audit_log_max_buffer: int = Field(default=20_000)  # entries beyond this are dropped and counted
+    audit_log_retention_months: int = Field(default=6)
+
+    # prometheus /metrics; set PROMETHEUS_MULTIPROC_DIR when running several workers
+    metrics_enabled: bool = Field(default=True)
+
+    @property
+    def log_header_allowlist_set(self) -> Optional[Set[str]]:
+        headers = set(s.strip().lower() for s in self.log_header_allowlist.split(",") if s.strip())
+        return headers or None
+
     # Security
     secret_key: str = Field()
     algorithm: str = Field(default="HS256")
@@ -30,6 +68,21 @@ class Settings(BaseSettings):
     def refresh_token_expire(self) -> timedelta:
         return timedelta(days=self.refresh_token_expire_days)
 
+    # argon2 cost; changing it rehashes users on their next login (see app.auth.commands.argon2_params)
+    argon2_time_cost: int = Field(default=3)
+    argon2_memory_cost: int = Field(default=65536)  # KiB
+    argon2_parallelism: int = Field(default=2)
+
+    # argon2 runs on its own pool; callers beyond workers + queue get a 503
+    password_hash_workers: int = Field(default=2)
+    password_hash_queue_size: int = Field(default=16)
+
+    # authenticated users cached per process; a ttl of 0 disables the cache
+    user_cache_ttl_seconds: int = Field(default=60)
+    user_cache_max_entries: int = Field(default=10_000)
+    # verified jwt claims kept until the token's exp; 0 disables
+    token_cache_max_entries: int = Field(default=4096)
+
     # Database
     db_user: str = Field()
     db_pwd: str = Field()
@@ -45,8 +98,45 @@ class Settings(BaseSettings):
     register_limit_per_hour: int = Field()
 
     # file uploads
+    storage_backend: Literal["local", "memory"] = Field(default="local")
     upload_dir: Path = Field()
+    upload_temp_dir: Path | None = Field(default=None)
     allowed_file_types: str = Field()
+    upload_io_threads: int = Field(default=8)
+    upload_max_form_fields: int = Field(default=16)  # non-file parts a streamed upload may carry
+    download_chunk_size: int = Field(default=1024 * 1024)
+
+    # per-worker in-memory cache of small blobs in front of downloads; 0 disables it
+    blob_cache_max_bytes: int = Field(default=64 * 1024 * 1024)
+    blob_cache_max_object_bytes: int = Field(default=256 * 1024)
+
+    # reverse-proxy download offload: the proxy serves the bytes, workers only authorize
+    download_offload: Literal["none", "x-accel-redirect", "x-sendfile"] = Field(default="none")
+    download_offload_prefix: str = Field(default="/protected-blobs/")  # nginx internal location mapped to upload_dir
+    immutable_blob_urls: bool = Field(default=False)  # serve GET /api/files/blobs/{sha256} with Cache-Control: immutable
+
+    # hmac-signed download/upload urls, validated without touching the database
+    signed_url_ttl_seconds: int = Field(default=300)
+    signed_url_max_ttl_seconds: int = Field(default=3600)
+
+    # compression at rest for compressible mime types; zstd needs the zstandard package
+    storage_compression: Literal["none", "gzip", "zstd"] = Field(default="none")
+    storage_compression_level: int | None = Field(default=None)
+
+    @property
+    def upload_temp_path(self) -> Path:
+        # keep it on the same filesystem as upload_dir so moving a finished upload is a rename
+        return self.upload_temp_dir or self.upload_dir / "tmp"
+
+    # resumable upload sessions
+    upload_session_ttl_hours: int = Field(default=24)
+    upload_part_max_size: int = Field(default=64 * 1024 * 1024)
+    upload_session_max_parts: int = Field(default=10000)
+    upload_session_purge_seconds: int = Field(default=3600)  # 0 leaves purging to session creation
+
+    @property
+    def upload_session_ttl(self) -> timedelta:
+        return timedelta(hours=self.upload_session_ttl_hours)
 
     @property
     def allowed_extensions_set(self) -> Set[str]:
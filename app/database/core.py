@@ -5,9 +5,11 @@ from sqlalchemy import create_engine, DateTime, func
 from sqlalchemy.orm import sessionmaker, declarative_base, Session, Mapped, mapped_column
 
 from app.config import settings
+from app.database.pool import TimedQueuePool, instrument_pool
 
 
-engine = create_engine(settings.db_url)
+engine = create_engine(settings.db_url, poolclass=TimedQueuePool)
+instrument_pool(engine)
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
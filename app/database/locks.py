@@ -0,0 +1,49 @@
+import hashlib
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+LOCAL_LOCK_STRIPES = 256
+
+_local_locks = [threading.Lock() for _ in range(LOCAL_LOCK_STRIPES)]
+
+
+def advisory_lock_key(name: str) -> int:
+    """
+    stable signed 64-bit key for pg_advisory_xact_lock, identical across processes and nodes
+    """
+    digest = hashlib.sha256(name.encode()).digest()
+    return int.from_bytes(digest[:8], "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(db: Session, name: str) -> Iterator[None]:
+    """
+    serialize work on `name` for the duration of the block.
+
+    on postgres this takes a transaction-scoped advisory lock, so it covers every thread,
+    worker and node sharing the database, and is released by the commit or rollback the
+    block must end with. other backends fall back to a striped in-process lock held until
+    the block exits, which only coordinates threads of this process
+    """
+    key = advisory_lock_key(name)
+
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": key})
+        try:
+            yield
+        except BaseException:
+            if db.in_transaction():
+                db.rollback()
+            raise
+        return
+
+    with _local_locks[key % LOCAL_LOCK_STRIPES]:
+        yield
@@ -0,0 +1,50 @@
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import PoolProxiedConnection, QueuePool
+
+from app.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_WAIT_SECONDS
+
+
+def instrument_pool(engine: Engine) -> None:
+    """
+    report checked out and overflow connections from the pool's checkout/checkin events,
+    which fire exactly once per checkout and return. overflow is derived from the count of
+    checked out connections, as the pool only closes a returned overflow connection after
+    the checkin event
+    """
+    lock = threading.Lock()
+    checked_out = 0
+
+    def record(delta: int) -> None:
+        nonlocal checked_out
+        with lock:
+            checked_out += delta
+            in_use = checked_out
+        pool_size = getattr(engine.pool, "size", lambda: in_use)()
+        DB_POOL_CHECKED_OUT.inc(delta)
+        DB_POOL_OVERFLOW.set(max(in_use - pool_size, 0))
+
+    @event.listens_for(engine.pool, "checkout")
+    def on_checkout(*_) -> None:
+        record(1)
+
+    @event.listens_for(engine.pool, "checkin")
+    def on_checkin(*_) -> None:
+        record(-1)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    queue pool that times every checkout, waiting for a free connection and connecting
+    included. the pool events only fire once a connection is in hand, so the wait is timed
+    around connect itself; sessions still take their connection lazily on first use
+    """
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+        connection = super().connect()
+        DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        return connection
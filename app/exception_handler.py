@@ -20,7 +20,8 @@ class AppExceptionHandler:
         )
         return JSONResponse(
             status_code=exc.status_code,
-            content={"detail": exc.message}
+            content={"detail": exc.message},
+            headers=exc.headers
         )
 
     @staticmethod
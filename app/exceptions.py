@@ -1,9 +1,12 @@
+from typing import Optional
+
 from fastapi import status
 
 
 class AppException(Exception):
     """Base exception for all domain-specific application errors."""
-    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST):
+    def __init__(self, message: str, status_code: int = status.HTTP_400_BAD_REQUEST, headers: Optional[dict] = None):
         self.message: str = message
         self.status_code: int = status_code
+        self.headers: Optional[dict] = headers
         super().__init__(self.message)
\ No newline at end of file
@@ -0,0 +1,85 @@
+import io
+import time
+import zipfile
+from pathlib import PurePosixPath
+from typing import Iterable, Iterator, List, Sequence
+
+from app.fileapp.compression import CODEC_IDENTITY, decompress_chunks, is_compressible
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.value_objects import BlobDownload
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    write-only, unseekable target for ZipFile. zipfile then writes data descriptors instead of
+    seeking back, and whatever it wrote is handed on and dropped after every entry write
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._pending.extend(data)
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = bytes(self._pending)
+        self._pending.clear()
+        return data
+
+
+def archive_names(titles: Sequence[str]) -> List[str]:
+    """
+    entry names for the titles, suffixed ` (n)` where titles repeat so no entry shadows another
+    """
+    seen = set()
+    names = []
+    for title in titles:
+        name = PurePosixPath(title.replace("\\", "/")).name or "file"
+        stem, suffix = PurePosixPath(name).stem, PurePosixPath(name).suffix
+        candidate, n = name, 1
+        while candidate in seen:
+            candidate = f"{stem} ({n}){suffix}"
+            n += 1
+        seen.add(candidate)
+        names.append(candidate)
+    return names
+
+
+def _content(download: BlobDownload, storage: StorageBackend) -> Iterator[bytes]:
+    chunks = storage.open_range(download.storage_path)
+    if download.codec != CODEC_IDENTITY:
+        return decompress_chunks(chunks, download.codec)
+    return chunks
+
+
+def stream_zip(downloads: Iterable[BlobDownload], storage: StorageBackend) -> Iterator[bytes]:
+    """
+    zip of the blobs built while it is sent: each entry is read from storage chunk by chunk
+    and every compressed piece is yielded as soon as zipfile emits it, so memory stays flat
+    whatever the archive size. types that are compressed already are stored, not deflated
+    """
+    downloads = list(downloads)
+    sink = _ChunkSink()
+    date_time = time.localtime()[:6]
+
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for download, name in zip(downloads, archive_names([d.title for d in downloads])):
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED if is_compressible(download.mime_type) else zipfile.ZIP_STORED
+            info.file_size = download.file_size  # lets zipfile decide up front whether the entry needs zip64
+
+            with archive.open(info, mode="w") as entry:
+                for chunk in _content(download, storage):
+                    entry.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+
+    if data := sink.drain():
+        yield data
@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.metrics import BLOB_CACHE_BYTES, BLOB_CACHE_EVICTIONS, BLOB_CACHE_LOOKUPS
+
+CacheKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class BlobCacheStats:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size: int
+
+
+class BlobCache:
+    """
+    byte-budgeted LRU of small blobs, as stored (i.e. still encoded), per worker process.
+    keyed by checksum and codec: the content behind a checksum never changes, but a blob
+    revived under another compression setting is stored differently.
+    lookups, evictions and size are exported as metrics as well as kept for stats()
+    """
+
+    def __init__(self, max_bytes: int, max_object_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_object_bytes = min(max_object_bytes, max_bytes)
+        self._entries: "OrderedDict[CacheKey, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def fits(self, size: int) -> bool:
+        return 0 <= size <= self.max_object_bytes
+
+    def get(self, checksum: str, codec: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._entries.get((checksum, codec))
+            if data is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end((checksum, codec))
+                self.hits += 1
+        BLOB_CACHE_LOOKUPS.labels("miss" if data is None else "hit").inc()
+        return data
+
+    def put(self, checksum: str, codec: str, data: bytes) -> bool:
+        if not self.fits(len(data)):
+            return False
+        evictions = 0
+        with self._lock:
+            size_before = self._size
+            previous = self._entries.pop((checksum, codec), None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[(checksum, codec)] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                evictions += 1
+            self.evictions += evictions
+            size_delta = self._size - size_before
+        BLOB_CACHE_EVICTIONS.inc(evictions)
+        BLOB_CACHE_BYTES.inc(size_delta)
+        return True
+
+    def discard(self, checksum: str) -> None:
+        released = 0
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == checksum]:
+                released += len(self._entries.pop(key))
+            self._size -= released
+        BLOB_CACHE_BYTES.dec(released)
+
+    def stats(self) -> BlobCacheStats:
+        with self._lock:
+            return BlobCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                size=self._size,
+            )
+
+
+@lru_cache
+def get_blob_cache() -> BlobCache:
+    """
+    the worker's cache, sized by BLOB_CACHE_MAX_BYTES / BLOB_CACHE_MAX_OBJECT_BYTES;
+    a zero budget disables it
+    """
+    return BlobCache(settings.blob_cache_max_bytes, settings.blob_cache_max_object_bytes)
@@ -0,0 +1,26 @@
+"""
+Move blobs written under the old flat `UPLOAD_DIR/{checksum}{ext}` layout into the sharded
+`UPLOAD_DIR/ab/cd/{checksum}{ext}` layout, storing keys relative to `UPLOAD_DIR`. Runs against the live database; uploads, downloads
+and deletes keep working while it goes, and it can be stopped and rerun at any point.
+
+    python -m app.fileapp.commands.relocate_blobs --batch-size 500 --pause 0.2
+"""
+import argparse
+
+from app.database.core import SessionLocal
+from app.fileapp.services.relocation_service import BlobRelocationService
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500, help="blobs read per query")
+    parser.add_argument("--pause", type=float, default=0.0, help="seconds to sleep between batches")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        relocated = BlobRelocationService(db).relocate_all(batch_size=args.batch_size, pause=args.pause)
+    print(f"relocated {relocated} blobs")
+
+
+if __name__ == "__main__":
+    main()
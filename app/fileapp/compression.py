@@ -0,0 +1,113 @@
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, Optional
+
+from app.fileapp.ingest import INGEST_CHUNK_SIZE
+
+try:
+    import zstandard  # type: ignore[import-not-found]
+except ImportError:  # listed in requirements.txt, checked at startup by resolve_codec
+    zstandard = None
+
+# codec names double as http content-coding tokens
+CODEC_IDENTITY = "identity"
+CODEC_GZIP = "gzip"
+CODEC_ZSTD = "zstd"
+
+# formats that are already compressed (images, pdf streams, zip-based office files) gain nothing
+COMPRESSIBLE_MIME_TYPES = {
+    "application/json",
+    "application/xml",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/rtf",
+    "application/msword",
+    "application/vnd.ms-excel",
+    "application/vnd.ms-powerpoint",
+    "image/svg+xml",
+    "image/bmp",
+    "image/tiff",
+}
+
+
+def is_compressible(mime_type: str) -> bool:
+    return mime_type.startswith("text/") or mime_type in COMPRESSIBLE_MIME_TYPES
+
+
+@lru_cache
+def resolve_codec(configured: str) -> str:
+    """
+    codec to store new compressible blobs with. resolved at startup, so a configured zstd
+    without the zstandard package stops the app instead of silently storing gzip
+    """
+    if configured == "none":
+        return CODEC_IDENTITY
+    if configured == CODEC_ZSTD and zstandard is None:
+        raise RuntimeError("STORAGE_COMPRESSION=zstd requires the zstandard package")
+    return configured
+
+
+def _compressor(codec: str, level: Optional[int]):
+    if codec == CODEC_GZIP:
+        return zlib.compressobj(6 if level is None else level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd compression requires the zstandard package")
+        return zstandard.ZstdCompressor(level=3 if level is None else level).compressobj()
+    raise ValueError(f"unknown codec {codec}")
+
+
+def _decompressor(codec: str):
+    if codec == CODEC_GZIP:
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd decompression requires the zstandard package")
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"unknown codec {codec}")
+
+
+def compress_file(source: Path, target: Path, codec: str, level: Optional[int] = None) -> int:
+    """
+    stream `source` through `codec` into `target`, returns the compressed size
+    """
+    compressor = _compressor(codec, level)
+    written = 0
+    with open(source, "rb") as src, open(target, "wb") as out:
+        for chunk in iter(lambda: src.read(INGEST_CHUNK_SIZE), b""):
+            data = compressor.compress(chunk)
+            out.write(data)
+            written += len(data)
+        tail = compressor.flush()
+        out.write(tail)
+        written += len(tail)
+    return written
+
+
+def decompress_chunks(chunks: Iterator[bytes], codec: str) -> Iterator[bytes]:
+    decompressor = _decompressor(codec)
+    for chunk in chunks:
+        data = decompressor.decompress(chunk)
+        if data:
+            yield data
+    if codec == CODEC_GZIP:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def accepts_encoding(accept_encoding: str, codec: str) -> bool:
+    """
+    whether an Accept-Encoding header allows `codec`; explicit q=0 refuses it, `*` allows it
+    """
+    wildcard = False
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        refused = params.replace(" ", "").lower() in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        if token == codec:
+            return not refused
+        if token == "*":
+            wildcard = not refused
+    return wildcard
@@ -5,6 +5,9 @@ from app.database.core import DbSession
 from app.fileapp.services.base_service import FileService
 from app.fileapp.services.download_service import FileDownloadService
 from app.fileapp.services.upload_service import FileUploadService
+from app.fileapp.services.upload_session_service import UploadSessionService
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.storage.factory import get_storage_backend
 
 
 def get_file_service(db: DbSession) -> FileService:
@@ -16,7 +19,12 @@ def get_file_upload_service(db: DbSession) -> FileUploadService:
 def get_file_download_service(db: DbSession) -> FileDownloadService:
     return FileDownloadService(db=db)
 
+def get_upload_session_service(db: DbSession) -> UploadSessionService:
+    return UploadSessionService(db=db, upload_service=FileUploadService(db=db))
+
 
 DependsFileService = Annotated[FileService, Depends(get_file_service)]
 DependsFileUploadService = Annotated[FileUploadService, Depends(get_file_upload_service)]
-DependsFileDownloadService = Annotated[FileDownloadService, Depends(get_file_download_service)]
\ No newline at end of file
+DependsFileDownloadService = Annotated[FileDownloadService, Depends(get_file_download_service)]
+DependsUploadSessionService = Annotated[UploadSessionService, Depends(get_upload_session_service)]
+DependsStorageBackend = Annotated[StorageBackend, Depends(get_storage_backend)]
@@ -1,25 +1,70 @@
-from sqlalchemy import Integer, String, Boolean, ForeignKey
+from datetime import datetime
+
+from sqlalchemy import BigInteger, Integer, String, Boolean, DateTime, ForeignKey
 from sqlalchemy.orm import relationship, mapped_column, Mapped
 
 from app.database.core import Base, TimestampMixin
 
 
+def _stored_size_default(context) -> int:
+    return context.get_current_parameters()["size"]
+
+
+class Blob(TimestampMixin, Base):
+    """
+    one row per stored content; refcount is the number of active file records pointing at it.
+    rows are kept at refcount 0 (physical file removed) so soft-deleted records stay valid.
+    size and checksum describe the original content, stored_size the bytes after `codec`
+    """
+    __tablename__ = "blobs"
+
+    checksum: Mapped[str] = mapped_column(String(64), primary_key=True)
+    storage_path: Mapped[str] = mapped_column(String(255), nullable=False)  # storage backend key
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    codec: Mapped[str] = mapped_column(String(16), default="identity", server_default="identity", nullable=False)
+    stored_size: Mapped[int] = mapped_column(BigInteger, default=_stored_size_default, nullable=False)
+    mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
+    refcount: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+    def __repr__(self):
+        return f"<Blob(checksum={self.checksum[:8]}, refcount={self.refcount})>"
+
+
 class DocumentCollectionFile(TimestampMixin, Base):
     __tablename__ = "document_files"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(100), nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    file_path: Mapped[str] = mapped_column(String(255), nullable=False)
-    file_size: Mapped[int] = mapped_column(Integer, nullable=False)
+    file_size: Mapped[int] = mapped_column(BigInteger, nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
     extension: Mapped[str] = mapped_column(String(10), nullable=False)
-    checksum: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
+    checksum: Mapped[str | None] = mapped_column(String(64), ForeignKey("blobs.checksum"), nullable=True, index=True)
     document_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("document_collection.id", ondelete="SET NULL"), nullable=True, index=True)
     user_id: Mapped[int | None] = mapped_column(Integer, ForeignKey('document_users.id', ondelete="SET NULL"), nullable=True, index=True)
 
     owner = relationship('DocumentUser', back_populates='files')
     document = relationship("DocumentCollection", back_populates="files")
+    blob = relationship("Blob", lazy="joined")
+
+    @property
+    def storage_path(self) -> str | None:
+        return self.blob.storage_path if self.blob else None
+
+    def __repr__(self):
+        return f"<DocumentCollectionFile(id={self.id}, is_active={self.is_active}, document_id={self.document_id}, user_id={self.user_id})>"
+
+
+class UploadSession(TimestampMixin, Base):
+    __tablename__ = "upload_sessions"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    filename: Mapped[str] = mapped_column(String(100), nullable=False)
+    total_size: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    status: Mapped[str] = mapped_column(String(20), default="open", nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    document_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("document_collection.id", ondelete="SET NULL"), nullable=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('document_users.id', ondelete="CASCADE"), nullable=False, index=True)
 
     def __repr__(self):
-        return f"<DocumentCollectionFile(id={self.id}, is_active={self.is_active}, document_id={self.document_id}, user_id={self.user_id})>"
\ No newline at end of file
+        return f"<UploadSession(id={self.id}, status={self.status}, user_id={self.user_id})>"
@@ -48,4 +48,46 @@ class FileProcessingException(FileUploadException):
     file processing failed
     """
     def __init__(self, message: str):
-        super().__init__(message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        super().__init__(message, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+class MultipartStreamException(FileUploadException):
+    """
+    streamed multipart body is malformed or missing the file part
+    """
+    def __init__(self, message: str):
+        super().__init__(message)
+
+class UploadSessionNotFoundException(FileUploadException):
+    """
+    upload session does not exist or belongs to another user
+    """
+    def __init__(self, message: str):
+        super().__init__(message, status_code=status.HTTP_404_NOT_FOUND)
+
+class UploadSessionExpiredException(FileUploadException):
+    """
+    upload session passed its expiry
+    """
+    def __init__(self, message: str):
+        super().__init__(message, status_code=status.HTTP_410_GONE)
+
+class UploadSessionStateException(FileUploadException):
+    """
+    upload session cannot be completed in its current state
+    """
+    def __init__(self, message: str):
+        super().__init__(message, status_code=status.HTTP_409_CONFLICT)
+
+class UploadPartTooLargeException(FileUploadException):
+    """
+    upload part exceeds the configured part size
+    """
+    def __init__(self, message: str):
+        super().__init__(message, status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+
+class SignedUrlException(FileOperationException):
+    """
+    signed url is malformed, tampered with, expired or used for the wrong purpose
+    """
+    def __init__(self, message: str):
+        super().__init__(message, status_code=status.HTTP_403_FORBIDDEN)
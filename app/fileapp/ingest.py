@@ -0,0 +1,55 @@
+import hashlib
+from pathlib import Path
+from typing import BinaryIO
+
+import magic
+
+from app.fileapp.value_objects import IngestResult
+
+INGEST_CHUNK_SIZE = 1024 * 1024
+MIME_SNIFF_SIZE = 64 * 1024
+
+
+class FileIngest:
+    """
+    writes chunks to `path` while computing sha256, byte count and keeping the
+    leading bytes for MIME sniffing, so every byte is written once and never read back
+    """
+    def __init__(self, path: Path, sniff_size: int = MIME_SNIFF_SIZE):
+        self.path = path
+        self._sniff_size = sniff_size
+        self._sha256 = hashlib.sha256()
+        self._head = bytearray()
+        self._size = 0
+        self._buffer = open(path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if len(self._head) < self._sniff_size:
+            self._head.extend(chunk[: self._sniff_size - len(self._head)])
+        self._sha256.update(chunk)
+        self._size += len(chunk)
+        self._buffer.write(chunk)
+
+    def finish(self) -> IngestResult:
+        self._buffer.close()
+        return IngestResult(
+            path=self.path,
+            checksum=self._sha256.hexdigest(),
+            file_size=self._size,
+            mime_type=magic.from_buffer(bytes(self._head), mime=True),
+        )
+
+    def abort(self) -> None:
+        self._buffer.close()
+        self.path.unlink(missing_ok=True)
+
+
+def ingest_stream(source: BinaryIO, path: Path, chunk_size: int = INGEST_CHUNK_SIZE) -> IngestResult:
+    ingest = FileIngest(path)
+    try:
+        for chunk in iter(lambda: source.read(chunk_size), b""):
+            ingest.write(chunk)
+    except BaseException:
+        ingest.abort()
+        raise
+    return ingest.finish()
@@ -36,4 +36,50 @@ class FileReadResponse(ApiResponse):
 
 class FileListResponse(BaseModel):
     message: str
-    data: list[FileRead]
\ No newline at end of file
+    data: list[FileRead]
+
+class FileChecksumCreate(FileBase):
+    checksum: str = Field(..., pattern=r"^[0-9a-f]{64}$", description="sha256 of the file content, lowercase hex")
+    file_size: int = Field(..., ge=0, description="file size in bytes")
+    document_id: Optional[int] = Field(None, description="document id to link file with")
+
+class FileChecksumResponse(ApiResponse):
+    upload_required: bool
+    data: Optional[FileRead] = None
+
+class SignedUrlCreate(BaseModel):
+    ttl_seconds: Optional[int] = Field(default=None, ge=1, description="lifetime in seconds, capped by the server")
+
+class SignedUploadUrlCreate(SignedUrlCreate):
+    document_id: Optional[int] = Field(default=None, description="document id uploads through the url are linked with")
+
+class SignedUrlRead(BaseModel):
+    url: str
+    expires_at: datetime
+
+class SignedUrlResponse(ApiResponse):
+    data: SignedUrlRead
+
+class UploadSessionCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=100, description="name of the file being uploaded")
+    document_id: Optional[int] = Field(None, description="document id to link file with")
+    total_size: Optional[int] = Field(None, ge=0, description="expected size in bytes, checked on completion")
+
+class UploadSessionRead(BaseModel):
+    id: str
+    filename: str
+    document_id: Optional[int]
+    total_size: Optional[int]
+    status: str
+    expires_at: datetime
+    received_parts: list[int]
+
+class UploadSessionResponse(ApiResponse):
+    data: UploadSessionRead
+
+class UploadPartRead(BaseModel):
+    part_number: int
+    size: int
+
+class UploadPartResponse(ApiResponse):
+    data: UploadPartRead
@@ -0,0 +1,152 @@
+import os
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+from app.config import settings
+from app.fileapp.exceptions import MultipartStreamException
+from app.fileapp.ingest import FileIngest
+from app.fileapp.upload_io import drain_stream, run_upload_io
+from app.fileapp.value_objects import StreamedUpload
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+FILE_FIELD_NAME = "file"
+MAX_FIELD_SIZE = 64 * 1024
+
+
+class MultipartUploadStream:
+    """
+    incremental multipart/form-data parser that writes the `file` part straight into a
+    FileIngest inside `temp_dir`, instead of starlette's SpooledTemporaryFile.
+    keeping the temp file on the same filesystem as the final blob makes the later move a rename.
+    form fields are buffered in memory, so both their size and their number are capped
+    """
+    def __init__(self, content_type: str, temp_dir: Path):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise MultipartStreamException("missing multipart boundary")
+
+        self.temp_dir = temp_dir
+        self.max_fields = settings.upload_max_form_fields
+        self.fields: dict[str, str] = {}
+        self._field_count = 0
+        self._filename: Optional[str] = None
+        self._ingest: Optional[FileIngest] = None
+        self._finished = False
+
+        self._header_name = b""
+        self._header_value = b""
+        self._disposition = b""
+        self._field_name: Optional[str] = None
+        self._field_data = bytearray()
+        self._in_file_part = False
+
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self.__on_part_begin,
+            "on_part_data": self.__on_part_data,
+            "on_part_end": self.__on_part_end,
+            "on_header_field": self.__on_header_field,
+            "on_header_value": self.__on_header_value,
+            "on_header_end": self.__on_header_end,
+            "on_headers_finished": self.__on_headers_finished,
+            "on_end": self.__on_end,
+        })
+
+    def __on_part_begin(self) -> None:
+        self._disposition = b""
+        self._field_name = None
+        self._field_data = bytearray()
+        self._in_file_part = False
+
+    def __on_header_field(self, data: bytes, start: int, end: int) -> None:
+        self._header_name += data[start:end]
+
+    def __on_header_value(self, data: bytes, start: int, end: int) -> None:
+        self._header_value += data[start:end]
+
+    def __on_header_end(self) -> None:
+        if self._header_name.lower() == b"content-disposition":
+            self._disposition = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def __on_headers_finished(self) -> None:
+        _, options = parse_options_header(self._disposition)
+        if b"name" not in options:
+            raise MultipartStreamException("multipart part is missing a field name")
+        self._field_name = options[b"name"].decode("utf-8", errors="replace")
+
+        if b"filename" not in options:
+            self._field_count += 1
+            if self._field_count > self.max_fields:
+                raise MultipartStreamException(f"more than {self.max_fields} form fields")
+            return
+
+        if self._field_name != FILE_FIELD_NAME:
+            raise MultipartStreamException(f"unexpected file field '{self._field_name}'")
+        if self._ingest is not None:
+            raise MultipartStreamException("only one file per upload is allowed")
+
+        self._filename = options[b"filename"].decode("utf-8", errors="replace")
+        self._ingest = FileIngest(self.temp_dir / f"temp_{os.urandom(8).hex()}")
+        self._in_file_part = True
+
+    def __on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._in_file_part and self._ingest is not None:
+            self._ingest.write(data[start:end])
+            return
+
+        if len(self._field_data) + (end - start) > MAX_FIELD_SIZE:
+            raise MultipartStreamException(f"form field '{self._field_name}' is too large")
+        self._field_data.extend(data[start:end])
+
+    def __on_part_end(self) -> None:
+        if not self._in_file_part and self._field_name is not None:
+            self.fields[self._field_name] = self._field_data.decode("utf-8", errors="replace")
+
+    def __on_end(self) -> None:
+        self._finished = True
+
+    def feed(self, chunk: bytes) -> None:
+        try:
+            self._parser.write(chunk)
+        except MultipartParseError as parse_err:
+            raise MultipartStreamException(f"malformed multipart body: {parse_err}") from parse_err
+
+    def finish(self) -> StreamedUpload:
+        self._parser.finalize()
+        if not self._finished:
+            raise MultipartStreamException("incomplete multipart body")
+        if self._ingest is None or not self._filename:
+            raise MultipartStreamException("no file provided")
+
+        return StreamedUpload(
+            filename=self._filename,
+            ingested=self._ingest.finish(),
+            fields=self.fields,
+        )
+
+    def abort(self) -> None:
+        if self._ingest is not None:
+            self._ingest.abort()
+
+
+async def receive_multipart_upload(stream: AsyncIterator[bytes], content_type: str, temp_dir: Path) -> StreamedUpload:
+    """
+    drain a multipart request body into `temp_dir`. the socket is read on the event loop;
+    received bytes are batched up to INGEST_CHUNK_SIZE and only then handed to the upload io
+    limiter for parsing, hashing and writing
+    """
+    upload_stream = MultipartUploadStream(content_type, temp_dir)
+    try:
+        await drain_stream(stream, upload_stream.feed)
+        return await run_upload_io(upload_stream.finish)
+    except BaseException:
+        upload_stream.abort()
+        logger.warning("streamed upload aborted", temp_dir=str(temp_dir))
+        raise
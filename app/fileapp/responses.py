@@ -0,0 +1,67 @@
+from typing import Optional
+from urllib.parse import quote
+
+from starlette.responses import FileResponse
+from starlette.types import Receive, Scope, Send
+
+from app.config import settings
+from app.fileapp.compression import CODEC_IDENTITY
+
+PATHSEND_EXTENSION = "http.response.pathsend"
+
+
+class BlobFileResponse(FileResponse):
+    """
+    FileResponse that hands the file to the server via the http.response.pathsend extension
+    when the server offers it (the server then streams it, e.g. with sendfile, and no bytes pass
+    through python), and otherwise reads it in DOWNLOAD_CHUNK_SIZE pieces rather than 64KiB so
+    each thread hop and middleware pass carries more bytes. range requests keep starlette's handling
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.chunk_size = settings.download_chunk_size
+        self._pathsend = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self._pathsend = PATHSEND_EXTENSION in scope.get("extensions", {})
+        await super().__call__(scope, receive, send)
+
+    async def _handle_simple(self, send: Send, send_header_only: bool) -> None:
+        if not self._pathsend or send_header_only:
+            await super()._handle_simple(send, send_header_only)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": PATHSEND_EXTENSION, "path": str(self.path)})
+
+
+def blob_etag(checksum: str, codec: str) -> str:
+    """
+    strong etag from the content hash. encoded representations differ byte-wise from the
+    identity one, so they get their own tag
+    """
+    if codec == CODEC_IDENTITY:
+        return f'"{checksum}"'
+    return f'"{checksum}-{codec}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    If-None-Match uses weak comparison, so W/ prefixes are ignored
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+def content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
@@ -2,11 +2,13 @@ from fastapi import APIRouter, Depends, Query, status
 from typing import Optional
 
 
-from app.auth.dependencies import CurrentUser
+from app.auth.dependencies import CurrentUser, CurrentUserId
 from app.fileapp.model import FileReadResponse, FileListResponse
 from app.fileapp.services.base_service import FileService
 from app.fileapp.routers.upload_file import router as upload_router
 from app.fileapp.routers.download_file import router as download_router
+from app.fileapp.routers.upload_session import router as upload_session_router
+from app.fileapp.routers.signed_url import router as signed_url_router
 from app.fileapp.dependencies import get_file_service
 
 router = APIRouter(
@@ -15,6 +17,8 @@ router = APIRouter(
 )
 router.include_router(upload_router)
 router.include_router(download_router)
+router.include_router(upload_session_router)
+router.include_router(signed_url_router)
 
 
 @router.get(
@@ -31,12 +35,12 @@ router.include_router(download_router)
     }
 )
 def get_all_files(
-        current_user: CurrentUser,
+        current_user_id: CurrentUserId,
         document_id: Optional[int] = Query(None, description="filter by document id"),
         file_service: FileService = Depends(get_file_service)
 ) -> FileListResponse:
     files = file_service.fetch_files(
-        user_id=current_user.id,
+        user_id=current_user_id,
         document_id=document_id
     )
     message = "files retrieval success" if files else "no files to retrieve"
@@ -59,11 +63,11 @@ def get_all_files(
 )
 def get_file(
         file_id: int,
-        current_user: CurrentUser,
+        current_user_id: CurrentUserId,
         file_service: FileService = Depends(get_file_service)
 ) -> FileReadResponse:
     file = file_service.fetch_file_by_id(
-        user_id=current_user.id,
+        user_id=current_user_id,
         file_id=file_id
     )
     return FileReadResponse(message="file retrieval successful", data=file)
@@ -1,28 +1,194 @@
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from pathlib import PurePosixPath
+from urllib.parse import quote
 
-from app.auth.dependencies import CurrentUser
+from fastapi import APIRouter, Path, Request, status
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.auth.dependencies import CurrentUserId
+from app.config import settings
+from app.fileapp.blob_cache import BlobCache, get_blob_cache
+from app.fileapp.compression import CODEC_IDENTITY, accepts_encoding, decompress_chunks
 from app.fileapp.dependencies import DependsFileDownloadService
+from app.fileapp.exceptions import FileNotFoundException
+from app.fileapp.responses import BlobFileResponse, blob_etag, content_disposition, etag_matches
+from app.fileapp.services.download_service import blob_download
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.value_objects import BlobDownload
+from app.logger import get_logger
 
 router = APIRouter()
 
+logger = get_logger(__name__)
+
+# file ids can be re-pointed or revoked, so caches must revalidate; the etag makes that a 304
+DOWNLOAD_CACHE_CONTROL = "private, no-cache"
+# a checksum names the same bytes forever
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _offload_header(storage_key: str, local_path) -> dict:
+    """
+    header telling the reverse proxy which file to serve, or {} when offload is off or the
+    key predates relative storage keys and cannot be mapped onto the internal location
+    """
+    if settings.download_offload == "x-sendfile":
+        return {"X-Sendfile": str(local_path)}
+    if settings.download_offload == "x-accel-redirect" and not PurePosixPath(storage_key).is_absolute():
+        return {"X-Accel-Redirect": quote(f"{settings.download_offload_prefix.rstrip('/')}/{storage_key}")}
+    return {}
+
+
+def _ensure_stored(storage: StorageBackend, download: BlobDownload) -> None:
+    if not storage.exists(download.storage_path):
+        logger.error("Physical file missing", checksum=download.checksum[:8], key=download.storage_path)
+        raise FileNotFoundException(f"blob-{download.checksum[:8]} not found")
+
+
+def _read_cached(storage: StorageBackend, download: BlobDownload, blob_cache: BlobCache) -> bytes:
+    """
+    read a small blob whole and keep it for the next request
+    """
+    _ensure_stored(storage, download)
+    data = b"".join(storage.open_range(download.storage_path))
+    blob_cache.put(download.checksum, download.codec, data)
+    return data
+
+
+def _inflate(data: bytes, codec: str) -> bytes:
+    return b"".join(decompress_chunks(iter([data]), codec))
+
+
+def _storage_response(storage: StorageBackend, download: BlobDownload, encoded: bool, headers: dict) -> Response:
+    """
+    the response for a blob served from storage: offloaded to the proxy, sent as a file,
+    or streamed
+    """
+    codec = download.codec
+    _ensure_stored(storage, download)
+
+    if codec != CODEC_IDENTITY and not encoded:
+        # client cannot take the stored encoding: inflate while streaming
+        headers["Content-Disposition"] = content_disposition(download.title)
+        headers["Content-Length"] = str(download.file_size)
+        return StreamingResponse(
+            decompress_chunks(storage.open_range(download.storage_path), codec),
+            media_type=download.mime_type,
+            headers=headers
+        )
+    if encoded:
+        headers["Content-Encoding"] = codec
+
+    local_path = storage.local_path(download.storage_path)
+    offload = _offload_header(download.storage_path, local_path) if local_path is not None else {}
+    if offload:
+        headers.update(offload)
+        headers["Content-Disposition"] = content_disposition(download.title)
+        return Response(media_type=download.mime_type, headers=headers)
+
+    if local_path is not None:
+        return BlobFileResponse(
+            path=local_path,
+            filename=download.title,
+            media_type=download.mime_type,
+            headers=headers
+        )
+
+    headers["Content-Disposition"] = content_disposition(download.title)
+    headers["Content-Length"] = str(download.stored_size)
+    return StreamingResponse(
+        storage.open_range(download.storage_path),
+        media_type=download.mime_type,
+        headers=headers
+    )
+
+
+async def serve_blob(
+    request: Request,
+    download: BlobDownload,
+    storage: StorageBackend,
+    cache_control: str,
+) -> Response:
+    """
+    conditional requests are answered from what is already known about the blob; storage
+    is only consulted once the body is actually needed. 304s and cache hits are answered on
+    the event loop, anything touching storage or inflating runs in the threadpool
+    """
+    codec = download.codec
+    encoded = codec != CODEC_IDENTITY and accepts_encoding(request.headers.get("accept-encoding", ""), codec)
+    headers = {
+        "ETag": blob_etag(download.checksum, codec if encoded else CODEC_IDENTITY),
+        "Cache-Control": cache_control,
+    }
+    if codec != CODEC_IDENTITY:
+        headers["Vary"] = "Accept-Encoding"
+
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    blob_cache = get_blob_cache()
+    if settings.download_offload == "none" and blob_cache.fits(download.stored_size):
+        # hits skip storage entirely; misses read the small blob whole and keep it
+        data = blob_cache.get(download.checksum, codec)
+        if data is None:
+            data = await run_in_threadpool(_read_cached, storage, download, blob_cache)
+
+        if codec != CODEC_IDENTITY and not encoded:
+            data = await run_in_threadpool(_inflate, data, codec)
+        elif encoded:
+            headers["Content-Encoding"] = codec
+        headers["Content-Disposition"] = content_disposition(download.title)
+        return Response(content=data, media_type=download.mime_type, headers=headers)
+
+    return await run_in_threadpool(_storage_response, storage, download, encoded, headers)
+
+
 @router.get(
     "/{file_id}/download",
     summary="download a file",
     description="download the actual file content",
     responses={
         200: {"description": "file downloaded successfully"},
+        304: {"description": "client copy is current"},
         404: {"description": "file not found"},
         500: {"description": "internal server error"}
     }
 )
-async def download_file(file_id: int, current_user: CurrentUser, file_download_service: DependsFileDownloadService) -> FileResponse:
-    file = file_download_service.get_file_path(
-        user_id=current_user.id,
+async def download_file(
+    file_id: int,
+    request: Request,
+    current_user_id: CurrentUserId,
+    file_download_service: DependsFileDownloadService
+) -> Response:
+    file = file_download_service.get_file_record(
+        user_id=current_user_id,
         file_id=file_id
     )
-    return FileResponse(
-        path=file.file_path,
-        filename=file.title,
-        media_type=file.mime_type
+    return await serve_blob(request, blob_download(file), file_download_service.storage, DOWNLOAD_CACHE_CONTROL)
+
+
+@router.get(
+    "/blobs/{checksum}",
+    summary="download a blob by checksum",
+    description="content-addressed download of a blob the caller holds a file for; cacheable forever",
+    responses={
+        200: {"description": "blob downloaded successfully"},
+        304: {"description": "client copy is current"},
+        404: {"description": "blob not found or blob urls disabled"},
+        500: {"description": "internal server error"}
+    }
+)
+async def download_blob(
+    request: Request,
+    current_user_id: CurrentUserId,
+    file_download_service: DependsFileDownloadService,
+    checksum: str = Path(pattern="^[0-9a-f]{64}$"),
+) -> Response:
+    if not settings.immutable_blob_urls:
+        raise FileNotFoundException(f"blob-{checksum[:8]} not found")
+
+    file = file_download_service.get_blob_record(
+        user_id=current_user_id,
+        checksum=checksum
     )
+    return await serve_blob(request, blob_download(file), file_download_service.storage, IMMUTABLE_CACHE_CONTROL)
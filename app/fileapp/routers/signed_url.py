@@ -0,0 +1,153 @@
+import time
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Request, Response, status
+
+from app.auth.dependencies import CurrentUser
+from app.fileapp.dependencies import DependsFileDownloadService, DependsFileUploadService, DependsStorageBackend
+from app.fileapp.model import FileReadResponse, SignedUploadUrlCreate, SignedUrlCreate, SignedUrlRead, SignedUrlResponse
+from app.fileapp.multipart_stream import receive_multipart_upload
+from app.fileapp.routers.download_file import serve_blob
+from app.fileapp.services.download_service import blob_download
+from app.fileapp.signed_urls import resolve_ttl, sign_download, sign_upload, verify_download, verify_upload
+from app.fileapp.upload_io import run_upload_io
+from app.fileapp.value_objects import UploadGrant
+from app.logger import get_logger
+
+router = APIRouter()
+
+logger = get_logger(__name__)
+
+
+def _signed_url_read(path: str, expires: int) -> SignedUrlRead:
+    return SignedUrlRead(url=path, expires_at=datetime.fromtimestamp(expires, tz=timezone.utc))
+
+
+@router.post(
+    "/{file_id}/signed-url",
+    response_model=SignedUrlResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="mint a signed download url",
+    description="short-lived url that downloads the file without authentication or database access",
+    responses={
+        201: {
+            "description": "signed url created",
+            "model": SignedUrlResponse
+        },
+        404: {"description": "file not found"},
+        500: {"description": "internal server error"}
+    }
+)
+def create_signed_download_url(
+    file_id: int,
+    current_user: CurrentUser,
+    file_download_service: DependsFileDownloadService,
+    payload: SignedUrlCreate | None = None,
+) -> SignedUrlResponse:
+    file = file_download_service.get_file_record(
+        user_id=current_user.id,
+        file_id=file_id
+    )
+    token, expires = sign_download(blob_download(file), resolve_ttl(payload.ttl_seconds if payload else None))
+    logger.info("signed download url created", file_id=file_id, user_id=current_user.id)
+    return SignedUrlResponse(
+        message="signed url created",
+        data=_signed_url_read(f"/api/files/signed/download/{token}", expires)
+    )
+
+
+@router.post(
+    "/signed-upload-url",
+    response_model=SignedUrlResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="mint a signed upload url",
+    description="short-lived url accepting any number of streamed multipart uploads on behalf of the caller "
+                "until it expires",
+    responses={
+        201: {
+            "description": "signed url created",
+            "model": SignedUrlResponse
+        },
+        500: {"description": "internal server error"}
+    }
+)
+def create_signed_upload_url(
+    current_user: CurrentUser,
+    payload: SignedUploadUrlCreate | None = None,
+) -> SignedUrlResponse:
+    payload = payload or SignedUploadUrlCreate()
+    grant = UploadGrant(user_id=current_user.id, document_id=payload.document_id)
+    token, expires = sign_upload(grant, resolve_ttl(payload.ttl_seconds))
+    logger.info("signed upload url created", user_id=current_user.id, document_id=payload.document_id)
+    return SignedUrlResponse(
+        message="signed url created",
+        data=_signed_url_read(f"/api/files/signed/upload/{token}", expires)
+    )
+
+
+@router.get(
+    "/signed/download/{token}",
+    summary="download through a signed url",
+    description="validated by signature and expiry alone",
+    responses={
+        200: {"description": "file downloaded successfully"},
+        304: {"description": "client copy is current"},
+        403: {"description": "invalid or expired signed url"},
+        404: {"description": "file not found"}
+    }
+)
+async def download_signed(token: str, request: Request, storage: DependsStorageBackend) -> Response:
+    download, expires = verify_download(token)
+    # whoever holds the url may fetch it until it expires, so shared caches may keep it that long
+    max_age = max(0, expires - int(time.time()))
+    return await serve_blob(request, download, storage, f"public, max-age={max_age}")
+
+
+@router.post(
+    "/signed/upload/{token}",
+    response_model=FileReadResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+    summary="upload through a signed url",
+    description="streamed multipart upload authorized by signature and expiry alone; the token is not single "
+                "use and stays valid until it expires",
+    responses={
+        201: {
+            "description": "file uploaded successfully",
+            "model": FileReadResponse
+        },
+        400: {"description": "invalid file or multipart body"},
+        403: {"description": "invalid or expired signed url"},
+        404: {"description": "document not found"},
+        500: {"description": "internal server error"}
+    }
+)
+async def upload_signed(
+    token: str,
+    request: Request,
+    response: Response,
+    file_upload_service: DependsFileUploadService,
+) -> FileReadResponse:
+    grant = verify_upload(token)
+    streamed = await receive_multipart_upload(
+        request.stream(),
+        request.headers.get("content-type", ""),
+        file_upload_service.temp_dir
+    )
+    logger.info(
+        "signed file upload received",
+        filename=streamed.filename,
+        user_id=grant.user_id,
+        file_size=streamed.ingested.file_size
+    )
+
+    # the document is pinned by the url, whatever the form says
+    uploaded_file = await run_upload_io(
+        file_upload_service.upload_ingested_file,
+        file_name=streamed.filename,
+        ingested=streamed.ingested,
+        user_id=grant.user_id,
+        document_id=grant.document_id
+    )
+    response.headers["Location"] = f"/api/files/{uploaded_file.id}"
+    return FileReadResponse(message="file upload successful", data=uploaded_file)
@@ -1,9 +1,11 @@
-from fastapi import status, UploadFile, File, Form, APIRouter, HTTPException, Response
+from fastapi import status, UploadFile, File, Form, APIRouter, HTTPException, Request, Response
 from typing import Optional
 
 from app.auth.dependencies import CurrentUser
-from app.fileapp.model import FileReadResponse
+from app.fileapp.model import FileChecksumCreate, FileChecksumResponse, FileReadResponse
 from app.fileapp.dependencies import DependsFileUploadService
+from app.fileapp.multipart_stream import receive_multipart_upload
+from app.fileapp.upload_io import run_upload_io
 from app.logger import get_logger
 
 router = APIRouter()
@@ -27,7 +29,7 @@ logger = get_logger(__name__)
         500: {"description": "internal server error"}
     }
 )
-def upload_file(
+async def upload_file(
     response: Response,
     current_user: CurrentUser,
     file_upload_service: DependsFileUploadService,
@@ -47,10 +49,92 @@ def upload_file(
             detail="no filename provided"
         )
 
-    uploaded_file = file_upload_service.upload_file(
+    uploaded_file = await run_upload_io(
+        file_upload_service.upload_file,
         file=file,
         user_id=current_user.id,
         document_id=document_id
     )
     response.headers["Location"] = f"/api/files/{uploaded_file.id}"
     return FileReadResponse(message="file upload successful", data=uploaded_file)
+
+
+@router.post(
+    "/upload/stream",
+    response_model=FileReadResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+    summary="upload a file (streamed)",
+    description="upload a file as multipart/form-data streamed straight into storage. optionally link with a document.",
+    responses={
+        201: {
+            "description": "file uploaded successfully",
+            "model": FileReadResponse
+        },
+        400: {"description": "invalid file, parameters or multipart body"},
+        404: {"description": "document not found"},
+        500: {"description": "internal server error"}
+    }
+)
+async def upload_file_stream(
+    request: Request,
+    response: Response,
+    current_user: CurrentUser,
+    file_upload_service: DependsFileUploadService,
+) -> FileReadResponse:
+    streamed = await receive_multipart_upload(
+        request.stream(),
+        request.headers.get("content-type", ""),
+        file_upload_service.temp_dir
+    )
+    logger.info(
+        "streamed file upload received",
+        filename=streamed.filename,
+        user_id=current_user.id,
+        file_size=streamed.ingested.file_size
+    )
+
+    uploaded_file = await run_upload_io(
+        file_upload_service.upload_streamed_file,
+        upload=streamed,
+        user_id=current_user.id
+    )
+    response.headers["Location"] = f"/api/files/{uploaded_file.id}"
+    return FileReadResponse(message="file upload successful", data=uploaded_file)
+
+
+@router.post(
+    "/from-checksum",
+    response_model=FileChecksumResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+    summary="create a file from a stored checksum",
+    description="create a file record from sha256 + size when the server already has the content. "
+                "responds 200 with upload_required=true when the bytes have to be uploaded.",
+    responses={
+        201: {
+            "description": "file created without upload",
+            "model": FileChecksumResponse
+        },
+        200: {
+            "description": "content unknown, upload required",
+            "model": FileChecksumResponse
+        },
+        400: {"description": "invalid file type"},
+        404: {"description": "document not found"},
+        500: {"description": "internal server error"}
+    }
+)
+def create_file_from_checksum(
+    payload: FileChecksumCreate,
+    response: Response,
+    current_user: CurrentUser,
+    file_upload_service: DependsFileUploadService,
+) -> FileChecksumResponse:
+    created_file = file_upload_service.create_from_checksum(user_id=current_user.id, data=payload)
+    if created_file is None:
+        response.status_code = status.HTTP_200_OK
+        return FileChecksumResponse(message="upload required", upload_required=True)
+
+    response.headers["Location"] = f"/api/files/{created_file.id}"
+    return FileChecksumResponse(message="file created from existing content", upload_required=False, data=created_file)
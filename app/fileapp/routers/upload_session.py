@@ -0,0 +1,142 @@
+from functools import partial
+
+from fastapi import APIRouter, Path, Request, Response, status
+
+from app.auth.dependencies import CurrentUser
+from app.fileapp.dependencies import DependsUploadSessionService
+from app.fileapp.model import FileReadResponse, UploadPartResponse, UploadSessionCreate, UploadSessionResponse
+from app.fileapp.upload_io import run_upload_io
+from app.fileapp.upload_parts import receive_upload_part
+
+router = APIRouter(prefix="/upload-sessions")
+
+
+@router.post(
+    "",
+    response_model=UploadSessionResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="start a resumable upload",
+    description="create an upload session that accepts numbered parts in any order",
+    responses={
+        201: {
+            "description": "upload session created",
+            "model": UploadSessionResponse
+        },
+        404: {"description": "document not found"},
+        500: {"description": "internal server error"}
+    }
+)
+def create_upload_session(
+    payload: UploadSessionCreate,
+    response: Response,
+    current_user: CurrentUser,
+    session_service: DependsUploadSessionService,
+) -> UploadSessionResponse:
+    session = session_service.create_session(user_id=current_user.id, data=payload)
+    response.headers["Location"] = f"/api/files/upload-sessions/{session.id}"
+    return UploadSessionResponse(message="upload session created", data=session)
+
+
+@router.get(
+    "/{session_id}",
+    response_model=UploadSessionResponse,
+    summary="get upload session",
+    description="retrieve an upload session with the part numbers received so far",
+    responses={
+        200: {
+            "description": "upload session retrieval successful",
+            "model": UploadSessionResponse
+        },
+        404: {"description": "upload session not found"},
+        410: {"description": "upload session expired"},
+        500: {"description": "internal server error"}
+    }
+)
+def get_upload_session(session_id: str, current_user: CurrentUser, session_service: DependsUploadSessionService) -> UploadSessionResponse:
+    session = session_service.fetch_session(user_id=current_user.id, session_id=session_id)
+    return UploadSessionResponse(message="upload session retrieval successful", data=session)
+
+
+@router.put(
+    "/{session_id}/parts/{part_number}",
+    response_model=UploadPartResponse,
+    summary="upload a part",
+    description="upload one numbered part as the raw request body. re-sending a part replaces it",
+    responses={
+        200: {
+            "description": "part stored",
+            "model": UploadPartResponse
+        },
+        404: {"description": "upload session not found"},
+        409: {"description": "upload session is not accepting parts"},
+        410: {"description": "upload session expired"},
+        413: {"description": "part too large"},
+        500: {"description": "internal server error"}
+    }
+)
+async def upload_part(
+    request: Request,
+    session_id: str,
+    current_user: CurrentUser,
+    session_service: DependsUploadSessionService,
+    part_number: int = Path(..., ge=1, description="1-based part number"),
+) -> UploadPartResponse:
+    writer = await run_upload_io(
+        session_service.open_part,
+        user_id=current_user.id,
+        session_id=session_id,
+        part_number=part_number
+    )
+    part = await receive_upload_part(request.stream(), writer, partial(session_service.commit_part, session_id))
+    return UploadPartResponse(message="part upload successful", data=part)
+
+
+@router.post(
+    "/{session_id}/complete",
+    response_model=FileReadResponse,
+    response_model_exclude_none=True,
+    status_code=status.HTTP_201_CREATED,
+    summary="complete a resumable upload",
+    description="assemble all parts into a file. parts must be numbered 1..N without gaps",
+    responses={
+        201: {
+            "description": "file uploaded successfully",
+            "model": FileReadResponse
+        },
+        400: {"description": "invalid file"},
+        404: {"description": "upload session or document not found"},
+        409: {"description": "parts missing or session already completing"},
+        410: {"description": "upload session expired"},
+        500: {"description": "internal server error"}
+    }
+)
+async def complete_upload_session(
+    session_id: str,
+    response: Response,
+    current_user: CurrentUser,
+    session_service: DependsUploadSessionService,
+) -> FileReadResponse:
+    uploaded_file = await run_upload_io(
+        session_service.complete_session,
+        user_id=current_user.id,
+        session_id=session_id
+    )
+    response.headers["Location"] = f"/api/files/{uploaded_file.id}"
+    return FileReadResponse(message="file upload successful", data=uploaded_file)
+
+
+@router.delete(
+    "/{session_id}",
+    status_code=status.HTTP_204_NO_CONTENT,
+    summary="abort a resumable upload",
+    description="delete an upload session and the parts received so far",
+    responses={
+        204: {"description": "upload session aborted"},
+        404: {"description": "upload session not found"},
+        409: {"description": "upload session is being completed"},
+        410: {"description": "upload session expired"},
+        500: {"description": "internal server error"}
+    }
+)
+def abort_upload_session(session_id: str, current_user: CurrentUser, session_service: DependsUploadSessionService) -> None:
+    session_service.abort_session(user_id=current_user.id, session_id=session_id)
@@ -1,21 +1,25 @@
-from sqlalchemy import and_
+from sqlalchemy import update
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-import os
 from fastapi import status
 
+from app.database.locks import advisory_lock
+from app.fileapp.blob_cache import get_blob_cache
 from app.logger import get_logger
-from app.fileapp.entities import DocumentCollectionFile
+from app.fileapp.entities import Blob, DocumentCollectionFile
 from app.fileapp.model import FileRead
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.storage.factory import get_storage_backend
 from app.fileapp.exceptions import FileNotFoundException, FileOperationException
 
 logger = get_logger(__name__)
 
 
 class FileService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
         self.db = db
+        self.storage = storage or get_storage_backend()
 
     def _get_file_instance(self, user_id: int, file_id: int) -> DocumentCollectionFile:
         try:
@@ -59,6 +63,30 @@ class FileService:
         file = self._get_file_instance(user_id, file_id)
         return FileRead.model_validate(file)
 
+    def _release_blob(self, checksum: str) -> None:
+        """
+        unlink a blob whose refcount reached zero.
+        re-checked under the blob lock since an upload may have revived it after the delete committed
+        """
+        try:
+            with advisory_lock(self.db, f"blob:{checksum}"):
+                blob = self.db.get(Blob, checksum, populate_existing=True)
+                if blob is None or blob.refcount > 0:
+                    logger.info("physical file preserved", reason="blob revived")
+                    self.db.commit()
+                    return
+
+                get_blob_cache().discard(checksum)
+                try:
+                    if self.storage.delete(blob.storage_path):
+                        logger.info("physical file deleted", key=blob.storage_path)
+                except OSError as os_err:
+                    logger.error("physical file deletion failed", key=blob.storage_path, error=os_err, error_type="os error", exc_info=True)
+                self.db.commit()
+        except SQLAlchemyError as sql_err:
+            self.db.rollback()
+            logger.error("blob release failed", checksum=checksum[:8], error=sql_err, exc_info=True)
+
     def delete_file(self, user_id: int, file_id: int) -> bool:
         """
         soft delete a file.
@@ -66,32 +94,32 @@ class FileService:
         """
         try:
             file = self._get_file_instance(user_id, file_id)
-            file.is_active = False
-            self.db.commit()
+            checksum = file.checksum
 
-            logger.info("file soft deletion successful", file_id=file_id)
+            with advisory_lock(self.db, f"blob:{checksum}"):
+                # conditional on is_active so a concurrent delete of the same record decrements once
+                deactivated = self.db.execute(
+                    update(DocumentCollectionFile)
+                    .where(DocumentCollectionFile.id == file_id, DocumentCollectionFile.is_active.is_(True))
+                    .values(is_active=False)
+                ).rowcount
 
-            other_active_refs = (
-                self.db.query(DocumentCollectionFile)
-                .filter(
-                    and_(
-                        DocumentCollectionFile.checksum == file.checksum,
-                        DocumentCollectionFile.is_active.is_(True),
-                        DocumentCollectionFile.id != file_id
-                    )
-                )
-                .count()
-            )
+                blob = None
+                if deactivated and checksum is not None:
+                    blob = self.db.execute(
+                        update(Blob)
+                        .where(Blob.checksum == checksum)
+                        .values(refcount=Blob.refcount - 1)
+                        .returning(Blob.refcount)
+                    ).one_or_none()
+                self.db.commit()
 
-            if other_active_refs == 0:
-                try:
-                    if os.path.exists(file.file_path):
-                        os.remove(file.file_path)
-                        logger.info("physical file deleted", path=file.file_path)
-                except OSError as os_err:
-                    logger.error("physical file deletion failed", path=file.file_path, error=os_err, error_type="os error", exc_info=True)
-            else:
-                logger.info("physical file preserved", active_refs=other_active_refs)
+            logger.info("file soft deletion successful", file_id=file_id)
+
+            if blob is not None and blob.refcount == 0 and checksum is not None:
+                self._release_blob(checksum)
+            elif blob is not None:
+                logger.info("physical file preserved", active_refs=blob.refcount)
 
             return True
         except FileOperationException:
@@ -1,19 +1,106 @@
-import os
+from fastapi import status
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Optional, Sequence, Tuple
 
+from app.collectionapp.entities import DocumentCollection
+from app.collectionapp.exceptions import CollectionNotFoundException
 from app.fileapp.entities import DocumentCollectionFile
 from app.fileapp.services.base_service import FileService
 from app.logger import get_logger
-from app.fileapp.exceptions import FileNotFoundException
+from app.fileapp.exceptions import FileNotFoundException, FileOperationException
+from app.fileapp.value_objects import BlobDownload
 
 logger = get_logger(__name__)
 
 
+def blob_download(file: DocumentCollectionFile) -> BlobDownload:
+    """
+    what serving the file needs; callers have made sure it has a blob
+    """
+    blob = file.blob
+    return BlobDownload(
+        title=file.title,
+        checksum=blob.checksum,
+        mime_type=file.mime_type,
+        file_size=file.file_size,
+        storage_path=blob.storage_path,
+        codec=blob.codec,
+        stored_size=blob.stored_size,
+    )
+
+
 class FileDownloadService(FileService):
-    def get_file_path(self, user_id: int, file_id: int) -> DocumentCollectionFile:
+    def get_file_record(self, user_id: int, file_id: int) -> DocumentCollectionFile:
+        """
+        ownership-checked record without touching storage, enough to answer a conditional request
+        """
         file = self._get_file_instance(user_id, file_id)
-
-        if not os.path.exists(file.file_path):
-            logger.error("Physical file missing", file_id=file_id, path=file.file_path)
+        if file.blob is None:
+            logger.error("file has no blob", file_id=file_id)
             raise FileNotFoundException(f"file-{file_id} not found")
+        return file
+
+    def get_blob_record(self, user_id: int, checksum: str) -> DocumentCollectionFile:
+        """
+        the caller's latest active file holding the blob; a checksum alone grants nothing
+        """
+        try:
+            file = (
+                self.db.query(DocumentCollectionFile)
+                .filter_by(checksum=checksum, user_id=user_id, is_active=True)
+                .order_by(DocumentCollectionFile.id.desc())
+                .first()
+            )
+        except SQLAlchemyError as db_err:
+            logger.error("blob retrieval failed", checksum=checksum[:8], error=db_err, exc_info=True)
+            raise FileOperationException(
+                message=f"database error while retrieving blob-{checksum[:8]}",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            ) from db_err
 
+        if file is None:
+            logger.warning("blob not found", checksum=checksum[:8])
+            raise FileNotFoundException(f"blob-{checksum[:8]} not found")
         return file
+
+    def get_collection_downloads(
+        self, user_id: int, collection_id: int, file_ids: Optional[Sequence[int]] = None
+    ) -> Tuple[str, List[BlobDownload]]:
+        """
+        collection title and the active files to archive, all of them or only `file_ids`.
+        everything is checked before the first byte is sent, since a streamed archive
+        cannot turn into an error response halfway through
+        """
+        try:
+            collection = self.db.query(DocumentCollection).filter_by(id=collection_id, user_id=user_id).first()
+            if collection is None:
+                logger.warning("collection not found", collection_id=collection_id)
+                raise CollectionNotFoundException(f"collection-{collection_id} not found")
+
+            query = self.db.query(DocumentCollectionFile).filter_by(
+                document_id=collection_id,
+                user_id=user_id,
+                is_active=True
+            )
+            if file_ids is not None:
+                query = query.filter(DocumentCollectionFile.id.in_(file_ids))
+            files = query.order_by(DocumentCollectionFile.id).all()
+        except SQLAlchemyError as db_err:
+            logger.error("archive file retrieval failed", collection_id=collection_id, error=db_err, exc_info=True)
+            raise FileOperationException(
+                message=f"database error while retrieving files of collection-{collection_id}",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            ) from db_err
+
+        if file_ids is not None:
+            missing = sorted(set(file_ids) - {file.id for file in files})
+            if missing:
+                logger.warning("archive files not found", collection_id=collection_id, file_ids=missing)
+                raise FileNotFoundException(f"files {missing} not found in collection-{collection_id}")
+
+        for file in files:
+            if file.blob is None or not self.storage.exists(file.blob.storage_path):
+                logger.error("Physical file missing", file_id=file.id, key=file.storage_path)
+                raise FileNotFoundException(f"file-{file.id} not found")
+
+        return collection.title, [blob_download(file) for file in files]
@@ -0,0 +1,105 @@
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database.locks import advisory_lock
+from app.fileapp.entities import Blob
+from app.fileapp.storage_layout import blob_relative_path, legacy_key
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _place(source: Path, target: Path) -> None:
+    """
+    make `target` hold the content of `source` without disturbing `source`.
+    a hard link is instant on the same filesystem; otherwise copy under a temp name and rename
+    """
+    if target.exists():
+        return  # content-addressed, so a leftover from an interrupted run is already correct
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, target)
+    except OSError:
+        partial = target.with_name(f"{target.name}.partial")
+        shutil.copyfile(source, partial)
+        os.replace(partial, target)
+
+
+class BlobRelocationService:
+    """
+    moves blobs stored under the old flat layout into the sharded one while the app keeps serving,
+    and turns absolute storage paths into keys relative to upload_dir. local storage only.
+    each blob is handled under its blob lock: the new copy is put in place, storage_path is
+    committed, and only then is the old file removed, so readers always resolve a path that exists
+    """
+    def __init__(self, db: Session):
+        self.db = db
+        self.upload_dir = settings.upload_dir
+
+    def __target_key(self, blob: Blob) -> str:
+        return blob_relative_path(blob.checksum, Path(blob.storage_path).suffix).as_posix()
+
+    def __next_batch(self, after: str, batch_size: int) -> List[str]:
+        return list(self.db.scalars(
+            select(Blob.checksum)
+            .where(Blob.checksum > after)
+            .order_by(Blob.checksum)
+            .limit(batch_size)
+        ))
+
+    def relocate_blob(self, checksum: str) -> bool:
+        with advisory_lock(self.db, f"blob:{checksum}"):
+            blob = self.db.get(Blob, checksum, populate_existing=True)
+            if blob is None:
+                self.db.commit()
+                return False
+
+            key = self.__target_key(blob)
+            if blob.storage_path == key:
+                self.db.commit()
+                return False
+
+            # paths recorded before keys were relative may still carry the upload_dir prefix
+            source = self.upload_dir / legacy_key(blob.storage_path, self.upload_dir)
+            target = self.upload_dir / key
+
+            if not source.exists() and not target.exists():
+                if blob.refcount > 0:
+                    # never point a live blob at a file that was not moved
+                    logger.error("blob file missing, not relocated", checksum=checksum[:8], path=str(source))
+                    self.db.commit()
+                    return False
+                # zero-ref blobs have no file left; only their recorded key is rewritten
+            elif source != target and source.exists():
+                _place(source, target)
+            blob.storage_path = key
+            self.db.commit()
+
+            if source != target:
+                source.unlink(missing_ok=True)
+
+        logger.info("blob relocated", checksum=checksum[:8], key=key)
+        return True
+
+    def relocate_all(self, batch_size: int = 500, pause: float = 0.0) -> int:
+        """
+        walk the blobs table in checksum order, `batch_size` rows per query, pausing between
+        batches to cap the extra io. safe to interrupt and rerun
+        """
+        relocated = 0
+        after = ""
+        while batch := self.__next_batch(after, batch_size):
+            relocated += sum(self.relocate_blob(checksum) for checksum in batch)
+            after = batch[-1]
+            logger.info("relocation batch done", last_checksum=after[:8], relocated=relocated)
+            if pause:
+                time.sleep(pause)
+        return relocated
@@ -1,32 +1,41 @@
 import dataclasses
 import os
-import shutil
 from pathlib import Path
-from typing import BinaryIO, Optional, Set, cast
+from typing import BinaryIO, Optional, Set, Tuple, cast
 
-import magic
 from fastapi import UploadFile
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.utils import calculate_checksum
 from app.logger import get_logger
+from app.metrics import FILE_DEDUP, FILE_UPLOAD_BYTES
+from app.database.locks import advisory_lock
 from app.database.transaction import db_transaction
-from app.fileapp.entities import DocumentCollectionFile
-from app.fileapp.exceptions import DocumentNotFoundException, InvalidFileTypeException, FileProcessingException
-from app.fileapp.model import FileRead
+from app.fileapp.entities import Blob, DocumentCollectionFile
+from app.fileapp.exceptions import DocumentNotFoundException, InvalidFileTypeException, FileProcessingException, \
+    MultipartStreamException
+from app.fileapp.model import FileChecksumCreate, FileRead
+from app.fileapp.compression import CODEC_IDENTITY, compress_file, is_compressible, resolve_codec
+from app.fileapp.ingest import ingest_stream
 from app.fileapp.mime_types import EXTENSION_TO_MIME
-from app.fileapp.value_objects import FileMetadata
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.storage.factory import get_storage_backend
+from app.fileapp.storage_layout import blob_relative_path
+from app.fileapp.value_objects import FileMetadata, IngestResult, StreamedUpload
 from app.collectionapp.entities import DocumentCollection
 
 logger = get_logger(__name__)
 
 
 class FileUploadService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, storage: Optional[StorageBackend] = None):
         self.db = db
+        self.storage = storage or get_storage_backend()
+        self.codec = resolve_codec(settings.storage_compression)
         self.upload_dir = settings.upload_dir
         self.upload_dir.mkdir(exist_ok=True)
+        self.temp_dir = settings.upload_temp_path
+        self.temp_dir.mkdir(parents=True, exist_ok=True)
 
         self.allowed_extensions: Set[str] = settings.allowed_extensions_set
         self.extension_to_mime = EXTENSION_TO_MIME
@@ -34,18 +43,14 @@ class FileUploadService:
     def __check_document_collection_exist(self, document_id: int) -> bool:
         return self.db.get(DocumentCollection, document_id) is not None
 
-    def __save_temp_file(self, file: UploadFile) -> Path:
+    def __save_temp_file(self, file: UploadFile) -> IngestResult:
         temp_filename = f"temp_{os.urandom(8).hex()}_{file.filename}"
-        temp_path = self.upload_dir / temp_filename
+        temp_path = self.temp_dir / temp_filename
 
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(cast(BinaryIO, file.file), buffer)
+        return ingest_stream(cast(BinaryIO, file.file), temp_path)
 
-        return temp_path
-
-    def __validate_file_type(self, temp_path: Path, file_name: str) -> Optional[str]:
+    def __validate_file_type(self, real_mime_type: str, file_name: str) -> Optional[str]:
         extension = Path(file_name).suffix.lower()
-        real_mime_type = magic.from_file(str(temp_path), mime=True)
 
         if extension not in self.allowed_extensions:
             logger.warning("file type not allowed", filename=file_name)
@@ -63,65 +68,213 @@ class FileUploadService:
 
         return real_mime_type
 
-    def __resolve_file_path(self, checksum: str, extension: str, temp_path: Path) -> str:
-        existing = (
-            self.db.query(DocumentCollectionFile)
-            .filter_by(checksum=checksum)
-            .first()
-        )
-        if existing:
-            logger.info("file deduplicated", checksum=checksum[:8], existing_file_id=existing.id)
-            os.remove(temp_path)
-            return str(existing.file_path)
-
-        final_path = str(self.upload_dir / f"{checksum}{extension}")
-        shutil.move(str(temp_path), final_path)
-        logger.info("new file saved", path=final_path)
-        return final_path
-
-    def __build_metadata(self, file: UploadFile, temp_path: Path, detected_mime: str) -> FileMetadata:
-        extension = Path(file.filename).suffix.lower()
-        checksum = calculate_checksum(str(temp_path))
-        file_size = os.path.getsize(temp_path)  # measure before temp is moved or deleted
-        file_path = self.__resolve_file_path(checksum, extension, temp_path)
+    def __is_live_blob(self, checksum: str) -> bool:
+        """
+        unlocked look at whether the content is already stored, so likely dedup hits skip
+        compression. the connection goes back to the pool before the slow part
+        """
+        blob = self.db.get(Blob, checksum)
+        live = blob is not None and blob.refcount > 0
+        self.db.rollback()
+        return live
+
+    def __prepare_content(self, ingested: IngestResult) -> Optional[Tuple[Path, str, int]]:
+        """
+        compress the temp file when its type compresses, it is not already stored and it
+        actually shrinks; returns the compressed file with its codec and size, or None to store
+        the temp file as is. runs before the blob lock is taken, so neither the lock nor a
+        pooled connection is held while compressing.
+        reading the temp file a second time is deliberate: the checksum, and so the dedup
+        outcome, is only known once ingest is done, and compressing during ingest would make
+        every dedup hit pay for output that is thrown away. the just-written temp file is
+        normally still in the page cache
+        """
+        codec = self.codec if is_compressible(ingested.mime_type) else CODEC_IDENTITY
+        if codec == CODEC_IDENTITY or self.__is_live_blob(ingested.checksum):
+            return None
+
+        compressed = ingested.path.with_name(f"{ingested.path.name}.{codec}")
+        try:
+            stored_size = compress_file(ingested.path, compressed, codec, settings.storage_compression_level)
+        except Exception:
+            compressed.unlink(missing_ok=True)
+            raise
+        if stored_size >= ingested.file_size:
+            compressed.unlink()
+            return None
+        return compressed, codec, stored_size
+
+    def __store_blob(
+            self,
+            ingested: IngestResult,
+            extension: str,
+            content: Optional[Tuple[Path, str, int]],
+    ) -> Optional[str]:
+        """
+        take a reference on the blob holding the ingested content.
+        the prepared content is handed to storage only when no live copy is stored;
+        returns the key it was stored under so a failed record insert can undo it.
+        must run under the blob lock, which is what coalesces identical concurrent uploads
+        onto a single stored copy
+        """
+        blob = self.db.get(Blob, ingested.checksum, populate_existing=True)
+        if blob is not None and blob.refcount > 0:
+            logger.info("file deduplicated", checksum=ingested.checksum[:8], refcount=blob.refcount)
+            FILE_DEDUP.labels("upload", "hit").inc()
+            blob.refcount = Blob.refcount + 1
+            return None
+
+        FILE_DEDUP.labels("upload", "miss").inc()
+        key = blob_relative_path(ingested.checksum, extension).as_posix()
+        # no prepared content also covers a blob that was live at the unlocked look and has been
+        # released since; rare enough to store it as is rather than compress under the lock
+        source, codec, stored_size = content or (ingested.path, CODEC_IDENTITY, ingested.file_size)
+        self.storage.put_file(key, source)
+        logger.info("new file saved", key=key, codec=codec, stored_size=stored_size)
+
+        if blob is None:
+            blob = Blob(checksum=ingested.checksum)
+            self.db.add(blob)
+        blob.storage_path = key
+        blob.size = ingested.file_size
+        blob.codec = codec
+        blob.stored_size = stored_size
+        blob.mime_type = ingested.mime_type
+        blob.refcount = 1
+        return key
 
+    def __build_metadata(self, file_name: str, ingested: IngestResult, detected_mime: str) -> FileMetadata:
         return FileMetadata(
-            title=file.filename,
-            file_path=file_path,
-            file_size=file_size,
+            title=file_name,
+            file_size=ingested.file_size,
             mime_type=detected_mime,
-            extension=extension,
-            checksum=checksum,
+            extension=Path(file_name).suffix.lower(),
+            checksum=ingested.checksum,
         )
 
-    def upload_file(self, file: UploadFile, user_id: int, document_id: Optional[int] = None) -> FileRead:
-        temp_path = None
+    def __save_record(self, metadata: FileMetadata, user_id: int, document_id: Optional[int]) -> FileRead:
+        """
+        insert the file record in the same transaction as the pending blob refcount change
+        """
+        new_file = DocumentCollectionFile(
+            **dataclasses.asdict(metadata),
+            user_id=user_id,
+            document_id=document_id,
+        )
 
-        if document_id is not None and not self.__check_document_collection_exist(document_id):
-            raise DocumentNotFoundException(f"document_collection-{document_id} does not exist")
+        with db_transaction(self.db, FileProcessingException, "database error during file upload", refresh=[new_file]):
+            self.db.add(new_file)
 
-        try:
-            temp_path = self.__save_temp_file(file)
+        logger.info("file record creation successful", file_id=new_file.id)
 
-            detected_mime = self.__validate_file_type(temp_path, file.filename)
+        return FileRead.model_validate(new_file)
+
+    def __create_file_record(self, file_name: str, ingested: IngestResult, user_id: int, document_id: Optional[int]) -> FileRead:
+        temp_paths = [ingested.path]
+        stored_key = None
+
+        try:
+            detected_mime = self.__validate_file_type(ingested.mime_type, file_name)
             if detected_mime is None:
                 raise InvalidFileTypeException("file type mismatch or not allowed")
 
-            metadata = self.__build_metadata(file, temp_path, detected_mime)
-            temp_path = None  # temp consumed inside __build_metadata
+            metadata = self.__build_metadata(file_name, ingested, detected_mime)
+            content = self.__prepare_content(ingested)
+            if content is not None:
+                temp_paths.append(content[0])
 
-            new_file = DocumentCollectionFile(
-                **dataclasses.asdict(metadata),
-                user_id=user_id,
-                document_id=document_id,
-            )
+            with advisory_lock(self.db, f"blob:{ingested.checksum}"):
+                try:
+                    stored_key = self.__store_blob(ingested, metadata.extension, content)
+                    created = self.__save_record(metadata, user_id, document_id)
+                except Exception:
+                    if stored_key is not None:
+                        self.storage.delete(stored_key)
+                    raise
 
-            with db_transaction(self.db, FileProcessingException, "database error during file upload", refresh=[new_file]):
-                self.db.add(new_file)
+            FILE_UPLOAD_BYTES.inc(ingested.file_size)
+            return created
+        finally:
+            # whatever storage did not consume
+            for path in temp_paths:
+                if os.path.exists(path):
+                    os.remove(path)
 
-            logger.info("file record creation successful", file_id=new_file.id)
+    def __references_blob(self, user_id: int, checksum: str) -> bool:
+        return self.db.query(
+            self.db.query(DocumentCollectionFile).filter_by(user_id=user_id, checksum=checksum).exists()
+        ).scalar() is True
 
-            return FileRead.model_validate(new_file)
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
\ No newline at end of file
+    def __claim_blob(self, user_id: int, data: FileChecksumCreate) -> Optional[FileRead]:
+        blob = self.db.get(Blob, data.checksum, populate_existing=True)
+        if (
+            blob is None
+            or not self.__references_blob(user_id, data.checksum)
+            or blob.refcount == 0
+            or blob.size != data.file_size
+            or not self.storage.exists(blob.storage_path)
+        ):
+            logger.info("dedup probe missed", checksum=data.checksum[:8])
+            FILE_DEDUP.labels("probe", "miss").inc()
+            self.db.rollback()  # ends the transaction holding the blob lock
+            return None
+
+        detected_mime = self.__validate_file_type(blob.mime_type, data.title)
+        if detected_mime is None:
+            raise InvalidFileTypeException("file type mismatch or not allowed")
+
+        logger.info("dedup probe hit", checksum=data.checksum[:8], refcount=blob.refcount)
+        FILE_DEDUP.labels("probe", "hit").inc()
+        blob.refcount = Blob.refcount + 1
+        metadata = FileMetadata(
+            title=data.title,
+            file_size=blob.size,
+            mime_type=detected_mime,
+            extension=Path(data.title).suffix.lower(),
+            checksum=data.checksum,
+        )
+        return self.__save_record(metadata, user_id, data.document_id)
+
+    def upload_file(self, file: UploadFile, user_id: int, document_id: Optional[int] = None) -> FileRead:
+        if document_id is not None and not self.__check_document_collection_exist(document_id):
+            raise DocumentNotFoundException(f"document_collection-{document_id} does not exist")
+
+        ingested = self.__save_temp_file(file)
+        return self.__create_file_record(file.filename, ingested, user_id, document_id)
+
+    def upload_streamed_file(self, upload: StreamedUpload, user_id: int) -> FileRead:
+        """
+        read the form fields of a multipart body already streamed into the temp dir
+        """
+        try:
+            raw_document_id = upload.fields.get("document_id")
+            document_id = int(raw_document_id) if raw_document_id else None
+        except ValueError:
+            os.remove(upload.ingested.path)
+            raise MultipartStreamException("document_id must be an integer")
+
+        return self.upload_ingested_file(upload.filename, upload.ingested, user_id, document_id)
+
+    def upload_ingested_file(self, file_name: str, ingested: IngestResult, user_id: int, document_id: Optional[int] = None) -> FileRead:
+        """
+        create a file record from a temp file already written into the temp dir.
+        the temp file is consumed whatever the outcome
+        """
+        if document_id is not None and not self.__check_document_collection_exist(document_id):
+            os.remove(ingested.path)
+            raise DocumentNotFoundException(f"document_collection-{document_id} does not exist")
+
+        return self.__create_file_record(file_name, ingested, user_id, document_id)
+
+    def create_from_checksum(self, user_id: int, data: FileChecksumCreate) -> Optional[FileRead]:
+        """
+        create a file record pointing at a blob the server already stores, without any byte transfer.
+        returns None when no stored blob matches checksum and size, i.e. the client has to upload.
+        checksum and size are visible to anyone a file is shared with, so they prove nothing:
+        only blobs the caller already references can be claimed, anything else reads as a miss
+        """
+        if data.document_id is not None and not self.__check_document_collection_exist(data.document_id):
+            raise DocumentNotFoundException(f"document_collection-{data.document_id} does not exist")
+
+        with advisory_lock(self.db, f"blob:{data.checksum}"):
+            return self.__claim_blob(user_id, data)
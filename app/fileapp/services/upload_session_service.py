@@ -0,0 +1,320 @@
+import os
+import shutil
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator
+
+import anyio
+from fastapi import status
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import SQLAlchemyError, OperationalError
+from sqlalchemy.orm import Session
+
+from app.collectionapp.entities import DocumentCollection
+from app.config import settings
+from app.database.core import SessionLocal
+from app.database.locks import advisory_lock
+from app.database.transaction import db_transaction
+from app.fileapp.entities import UploadSession
+from app.fileapp.exceptions import DocumentNotFoundException, FileUploadException, UploadSessionExpiredException, \
+    UploadSessionNotFoundException, UploadSessionStateException
+from app.fileapp.ingest import FileIngest, INGEST_CHUNK_SIZE
+from app.fileapp.model import FileRead, UploadPartRead, UploadSessionCreate, UploadSessionRead
+from app.fileapp.services.upload_service import FileUploadService
+from app.exceptions import AppException
+from app.fileapp.upload_parts import UploadPartWriter, part_file_name
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+PURGE_BATCH_SIZE = 100
+# a completion still claiming its session this long after expiry died with its process
+STALE_COMPLETION = timedelta(hours=1)
+
+
+class UploadSessionService:
+    """
+    resumable uploads: parts are PUT independently (any order, concurrently) into a per-session
+    directory and assembled on completion into the regular dedup/file record path.
+
+    a session is open until completion claims it; committing a part, claiming the session and
+    removing it all run under the session lock and check the status, so no part lands in or
+    disappears from a session while it is being assembled
+    """
+    def __init__(self, db: Session, upload_service: FileUploadService):
+        self.db = db
+        self.upload_service = upload_service
+        self.sessions_dir = settings.upload_temp_path / "sessions"
+
+    def __session_dir(self, session_id: str) -> Path:
+        return self.sessions_dir / session_id
+
+    @staticmethod
+    def __is_expired(session: UploadSession) -> bool:
+        expires_at = session.expires_at
+        if expires_at.tzinfo is None:  # sqlite drops the offset, values are written in utc
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at <= datetime.now(timezone.utc)
+
+    def __received_parts(self, session_id: str) -> dict[int, int]:
+        parts: dict[int, int] = {}
+        with os.scandir(self.__session_dir(session_id)) as entries:
+            for entry in entries:
+                if entry.name.isdigit():
+                    parts[int(entry.name)] = entry.stat().st_size
+        return parts
+
+    def __to_read(self, session: UploadSession) -> UploadSessionRead:
+        return UploadSessionRead(
+            id=session.id,
+            filename=session.filename,
+            document_id=session.document_id,
+            total_size=session.total_size,
+            status=session.status,
+            expires_at=session.expires_at,
+            received_parts=sorted(self.__received_parts(session.id)),
+        )
+
+    def __set_status(self, session_id: str, from_status: str, to_status: str) -> bool:
+        on_error = partial(FileUploadException, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        with db_transaction(self.db, on_error, f"database error while updating upload session-{session_id}", session_id=session_id):
+            claimed = (
+                self.db.query(UploadSession)
+                .filter_by(id=session_id, status=from_status)
+                .update({"status": to_status}, synchronize_session=False)
+            )
+        return claimed == 1
+
+    @staticmethod
+    def __lock_name(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    def __remove_open_session(self, session_id: str, session_status: str = "open") -> bool:
+        """
+        delete the session and its parts if it is still in `session_status`; by default
+        unless completion has claimed it
+        """
+        on_error = partial(FileUploadException, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        with advisory_lock(self.db, self.__lock_name(session_id)):
+            with db_transaction(self.db, on_error, f"database error while removing upload session-{session_id}", session_id=session_id):
+                removed = (
+                    self.db.query(UploadSession)
+                    .filter_by(id=session_id, status=session_status)
+                    .delete(synchronize_session=False)
+                )
+        if removed:
+            shutil.rmtree(self.__session_dir(session_id), ignore_errors=True)
+        return removed == 1
+
+    def __remove_session(self, session: UploadSession) -> None:
+        on_error = partial(FileUploadException, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        with db_transaction(self.db, on_error, f"database error while removing upload session-{session.id}", session_id=session.id):
+            self.db.delete(session)
+        shutil.rmtree(self.__session_dir(session.id), ignore_errors=True)
+
+    def _get_session_instance(self, user_id: int, session_id: str) -> UploadSession:
+        try:
+            session: UploadSession | None = self.db.query(UploadSession).filter_by(
+                id=session_id,
+                user_id=user_id
+            ).first()
+        except (SQLAlchemyError, OperationalError) as db_err:
+            logger.error("upload session retrieval failed", session_id=session_id, error=db_err, exc_info=True)
+            raise FileUploadException(
+                message=f"database error while retrieving upload session-{session_id}",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            ) from db_err
+
+        if not session:
+            logger.warning("upload session not found", session_id=session_id)
+            raise UploadSessionNotFoundException(f"upload session-{session_id} not found")
+        if self.__is_expired(session):
+            logger.warning("upload session expired", session_id=session_id)
+            raise UploadSessionExpiredException(f"upload session-{session_id} has expired")
+        return session
+
+    def purge_expired_sessions(self) -> int:
+        """
+        drop expired sessions and their parts, oldest first, one batch per call.
+        a session being completed is left to its completion, unless the claim has outlived
+        its expiry by STALE_COMPLETION and the completing process is taken to be gone
+        """
+        now = datetime.now(timezone.utc)
+        expired = (
+            self.db.query(UploadSession.id, UploadSession.status)
+            .filter(or_(
+                and_(UploadSession.status == "open", UploadSession.expires_at <= now),
+                and_(UploadSession.status == "completing", UploadSession.expires_at <= now - STALE_COMPLETION),
+            ))
+            .order_by(UploadSession.expires_at)
+            .limit(PURGE_BATCH_SIZE)
+            .all()
+        )
+        purged = sum(
+            self.__remove_open_session(session_id, session_status) for session_id, session_status in expired
+        )
+
+        if purged:
+            logger.info("expired upload sessions purged", count=purged)
+        return purged
+
+    def create_session(self, user_id: int, data: UploadSessionCreate) -> UploadSessionRead:
+        if data.document_id is not None and self.db.get(DocumentCollection, data.document_id) is None:
+            raise DocumentNotFoundException(f"document_collection-{data.document_id} does not exist")
+
+        self.purge_expired_sessions()
+
+        session = UploadSession(
+            id=uuid.uuid4().hex,
+            filename=data.filename,
+            document_id=data.document_id,
+            total_size=data.total_size,
+            status="open",
+            expires_at=datetime.now(timezone.utc) + settings.upload_session_ttl,
+            user_id=user_id,
+        )
+        on_error = partial(FileUploadException, status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        with db_transaction(self.db, on_error, "database error while creating upload session", refresh=[session]):
+            self.db.add(session)
+
+        self.__session_dir(session.id).mkdir(parents=True, exist_ok=True)
+        logger.info("upload session created", session_id=session.id)
+        return self.__to_read(session)
+
+    def fetch_session(self, user_id: int, session_id: str) -> UploadSessionRead:
+        return self.__to_read(self._get_session_instance(user_id, session_id))
+
+    def open_part(self, user_id: int, session_id: str, part_number: int) -> UploadPartWriter:
+        session_status = self._get_session_instance(user_id, session_id).status
+        # the part may take long to stream; commit_part checks the status again under the lock
+        self.db.rollback()
+        if session_status != "open":
+            raise UploadSessionStateException(f"upload session-{session_id} is {session_status}")
+        if part_number > settings.upload_session_max_parts:
+            raise UploadSessionStateException(f"part number must not exceed {settings.upload_session_max_parts}")
+
+        return UploadPartWriter(self.__session_dir(session_id), part_number, settings.upload_part_max_size)
+
+    def commit_part(self, session_id: str, writer: UploadPartWriter) -> UploadPartRead:
+        """
+        move a fully received part into place, unless the session stopped accepting parts
+        while it was streaming
+        """
+        with advisory_lock(self.db, self.__lock_name(session_id)):
+            try:
+                session = self.db.get(UploadSession, session_id, populate_existing=True)
+            except (SQLAlchemyError, OperationalError) as db_err:
+                logger.error("upload session retrieval failed", session_id=session_id, error=db_err, exc_info=True)
+                raise FileUploadException(
+                    message=f"database error while retrieving upload session-{session_id}",
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+                ) from db_err
+            if session is None:
+                raise UploadSessionNotFoundException(f"upload session-{session_id} not found")
+            if session.status != "open":
+                raise UploadSessionStateException(f"upload session-{session_id} is {session.status}")
+
+            part = writer.commit()
+            self.db.rollback()  # ends the transaction holding the session lock
+        return part
+
+    def __assemble(self, session_id: str, part_count: int) -> FileIngest:
+        # sha256 cannot be combined from per-part digests, so each part is read exactly once here,
+        # in order, and hashed/sniffed while it is appended to the final temp file
+        ingest = FileIngest(self.upload_service.temp_dir / f"temp_{os.urandom(8).hex()}")
+        try:
+            for part_number in range(1, part_count + 1):
+                with open(self.__session_dir(session_id) / part_file_name(part_number), "rb") as part:
+                    for chunk in iter(lambda: part.read(INGEST_CHUNK_SIZE), b""):
+                        ingest.write(chunk)
+        except BaseException:
+            ingest.abort()
+            raise
+        return ingest
+
+    def complete_session(self, user_id: int, session_id: str) -> FileRead:
+        session = self._get_session_instance(user_id, session_id)
+        # claimed before the parts are listed, so no part can be committed after the listing
+        with advisory_lock(self.db, self.__lock_name(session_id)):
+            if not self.__set_status(session_id, "open", "completing"):
+                raise UploadSessionStateException(f"upload session-{session_id} is already being completed")
+
+        try:
+            part_count = self.__check_parts(session)
+            ingested = self.__assemble(session_id, part_count).finish()
+            file = self.upload_service.upload_ingested_file(session.filename, ingested, user_id, session.document_id)
+        except BaseException:
+            self.__set_status(session_id, "completing", "open")
+            raise
+
+        self.__remove_session(session)
+        logger.info("upload session completed", session_id=session_id, file_id=file.id, parts=part_count)
+        return file
+
+    def __check_parts(self, session: UploadSession) -> int:
+        """
+        the number of parts to assemble, once they are numbered 1..N without gaps and add up
+        to the announced size
+        """
+        parts = self.__received_parts(session.id)
+        if not parts:
+            raise UploadSessionStateException(f"upload session-{session.id} has no parts")
+
+        part_count = max(parts)
+        missing = sorted(set(range(1, part_count + 1)) - parts.keys())
+        if missing:
+            raise UploadSessionStateException(f"upload session-{session.id} is missing parts {missing[:20]}")
+
+        received_size = sum(parts.values())
+        if session.total_size is not None and received_size != session.total_size:
+            raise UploadSessionStateException(
+                f"upload session-{session.id} received {received_size} bytes, expected {session.total_size}"
+            )
+        return part_count
+
+    def abort_session(self, user_id: int, session_id: str) -> None:
+        self._get_session_instance(user_id, session_id)
+        if not self.__remove_open_session(session_id):
+            raise UploadSessionStateException(f"upload session-{session_id} is being completed")
+        logger.info("upload session aborted", session_id=session_id)
+
+
+def purge_expired_upload_sessions() -> int:
+    """
+    purge batch after batch until no expired session is left
+    """
+    purged = 0
+    with SessionLocal() as db:
+        service = UploadSessionService(db, FileUploadService(db))
+        while batch := service.purge_expired_sessions():
+            purged += batch
+    return purged
+
+
+@asynccontextmanager
+async def upload_session_purge_lifespan() -> AsyncIterator[None]:
+    """
+    purge expired upload sessions on startup and every UPLOAD_SESSION_PURGE_SECONDS, so
+    their parts do not pile up when no new sessions are being created
+    """
+    if not settings.upload_session_purge_seconds:
+        yield
+        return
+
+    async def run() -> None:
+        while True:
+            try:
+                await anyio.to_thread.run_sync(purge_expired_upload_sessions)
+            except (SQLAlchemyError, AppException):
+                logger.error("expired upload session purge failed", exc_info=True)
+            await anyio.sleep(settings.upload_session_purge_seconds)
+
+    async with anyio.create_task_group() as task_group:
+        task_group.start_soon(run)
+        try:
+            yield
+        finally:
+            task_group.cancel_scope.cancel()
@@ -0,0 +1,81 @@
+import base64
+import dataclasses
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional, Tuple
+
+from app.config import settings
+from app.fileapp.exceptions import SignedUrlException
+from app.fileapp.value_objects import BlobDownload, UploadGrant
+
+PURPOSE_DOWNLOAD = "download"
+PURPOSE_UPLOAD = "upload"
+
+
+def _signing_key() -> bytes:
+    # derived, so a leaked url signature says nothing about the jwt key
+    return hmac.new(settings.secret_key.encode(), b"fileapp.signed-url", hashlib.sha256).digest()
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _signature(payload: str) -> str:
+    return _b64encode(hmac.new(_signing_key(), payload.encode(), hashlib.sha256).digest())
+
+
+def resolve_ttl(requested: Optional[int]) -> int:
+    return min(requested or settings.signed_url_ttl_seconds, settings.signed_url_max_ttl_seconds)
+
+
+def sign(purpose: str, claims: dict, ttl: int) -> Tuple[str, int]:
+    """
+    `<base64url json>.<base64url hmac-sha256>` carrying everything the serving route needs,
+    so validating it is pure computation. returns the token and its unix expiry
+    """
+    expires = int(time.time()) + ttl
+    payload = _b64encode(json.dumps({**claims, "p": purpose, "exp": expires}, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload)}", expires
+
+
+def verify(token: str, purpose: str) -> Tuple[dict, int]:
+    """
+    claims and unix expiry of a token signed for `purpose`; raises SignedUrlException otherwise
+    """
+    payload, _, signature = token.partition(".")
+    # compared as bytes: compare_digest refuses non-ascii str, which any url path can carry
+    if not signature or not hmac.compare_digest(signature.encode(), _signature(payload).encode()):
+        raise SignedUrlException("invalid signed url")
+
+    claims = json.loads(_b64decode(payload))
+    if claims.pop("p", None) != purpose:
+        raise SignedUrlException("invalid signed url")
+    expires = claims.pop("exp", 0)
+    if expires < time.time():
+        raise SignedUrlException("signed url expired")
+    return claims, expires
+
+
+def sign_download(download: BlobDownload, ttl: int) -> Tuple[str, int]:
+    return sign(PURPOSE_DOWNLOAD, dataclasses.asdict(download), ttl)
+
+
+def verify_download(token: str) -> Tuple[BlobDownload, int]:
+    claims, expires = verify(token, PURPOSE_DOWNLOAD)
+    return BlobDownload(**claims), expires
+
+
+def sign_upload(grant: UploadGrant, ttl: int) -> Tuple[str, int]:
+    return sign(PURPOSE_UPLOAD, dataclasses.asdict(grant), ttl)
+
+
+def verify_upload(token: str) -> UploadGrant:
+    claims, _ = verify(token, PURPOSE_UPLOAD)
+    return UploadGrant(**claims)
@@ -0,0 +1,65 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.fileapp.ingest import INGEST_CHUNK_SIZE
+
+
+@dataclass(frozen=True)
+class StoredObject:
+    size: int
+    modified: float
+
+
+class StorageBackend(ABC):
+    """
+    where blob bytes live. keys are the blob's storage_path: a relative, '/'-separated name
+    chosen by the caller (see storage_layout). services only talk to this interface
+    """
+
+    @abstractmethod
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        """store everything readable from `stream` under `key`, returns the bytes written"""
+
+    def put_file(self, key: str, source: Path) -> None:
+        """
+        store a finished local temp file under `key`, consuming it.
+        backends on the same filesystem override this with a rename
+        """
+        with open(source, "rb") as stream:
+            self.put_stream(key, stream)
+        source.unlink()
+
+    @abstractmethod
+    def open_range(self, key: str, start: int = 0, length: Optional[int] = None,
+                   chunk_size: int = INGEST_CHUNK_SIZE) -> Iterator[bytes]:
+        """yield the stored bytes from `start`, `length` of them or up to the end"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """remove `key`, returns False when there was nothing to remove"""
+
+    @abstractmethod
+    def stat(self, key: str) -> Optional[StoredObject]:
+        ...
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """
+        a filesystem path for `key` when the backend has one, so responses can hand
+        the file to the server (sendfile) instead of streaming it through python
+        """
+        return None
+
+
+def copy_stream(source: BinaryIO, target: BinaryIO, chunk_size: int = INGEST_CHUNK_SIZE) -> int:
+    written = 0
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        target.write(chunk)
+        written += len(chunk)
+    return written
+
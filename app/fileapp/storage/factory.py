@@ -0,0 +1,21 @@
+from functools import lru_cache
+
+from app.config import settings
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.storage.local import LocalStorageBackend
+from app.fileapp.storage.memory import MemoryStorageBackend
+
+
+@lru_cache
+def _memory_backend() -> MemoryStorageBackend:
+    return MemoryStorageBackend()
+
+
+def get_storage_backend() -> StorageBackend:
+    """
+    the backend selected by STORAGE_BACKEND. the memory backend is one per process so
+    every request sees the same objects
+    """
+    if settings.storage_backend == "memory":
+        return _memory_backend()
+    return LocalStorageBackend(settings.upload_dir)
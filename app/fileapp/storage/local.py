@@ -0,0 +1,71 @@
+import os
+import shutil
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from app.fileapp.ingest import INGEST_CHUNK_SIZE
+from app.fileapp.storage.base import StorageBackend, StoredObject, copy_stream
+
+
+class LocalStorageBackend(StorageBackend):
+    """
+    blobs as plain files below `root`. paths recorded before keys were made relative are
+    rewritten into keys by migration c7e2a5d91f40; absolute ones outside `root` are left as
+    they are and resolve to themselves
+    """
+    def __init__(self, root: Path):
+        self.root = root
+
+    def __path(self, key: str) -> Path:
+        return self.root / key
+
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        target = self.__path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        partial = target.with_name(f"{target.name}.partial")
+        try:
+            with open(partial, "wb") as out:
+                written = copy_stream(stream, out)
+            os.replace(partial, target)
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+        return written
+
+    def put_file(self, key: str, source: Path) -> None:
+        target = self.__path(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), target)
+
+    def open_range(self, key: str, start: int = 0, length: Optional[int] = None,
+                   chunk_size: int = INGEST_CHUNK_SIZE) -> Iterator[bytes]:
+        with open(self.__path(key), "rb") as f:
+            f.seek(start)
+            remaining = length
+            while remaining is None or remaining > 0:
+                chunk = f.read(chunk_size if remaining is None else min(chunk_size, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+
+    def exists(self, key: str) -> bool:
+        return self.__path(key).is_file()
+
+    def delete(self, key: str) -> bool:
+        try:
+            self.__path(key).unlink()
+        except FileNotFoundError:
+            return False
+        return True
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        try:
+            st = self.__path(key).stat()
+        except FileNotFoundError:
+            return None
+        return StoredObject(size=st.st_size, modified=st.st_mtime)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.__path(key)
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple
+
+from app.fileapp.ingest import INGEST_CHUNK_SIZE
+from app.fileapp.storage.base import StorageBackend, StoredObject
+
+
+class MemoryStorageBackend(StorageBackend):
+    """
+    blobs held in a dict; for tests and for benchmarking the code above the storage layer
+    """
+    def __init__(self):
+        self._objects: Dict[str, Tuple[bytes, float]] = {}
+        self._lock = threading.Lock()
+
+    def put_stream(self, key: str, stream: BinaryIO) -> int:
+        data = stream.read()
+        with self._lock:
+            self._objects[key] = (data, time.time())
+        return len(data)
+
+    def open_range(self, key: str, start: int = 0, length: Optional[int] = None,
+                   chunk_size: int = INGEST_CHUNK_SIZE) -> Iterator[bytes]:
+        with self._lock:
+            data, _ = self._objects[key]
+        end = len(data) if length is None else min(len(data), start + length)
+        for offset in range(start, end, chunk_size):
+            yield data[offset:min(offset + chunk_size, end)]
+
+    def exists(self, key: str) -> bool:
+        with self._lock:
+            return key in self._objects
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            return self._objects.pop(key, None) is not None
+
+    def stat(self, key: str) -> Optional[StoredObject]:
+        with self._lock:
+            entry = self._objects.get(key)
+        if entry is None:
+            return None
+        data, modified = entry
+        return StoredObject(size=len(data), modified=modified)
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+# two levels of two hex chars: 65536 leaf directories, so even tens of millions of blobs
+# leave each directory with a few hundred entries
+SHARD_WIDTH = 2
+SHARD_DEPTH = 2
+
+
+def blob_relative_path(checksum: str, extension: str) -> Path:
+    """
+    content-addressed location of a blob below upload_dir, e.g. ab/cd/abcd….pdf
+    """
+    shards = [checksum[i * SHARD_WIDTH:(i + 1) * SHARD_WIDTH] for i in range(SHARD_DEPTH)]
+    return Path(*shards, f"{checksum}{extension}")
+
+
+def legacy_key(storage_path: str, upload_dir: Path) -> str:
+    """
+    the key below upload_dir for a path recorded before keys were relative. those paths are
+    `UPLOAD_DIR / name` as configured, usually relative to the working directory
+    (uploads/<sha>.pdf), sometimes absolute; anything not below upload_dir comes back unchanged
+    """
+    path = Path(storage_path)
+    for candidate, root in ((path, upload_dir), (path.absolute(), upload_dir.absolute())):
+        try:
+            return candidate.relative_to(root).as_posix()
+        except ValueError:
+            continue
+    return storage_path
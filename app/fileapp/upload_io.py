@@ -0,0 +1,44 @@
+import functools
+from typing import AsyncIterator, Callable, TypeVar
+
+import anyio
+from anyio.lowlevel import RunVar
+
+from app.config import settings
+from app.fileapp.ingest import INGEST_CHUNK_SIZE
+
+T = TypeVar("T")
+
+_upload_io_limiter: RunVar[anyio.CapacityLimiter] = RunVar("upload_io_limiter")
+
+
+def upload_io_limiter() -> anyio.CapacityLimiter:
+    """
+    per-event-loop limiter for blocking upload work, separate from anyio's default
+    request threadpool so slow or large uploads cannot starve other sync routes
+    """
+    try:
+        return _upload_io_limiter.get()
+    except LookupError:
+        limiter = anyio.CapacityLimiter(settings.upload_io_threads)
+        _upload_io_limiter.set(limiter)
+        return limiter
+
+
+async def run_upload_io(func: Callable[..., T], *args, **kwargs) -> T:
+    return await anyio.to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=upload_io_limiter())
+
+
+async def drain_stream(stream: AsyncIterator[bytes], write: Callable[[bytes], None]) -> None:
+    """
+    read `stream` on the event loop and hand it to the blocking `write` in INGEST_CHUNK_SIZE
+    batches, so each thread hop carries a useful amount of data
+    """
+    pending = bytearray()
+    async for chunk in stream:
+        pending.extend(chunk)
+        if len(pending) >= INGEST_CHUNK_SIZE:
+            await run_upload_io(write, bytes(pending))
+            pending.clear()
+    if pending:
+        await run_upload_io(write, bytes(pending))
@@ -0,0 +1,61 @@
+import os
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from app.fileapp.exceptions import UploadPartTooLargeException
+from app.fileapp.model import UploadPartRead
+from app.fileapp.upload_io import drain_stream, run_upload_io
+from app.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def part_file_name(part_number: int) -> str:
+    return f"{part_number:06d}"
+
+
+class UploadPartWriter:
+    """
+    writes one numbered part of an upload session to a private temp name and renames it into
+    place on commit, so concurrent or retried PUTs of the same part never expose a partial file
+    """
+    def __init__(self, session_dir: Path, part_number: int, max_size: int):
+        self.part_number = part_number
+        self.max_size = max_size
+        self.final_path = session_dir / part_file_name(part_number)
+        self.temp_path = session_dir / f"{part_file_name(part_number)}.{os.urandom(4).hex()}.partial"
+        self.size = 0
+        self._buffer = open(self.temp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadPartTooLargeException(f"part-{self.part_number} exceeds {self.max_size} bytes")
+        self._buffer.write(chunk)
+
+    def commit(self) -> UploadPartRead:
+        self._buffer.close()
+        os.replace(self.temp_path, self.final_path)
+        return UploadPartRead(part_number=self.part_number, size=self.size)
+
+    def abort(self) -> None:
+        self._buffer.close()
+        self.temp_path.unlink(missing_ok=True)
+
+
+async def receive_upload_part(
+        stream: AsyncIterator[bytes],
+        writer: UploadPartWriter,
+        commit: Callable[[UploadPartWriter], UploadPartRead],
+) -> UploadPartRead:
+    """
+    stream the part into the writer, then hand it to `commit`, which decides whether it is
+    still wanted and moves it into place
+    """
+    try:
+        await drain_stream(stream, writer.write)
+        return await run_upload_io(commit, writer)
+    except BaseException:
+        writer.abort()
+        logger.warning("upload part aborted", part_number=writer.part_number)
+        raise
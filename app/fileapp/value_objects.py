@@ -1,11 +1,43 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 
 
 @dataclass(frozen=True)
 class FileMetadata:
     title: str
-    file_path: str
     file_size: int
     mime_type: str
     extension: str
-    checksum: str
\ No newline at end of file
+    checksum: str
+
+
+@dataclass(frozen=True)
+class IngestResult:
+    path: Path
+    checksum: str
+    file_size: int
+    mime_type: str
+
+
+@dataclass(frozen=True)
+class StreamedUpload:
+    filename: str
+    ingested: IngestResult
+    fields: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class BlobDownload:
+    title: str
+    checksum: str
+    mime_type: str
+    file_size: int
+    storage_path: str
+    codec: str
+    stored_size: int
+
+
+@dataclass(frozen=True)
+class UploadGrant:
+    user_id: int
+    document_id: int | None = None
@@ -1,58 +1,163 @@
+import atexit
+import copy
 import os
 import logging
+import queue
+import threading
+from typing import Optional, cast
+
 import structlog
-from logging.handlers import TimedRotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, TimedRotatingFileHandler
 import inspect
 
 from app.config import settings
+from app.metrics import LOG_RECORDS_DROPPED
+
+try:
+    import orjson
+except ImportError:  # listed in requirements.txt; configure_logger warns when it falls back to stdlib json
+    orjson = None  # type: ignore[assignment]
 
 
 # ensure log directory exists
 os.makedirs(settings.log_dir, exist_ok=True)
 
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["BoundedQueueHandler"] = None
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    hands records to the listener thread without rendering them. when the queue is full the
+    record is dropped straight away, or after waiting up to `block_seconds` for room, and counted,
+    here and in the log_records_dropped metric
+    """
+
+    def __init__(self, log_queue: queue.Queue, block_seconds: Optional[float]):
+        super().__init__(log_queue)
+        self.block_seconds = block_seconds
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # structlog records carry their event dict and are rendered by the listener's formatter;
+        # foreign ones are merged now, as their args may change once the caller moves on
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        log_queue = cast(queue.Queue, self.queue)
+        try:
+            if self.block_seconds is None:
+                log_queue.put_nowait(record)
+            else:
+                log_queue.put(record, timeout=self.block_seconds)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            LOG_RECORDS_DROPPED.inc()
+
+
+def _orjson_dumps(obj, default=None, **_) -> str:
+    return orjson.dumps(obj, default=default or str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _json_renderer() -> structlog.processors.JSONRenderer:
+    if orjson is None:
+        return structlog.processors.JSONRenderer()
+    return structlog.processors.JSONRenderer(serializer=_orjson_dumps)
+
+
+def _stop_listener() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()  # drains what is already queued
+        _listener = None
+
+
 # ------------- LOGGER CONFIGURATION FUNCTION -------------
 def configure_logger():
     """
-    configure structlog with standard logging handlers (console + file)
+    configure structlog with standard logging handlers (console + file).
+
+    the calling thread only builds the event dict (context, timestamp, level, traceback) and
+    queues it; json rendering and the stream and file writes, midnight rollover included,
+    happen on a listener thread
     """
+    global _listener, _queue_handler
+
     log_level_name = settings.log_level.upper()
     log_level = getattr(logging, log_level_name, logging.INFO)
 
-    # standard logging setup
-    logging.basicConfig(
-        level=log_level,
-        format="%(message)s",
-        handlers=[
-            logging.StreamHandler(),
-            TimedRotatingFileHandler(
-                filename=f"{settings.log_dir}/{settings.log_file}",
-                when="midnight",
-                interval=1,
-                backupCount=7,
-                encoding='utf-8',
-                utc=False
-            )
-        ]
+    timestamper = structlog.processors.TimeStamper(fmt="iso", utc=False)
+    formatter = structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.UnicodeDecoder(),
+            _json_renderer(),
+        ],
+        # records from other libraries (uvicorn, sqlalchemy) come out as json too
+        foreign_pre_chain=[
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            timestamper,
+            structlog.processors.format_exc_info,
+        ],
     )
 
+    stream_handler = logging.StreamHandler()
+    file_handler = TimedRotatingFileHandler(
+        filename=f"{settings.log_dir}/{settings.log_file}",
+        when="midnight",
+        interval=1,
+        backupCount=7,
+        encoding='utf-8',
+        utc=False
+    )
+    for handler in (stream_handler, file_handler):
+        handler.setFormatter(formatter)
+
+    _stop_listener()
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    block_seconds = settings.log_queue_block_seconds if settings.log_queue_full_policy == "block" else None
+    _queue_handler = BoundedQueueHandler(log_queue, block_seconds)
+    _listener = QueueListener(log_queue, stream_handler, file_handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, BoundedQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(log_level)
+
     # structlog setup
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
-            structlog.processors.TimeStamper(fmt="iso", utc=False),
+            timestamper,
             structlog.stdlib.add_log_level,
             structlog.stdlib.add_logger_name,
             structlog.stdlib.PositionalArgumentsFormatter(),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.UnicodeDecoder(),
-            structlog.processors.JSONRenderer()
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         context_class=dict,
         logger_factory=structlog.stdlib.LoggerFactory(),
-        cache_logger_on_first_use=False
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True
     )
 
+    if orjson is None:
+        structlog.get_logger(__name__).warning("orjson not installed, rendering logs with the slower stdlib json")
+
+
+atexit.register(_stop_listener)
+
 # ------------- LOGGER CREATION FUNCTION -------------
 def get_logger(name: str = None):
     """
@@ -62,4 +167,4 @@ def get_logger(name: str = None):
         frame = inspect.currentframe().f_back
         name = frame.f_globals.get('__name__', 'app')
 
-    return structlog.get_logger(name)
\ No newline at end of file
+    return structlog.get_logger(name)
@@ -1,27 +1,48 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
 
+from app.audit.writer import audit_log_lifespan
+from app.fileapp.compression import resolve_codec
+from app.fileapp.services.upload_session_service import upload_session_purge_lifespan
+from app.metrics import mark_process_dead
 from app.middleware.logging_context import LoggingContextMiddleware
+from app.middleware.metrics import MetricsMiddleware
 from app.validation_handler import ValidationErrorHandler
 from app.exceptions import AppException
 from app.exception_handler import AppExceptionHandler
+from app.config import settings
 from app.logger import configure_logger
 from app.routers import register_routers
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    try:
+        async with audit_log_lifespan(), upload_session_purge_lifespan():
+            yield
+    finally:
+        mark_process_dead()
+
+
 def create_app() -> FastAPI:
     configure_logger()
+    resolve_codec(settings.storage_compression)
 
     app = FastAPI(
         title='File Service App',
         description='A file management App with JWT',
         version='1.0.0',
         docs_url='/docs',
-        redoc_url='/redoc'
+        redoc_url='/redoc',
+        lifespan=lifespan
     )
 
     app.add_middleware(LoggingContextMiddleware)
+    if settings.metrics_enabled:
+        app.add_middleware(MetricsMiddleware)
 
     app.add_exception_handler(
         RequestValidationError,
@@ -47,7 +68,6 @@ def create_app() -> FastAPI:
 app = create_app()
 
 
-# TODO: log request response to table
 # TODO: crontab to remind users for missed task
 # TODO: add pagination for get list APIs
 # TODO: add file count for doc_collection
@@ -0,0 +1,114 @@
+import os
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.types import Scope
+
+# with PROMETHEUS_MULTIPROC_DIR set every worker writes its samples to files there and
+# /metrics aggregates all of them, whichever worker serves the scrape
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+UNMATCHED_ROUTE = "<unmatched>"
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "requests by route template and status", ["method", "route", "status"],
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "request latency by route template", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_REQUEST_BODY_BYTES = Counter(
+    "http_request_body_bytes", "request body bytes received by route template", ["route"],
+)
+HTTP_RESPONSE_BODY_BYTES = Counter(
+    "http_response_body_bytes", "response body bytes sent by route template; downloads are the download routes",
+    ["route"],
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "requests being handled", ["method"], multiprocess_mode="livesum",
+)
+
+FILE_UPLOAD_BYTES = Counter("file_upload_bytes", "content bytes received by uploads")
+FILE_DEDUP = Counter(
+    "file_dedup", "blob lookups by outcome; hit / (hit + miss) is the dedup ratio", ["source", "result"],
+)
+BLOB_CACHE_LOOKUPS = Counter("blob_cache_lookups", "small blob cache lookups by outcome", ["result"])
+BLOB_CACHE_EVICTIONS = Counter("blob_cache_evictions", "blobs evicted to stay within the cache budget")
+BLOB_CACHE_BYTES = Gauge("blob_cache_bytes", "bytes held by the small blob cache", multiprocess_mode="livesum")
+
+LOG_RECORDS_DROPPED = Counter("log_records_dropped", "log records dropped because the log queue was full")
+
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds", "argon2 hash or verify time on the hashing pool",
+    buckets=(0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1),
+)
+PASSWORD_HASH_WAIT_SECONDS = Histogram(
+    "password_hash_wait_seconds", "time spent queued for a hashing worker",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+PASSWORD_HASH_REJECTED = Counter("password_hash_rejected", "hashing requests turned away with a 503")
+PASSWORD_HASH_QUEUED = Gauge(
+    "password_hash_queued", "hashing requests waiting for a worker", multiprocess_mode="livesum",
+)
+PASSWORD_HASH_RUNNING = Gauge(
+    "password_hash_running", "hashing requests on a worker", multiprocess_mode="livesum",
+)
+
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out_connections", "connections in use", multiprocess_mode="livesum",
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow_connections", "connections checked out beyond pool_size", multiprocess_mode="livesum",
+)
+DB_POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds", "time to check a connection out of the pool, connecting included",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+
+def route_label(scope: Scope) -> str:
+    """
+    the template of the route that handled the request, so /api/files/1 and /api/files/2 are
+    one series; unmatched paths share one label to keep cardinality bounded
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or UNMATCHED_ROUTE
+
+
+def method_label(method: str) -> str:
+    return method if method in HTTP_METHODS else "OTHER"
+
+
+def _registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def mark_process_dead() -> None:
+    """
+    drop this worker's live gauges from the shared files on shutdown
+    """
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    return Response(content=generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,67 @@
+import random
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Dict, FrozenSet, Mapping, Optional, Tuple
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class LogPolicy:
+    sample_rate: float
+    capture_errors: bool
+    max_payload_bytes: int
+    header_allowlist: Optional[FrozenSet[str]]
+    metadata_only: bool
+
+    def sample(self) -> bool:
+        """
+        whether this request has its payloads logged regardless of its outcome
+        """
+        if self.metadata_only:
+            return False
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    @property
+    def captures_errors(self) -> bool:
+        return self.capture_errors and not self.metadata_only
+
+    def select_headers(self, headers: Mapping[str, str]) -> Optional[Dict[str, str]]:
+        if self.metadata_only:
+            return None
+        if self.header_allowlist is None:
+            return dict(headers)
+        return {k: v for k, v in headers.items() if k.lower() in self.header_allowlist}
+
+
+@lru_cache
+def get_log_policies() -> Tuple[LogPolicy, Tuple[Tuple[str, LogPolicy], ...]]:
+    """
+    the default policy and the per-route ones, longest prefix first
+    """
+    allowlist = settings.log_header_allowlist_set
+    default = LogPolicy(
+        sample_rate=settings.log_sample_rate,
+        capture_errors=settings.log_capture_errors,
+        max_payload_bytes=settings.log_payload_max_bytes,
+        header_allowlist=frozenset(allowlist) if allowlist is not None else None,
+        metadata_only=settings.log_metadata_only,
+    )
+
+    routes = []
+    for route in settings.log_route_policies:
+        overrides = route.model_dump(exclude={"path_prefix"}, exclude_none=True)
+        if "header_allowlist" in overrides:
+            overrides["header_allowlist"] = frozenset(h.lower() for h in overrides["header_allowlist"])
+        routes.append((route.path_prefix, replace(default, **overrides)))
+    routes.sort(key=lambda item: len(item[0]), reverse=True)
+
+    return default, tuple(routes)
+
+
+def resolve_log_policy(path: str) -> LogPolicy:
+    default, routes = get_log_policies()
+    for prefix, policy in routes:
+        if path.startswith(prefix):
+            return policy
+    return default
@@ -1,99 +1,269 @@
 import json
-from typing import Optional, Any, Union
+import re
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
 import structlog.contextvars
-from fastapi import Request
-from starlette.concurrency import iterate_in_threadpool
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.audit.writer import AuditEntry, get_audit_writer
 from app.config import settings
 from app.auth.service import AuthenticationService
+from app.auth.token_cache import remember_verified_token
 from app.logger import get_logger
+from app.middleware.log_policy import LogPolicy, resolve_log_policy
 
 logger = get_logger(__name__)
 
+_FORM_TYPE = "application/x-www-form-urlencoded"
+_TEXT_TYPES = {"application/json", _FORM_TYPE}
+_SIGNED_TOKEN = re.compile(r"(/signed/(?:download|upload)/)[^/]+")
+
+
+def _media_type(content_type: Optional[str]) -> str:
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def is_loggable_body(content_type: Optional[str]) -> bool:
+    """
+    json, urlencoded forms and text are worth logging; multipart and binary bodies never are
+    """
+    media_type = _media_type(content_type)
+    return media_type in _TEXT_TYPES or media_type.endswith("+json") or media_type.startswith("text/")
+
+
+def redact_path(path: str) -> str:
+    """
+    mask signed url tokens, which are bearer credentials until they expire
+    """
+    return _SIGNED_TOKEN.sub(r"\1***", path)
+
+
+def _content_length(headers: Headers) -> int:
+    try:
+        return int(headers.get("content-length") or 0)
+    except ValueError:
+        return 0
+
 
-class LoggingContextMiddleware(BaseHTTPMiddleware):
+class _BodyTap:
+    """
+    keeps the first `limit` bytes of a body passing through and counts the rest
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.buffer = bytearray()
+        self.size = 0
+
+    def feed(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+        room = self.limit - len(self.buffer)
+        if room > 0:
+            self.buffer += chunk[:room]
+
+    @property
+    def truncated(self) -> bool:
+        return self.size > self.limit
+
+
+class LoggingContextMiddleware:
     """
     Middleware to set logging context vars for entire request lifecycle
     and log request/response payloads.
+
+    pure asgi: bodies are never collected whole. a loggable request body is read ahead only
+    when it declares a length within the payload cap and is then replayed to the app;
+    response bodies are teed up to the same cap while every message is passed on as it comes,
+    so streams, pathsend and multipart uploads go through untouched.
+
+    what gets logged follows the LogPolicy of the path: payloads of sampled requests are
+    logged as they are seen, the others only keep the raw bytes and decode and mask them when
+    the request ends in an error
     """
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.masking_keys = settings.masking_keys_set
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        occurred_at = datetime.now(timezone.utc)
+        request = Request(scope)
+        request_id = uuid.uuid4().hex
+        path = redact_path(request.url.path)
         structlog.contextvars.clear_contextvars()
 
         structlog.contextvars.bind_contextvars(
+            request_id=request_id,
             method=request.method,
-            path=request.url.path,
+            path=path,
             query_params=dict(request.query_params) if request.query_params else None
         )
 
-        await self.__bind_user_context(request)
-        await self.__bind_ip_context(request)
+        user_id = self.__bind_user_context(request)
+        self.__bind_ip_context(request)
 
-        sanitized_req_headers = self.__sanitize(dict(request.headers))
-        request_body = await self.__get_request_body(request)
-        sanitized_request = self.__sanitize(request_body)
+        policy = resolve_log_policy(request.url.path)
+        sampled = policy.sample()
+        capture = sampled or policy.captures_errors
+
+        request_body = None
+        if capture:
+            receive, request_body = await self.__read_request_body(request.headers, receive, policy.max_payload_bytes)
 
         logger.info(
             "Request started",
-            payload=sanitized_request,
-            headers=sanitized_req_headers,
+            payload=self.__payload(request_body, request.headers.get("content-type")) if sampled else None,
+            headers=self.__sanitize(policy.select_headers(request.headers)),
         )
 
-        try:
-            response = await call_next(request)
-            sanitized_res_headers = self.__sanitize(dict(response.headers))
-
-            if response.headers.get("content-disposition"):
-                logger.info(
-                    "Request finished (file response)",
-                    status_code=response.status_code,
-                    headers=sanitized_res_headers
-                )
-                return response
-
-            response_body = await self.__get_response(response)
-            sanitized_response = self.__sanitize(response_body)
+        response_start: Optional[Message] = None
+        response_tap: Optional[_BodyTap] = None
+        bytes_in = bytes_out = 0
 
-            logger.info(
-                "Request finished",
-                payload=sanitized_response,
-                status_code=response.status_code,
-                headers=sanitized_res_headers,
-            )
+        async def receive_wrapper() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
 
-            return response
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_start, response_tap, bytes_out
+            if message["type"] == "http.response.start":
+                response_start = message
+                headers = Headers(raw=message.get("headers", []))
+                if (
+                    capture
+                    and "content-disposition" not in headers
+                    and is_loggable_body(headers.get("content-type"))
+                ):
+                    response_tap = _BodyTap(policy.max_payload_bytes)
+            elif message["type"] == "http.response.body":
+                body = message.get("body", b"")
+                bytes_out += len(body)
+                if response_tap is not None:
+                    response_tap.feed(body)
+            await send(message)
 
+        status_code = 500
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
         except Exception as e:
             logger.error(
                 "Request failed with exception",
                 exception=str(e),
+                request_payload=(
+                    self.__payload(request_body, request.headers.get("content-type")) if capture else None
+                ),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
                 exc_info=True,
             )
             raise
+        else:
+            if response_start is not None:
+                status_code = response_start["status"]
+                is_error = response_start["status"] >= 400
+                self.__log_response(
+                    policy,
+                    response_start,
+                    response_tap if sampled or is_error else None,
+                    # unsampled errors have not had their request payload logged yet
+                    request_body if is_error and not sampled and capture else None,
+                    request.headers.get("content-type"),
+                    round((time.perf_counter() - started) * 1000, 1),
+                )
         finally:
             structlog.contextvars.clear_contextvars()
+            if settings.audit_log_enabled:
+                # bodies the app never read, pathsend and offloaded responses: go by the declared length
+                if not bytes_in:
+                    bytes_in = _content_length(request.headers)
+                if not bytes_out and response_start is not None:
+                    bytes_out = _content_length(Headers(raw=response_start.get("headers", [])))
+                get_audit_writer().record(AuditEntry(
+                    request_id=request_id,
+                    occurred_at=occurred_at,
+                    user_id=user_id,
+                    method=request.method,
+                    path=path[:255],
+                    status_code=status_code,
+                    duration_ms=round((time.perf_counter() - started) * 1000, 1),
+                    bytes_in=bytes_in,
+                    bytes_out=bytes_out,
+                ))
+
+    def __payload(self, body: Optional[bytes], content_type: Optional[str]) -> Optional[Any]:
+        if body is None:
+            return None
+        return self.__sanitize(self.__decode_body(body, content_type))
+
+    def __log_response(
+            self,
+            policy: LogPolicy,
+            start: Message,
+            tap: Optional[_BodyTap],
+            request_body: Optional[bytes],
+            request_content_type: Optional[str],
+            duration_ms: float,
+    ) -> None:
+        headers = Headers(raw=start.get("headers", []))
+        sanitized_res_headers = self.__sanitize(policy.select_headers(headers))
+        extra = {}
+        if request_body is not None:
+            extra["request_payload"] = self.__payload(request_body, request_content_type)
+
+        if headers.get("content-disposition"):
+            logger.info(
+                "Request finished (file response)",
+                status_code=start["status"],
+                headers=sanitized_res_headers,
+                duration_ms=duration_ms,
+                **extra,
+            )
+            return
+
+        payload = None
+        if tap is not None and not tap.truncated:
+            payload = self.__payload(bytes(tap.buffer), headers.get("content-type"))
+
+        logger.info(
+            "Request finished",
+            payload=payload,
+            status_code=start["status"],
+            headers=sanitized_res_headers,
+            duration_ms=duration_ms,
+            **extra,
+        )
 
     @staticmethod
-    async def __bind_user_context(request: Request) -> None:
+    def __bind_user_context(request: Request) -> Optional[int]:
         auth = request.headers.get("Authorization")
         if auth and auth.lower().startswith("bearer "):
             token = auth.split(" ", 1)[1]
             try:
                 user_id = AuthenticationService.get_user_from_token(token, token_type="access")
+                remember_verified_token(request, token, user_id)
                 if user_id:
                     structlog.contextvars.bind_contextvars(user_id=user_id)
+                return user_id
             except Exception:
                 logger.error("Error extracting user from token", exc_info=True)
+        return None
 
     @staticmethod
-    async def __bind_ip_context(request: Request) -> None:
+    def __bind_ip_context(request: Request) -> None:
         client_host = request.client.host if request.client else None
         forwarded_for = request.headers.get("x-forwarded-for")
 
@@ -102,45 +272,52 @@ class LoggingContextMiddleware(BaseHTTPMiddleware):
         )
 
     @staticmethod
-    async def __get_request_body(request: Request) -> Optional[Any]:
-        """Safely extract and parse request body"""
+    async def __read_request_body(headers: Headers, receive: Receive, limit: int) -> Tuple[Receive, Optional[bytes]]:
+        """
+        read a small loggable body ahead of the app and hand back a receive that replays it.
+        anything else is left for the app to stream and is not logged
+        """
         try:
-            body = await request.body()
-            if not body:
-                return None
+            declared = int(headers.get("content-length", ""))
+        except ValueError:
+            return receive, None
+        if not declared or declared > limit or not is_loggable_body(headers.get("content-type")):
+            return receive, None
 
-            text = body.decode("utf-8")
-            try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                return text
+        messages: List[Message] = []
+        body = bytearray()
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            if not message.get("more_body", False) or len(body) > limit:
+                break
 
-        except Exception as e:
-            logger.warning("Failed to read request body", error=str(e))
-            return None
+        pending: Deque[Message] = deque(messages)
 
-    async def __get_response(self, response: Response) -> Optional[Union[str, dict]]:
-        try:
-            body = b"".join([chunk async for chunk in response.body_iterator])
-            decoded = self.__decode_body(body)
+        async def replay() -> Message:
+            if pending:
+                return pending.popleft()
+            return await receive()
 
-            response.body_iterator = iterate_in_threadpool(iter([body]))
-            return decoded
-        except Exception as e:
-            logger.warning("Failed to read response body", error=str(e))
-            return None
+        return replay, bytes(body) if len(body) <= limit else None
 
-    def __decode_body(self, body: bytes) -> Optional[Union[str, dict]]:
+    @staticmethod
+    def __decode_body(body: bytes, content_type: Optional[str]) -> Optional[Any]:
         if not body:
             return None
         try:
             text = body.decode("utf-8")
-            try:
-                return json.loads(text)
-            except json.JSONDecodeError:
-                return text
-        except Exception:
+        except UnicodeDecodeError:
             return None
+        if _media_type(content_type) == _FORM_TYPE:
+            return dict(parse_qsl(text, keep_blank_values=True))
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            return text
 
     def __sanitize(self, data: Any) -> Any:
         if hasattr(data, "items"):
@@ -150,4 +327,4 @@ class LoggingContextMiddleware(BaseHTTPMiddleware):
             }
         elif isinstance(data, list):
             return [self.__sanitize(item) for item in data]
-        return data
\ No newline at end of file
+        return data
@@ -0,0 +1,69 @@
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.fileapp.responses import PATHSEND_EXTENSION
+from app.metrics import (
+    HTTP_REQUEST_BODY_BYTES,
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_RESPONSE_BODY_BYTES,
+    method_label,
+    route_label,
+)
+
+
+class MetricsMiddleware:
+    """
+    count and time every http request by route template. the route is only known once the
+    router has matched, so the labels are read from the scope after the app returns.
+    body bytes are counted as they actually go through, so partial and aborted responses
+    only count what was sent
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = method_label(scope["method"])
+        status_code = 500
+        bytes_in = bytes_out = 0
+        content_length = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal bytes_in
+            message = await receive()
+            if message["type"] == "http.request":
+                bytes_in += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, bytes_out, content_length
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_length = int(Headers(raw=message.get("headers", [])).get("content-length") or 0)
+            elif message["type"] == "http.response.body":
+                bytes_out += len(message.get("body", b""))
+            await send(message)
+            if message["type"] == PATHSEND_EXTENSION:
+                # the server sends the whole file once the message is accepted
+                bytes_out += content_length
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            route = route_label(scope)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_REQUEST_BODY_BYTES.labels(route).inc(bytes_in)
+            HTTP_RESPONSE_BODY_BYTES.labels(route).inc(bytes_out)
+            in_progress.dec()
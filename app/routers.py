@@ -1,5 +1,8 @@
 from fastapi import FastAPI
 
+from app.config import settings
+from app.metrics import router as metrics_router
+
 from app.auth.controller import router as auth_api_router
 from app.collectionapp.routers import router as collection_api_router
 from app.userapp.routers import router as user_api_router
@@ -10,6 +13,9 @@ from app.fileapp.file_views import router as file_view_router
 
 
 def register_routers(app: FastAPI):
+    # ahead of the views, whose catch-all paths would otherwise shadow it
+    if settings.metrics_enabled:
+        app.include_router(metrics_router)
     app.include_router(auth_api_router)
     app.include_router(user_api_router)
     app.include_router(user_view_router)
@@ -21,8 +21,8 @@ router = APIRouter()
         500: {'description': 'Internal server error'}
     }
 )
-def login_user(user_data: UserLogin, user_service: DependsUserService) -> LoginResponse:
-    access_token, refresh_token = user_service.login_user(user_data.email, user_data.password)
+async def login_user(user_data: UserLogin, user_service: DependsUserService) -> LoginResponse:
+    access_token, refresh_token = await user_service.login_user(user_data.email, user_data.password)
 
     return LoginResponse(
         message="Login successful",
@@ -24,8 +24,8 @@ router = APIRouter()
     }
 )
 @limiter.limit(f"{settings.register_limit_per_hour}/hour")
-def register_user(request: Request, payload: UserRegister, user_service: DependsUserService) -> ApiResponse:
-    user = user_service.create_registered_user(payload)
+async def register_user(request: Request, payload: UserRegister, user_service: DependsUserService) -> ApiResponse:
+    user = await user_service.create_registered_user(payload)
     return ApiResponse(
         message=f'User-{user.id} created successfully',
     )
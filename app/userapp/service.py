@@ -1,10 +1,14 @@
+from collections import Counter
+
 from pydantic import EmailStr
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.userapp.entities import DocumentUser
+from app.auth.exceptions import PasswordHashingBusyException
 from app.auth.service import AuthenticationService
-from app.auth.hashing import hash_pwd, verify_pwd
+from app.auth.hashing import hash_pwd, verify_pwd, parameter_distribution
 from app.logger import get_logger
 from app.database.transaction import db_transaction
 from app.userapp.model import UserRegister
@@ -16,7 +20,8 @@ logger = get_logger(__name__)
 
 class UserService:
     """
-    service class for user operations
+    service class for user operations. database calls run in the threadpool and password
+    hashing is awaited on the hashing pool, so no request thread waits on argon2
     """
     def __init__(self, db: Session):
         self.db = db
@@ -33,17 +38,25 @@ class UserService:
     def __get_login_data(self, user_id: int) -> tuple[str, str]:
         return AuthenticationService.generate_access_token(user_id), AuthenticationService.generate_refresh_token(user_id)
 
-    def create_registered_user(self, user_data: UserRegister) -> DocumentUser:
+    def __insert_user(self, new_user: DocumentUser) -> None:
+        with db_transaction(self.db, UserCreationException, "Database error during user creation", refresh=[new_user]):
+            self.db.add(new_user)
+
+    def __save_rehash(self, user: DocumentUser) -> None:
+        self.db.commit()
+        self.db.refresh(user)
+
+    async def create_registered_user(self, user_data: UserRegister) -> DocumentUser:
         """
         Create a new user in the database
         """
-        existing_user = self.__fetch_user_by_email(user_data.email)
+        existing_user = await run_in_threadpool(self.__fetch_user_by_email, user_data.email)
 
         if existing_user:
             logger.warning("user already exists", email=user_data.email)
             raise UserDuplicateException(f'user with email-{user_data.email} already exists')
 
-        hashed_pwd = hash_pwd(user_data.password)
+        hashed_pwd = await hash_pwd(user_data.password)
 
         new_user = DocumentUser(
             name=user_data.name,
@@ -51,20 +64,19 @@ class UserService:
             hashed_pwd=hashed_pwd
         )
 
-        with db_transaction(self.db, UserCreationException, "Database error during user creation", refresh=[new_user]):
-            self.db.add(new_user)
+        await run_in_threadpool(self.__insert_user, new_user)
 
         logger.info('user creation successful', user_id=new_user.id)
         return new_user
 
-    def login_user(self, email: EmailStr, password: str) -> tuple[str, str]:
-        user: DocumentUser = self.__fetch_user_by_email(email)
+    async def login_user(self, email: EmailStr, password: str) -> tuple[str, str]:
+        user: DocumentUser = await run_in_threadpool(self.__fetch_user_by_email, email)
 
         if not user:
             logger.warning("login attempt for unregistered email", email=email)
             raise InvalidCredentialsException("invalid email or password")
 
-        is_valid, needs_rehash = verify_pwd(
+        is_valid, needs_rehash = await verify_pwd(
             user.hashed_pwd,
             password
         )
@@ -73,9 +85,25 @@ class UserService:
             raise InvalidCredentialsException("invalid email or password")
 
         if needs_rehash:
-            logger.info(f"Rehashing password for user {user.id}")
-            user.hashed_pwd = hash_pwd(password)
-            self.db.commit()
-            self.db.refresh(user)
-
-        return self.__get_login_data(user.id)
\ No newline at end of file
+            # best effort: a busy hashing pool must not turn a valid login into a 503,
+            # the rehash is retried on the next login
+            try:
+                user.hashed_pwd = await hash_pwd(password)
+            except PasswordHashingBusyException:
+                logger.info(f"Rehash skipped for user {user.id}, hashing pool busy")
+            else:
+                logger.info(f"Rehashing password for user {user.id}")
+                await run_in_threadpool(self.__save_rehash, user)
+
+        return self.__get_login_data(user.id)
+
+    def password_parameter_distribution(self) -> Counter:
+        """
+        how many stored password hashes use each argon2 parameter version
+        """
+        try:
+            hashes = self.db.query(DocumentUser.hashed_pwd).yield_per(1000)
+            return parameter_distribution(pwd_hashed for (pwd_hashed,) in hashes)
+        except (SQLAlchemyError, OperationalError) as db_err:
+            logger.error("password hash retrieval failed", error=db_err, exc_info=True)
+            raise DatabaseOperationException(f"Failed to read password hashes: {db_err}")
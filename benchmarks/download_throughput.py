@@ -0,0 +1,134 @@
+"""
+Measure download throughput and server CPU per GB for `GET /api/files/{id}/download`.
+
+Runs the app under uvicorn in a child process against a throwaway sqlite database holding one
+`--size-mb` blob, downloads it `--downloads` times per chunk size and reports MB/s plus the
+server's CPU seconds per GB (read from /proc, so Linux only). `--chunk-kb 64` reproduces
+starlette's default FileResponse reader, i.e. the behaviour before DOWNLOAD_CHUNK_SIZE.
+
+    python -m benchmarks.download_throughput --size-mb 512 --chunk-kb 64 1024
+"""
+import argparse
+import logging
+import multiprocessing
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.dependencies import get_current_user, get_current_user_id
+from app.config import settings
+from app.database.core import Base, get_db
+from app.fileapp.entities import Blob, DocumentCollectionFile
+from app.main import app
+from app.userapp.entities import DocumentUser
+from benchmarks.common import free_port, wait_for_port
+
+BLOB_KEY = "bench.bin"
+
+
+def _prepare_app(work_dir: Path, chunk_size: int) -> None:
+    engine = create_engine(f"sqlite:///{work_dir / 'bench.db'}", connect_args={"check_same_thread": False})
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_local() as session:
+        user = session.query(DocumentUser).one()
+        session.expunge(user)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_current_user_id] = lambda: user.id
+    settings.upload_dir = work_dir / "uploads"
+    settings.download_chunk_size = chunk_size
+
+
+def _seed(work_dir: Path, size: int) -> int:
+    engine = create_engine(f"sqlite:///{work_dir / 'bench.db'}")
+    Base.metadata.create_all(bind=engine)
+    uploads = work_dir / "uploads"
+    uploads.mkdir()
+    with open(uploads / BLOB_KEY, "wb") as f:
+        for _ in range(size // (1024 * 1024)):
+            f.write(os.urandom(1024 * 1024))
+
+    checksum = "b" * 64
+    with sessionmaker(bind=engine)() as session:
+        user = DocumentUser(name="bench", email="bench@example.com", hashed_pwd="x")
+        session.add(user)
+        session.flush()
+        record = DocumentCollectionFile(
+            title="bench.bin", file_size=size, mime_type="application/octet-stream", extension=".bin",
+            checksum=checksum, user_id=user.id,
+            blob=Blob(checksum=checksum, storage_path=BLOB_KEY, size=size, mime_type="application/octet-stream", refcount=1),
+        )
+        session.add(record)
+        session.commit()
+        return record.id
+
+
+def _serve(work_dir: Path, port: int, chunk_size: int) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    _prepare_app(work_dir, chunk_size)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _cpu_seconds(pid: int) -> float:
+    with open(f"/proc/{pid}/stat") as f:
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _bench(work_dir: Path, file_id: int, chunk_size: int, downloads: int) -> None:
+    port = free_port()
+    server = multiprocessing.Process(target=_serve, args=(work_dir, port, chunk_size), daemon=True)
+    server.start()
+    try:
+        wait_for_port(port)
+        received = 0
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=None) as client:
+            cpu_before = _cpu_seconds(server.pid)
+            started = time.perf_counter()
+            for _ in range(downloads):
+                with client.stream("GET", f"/api/files/{file_id}/download") as response:
+                    response.raise_for_status()
+                    for chunk in response.iter_raw(1024 * 1024):
+                        received += len(chunk)
+            elapsed = time.perf_counter() - started
+            cpu = _cpu_seconds(server.pid) - cpu_before
+    finally:
+        server.terminate()
+        server.join()
+
+    gigabytes = received / 1024 ** 3
+    print(f"chunk {chunk_size // 1024:>6} KiB  {received / 1024 ** 2 / elapsed:8.1f} MB/s  "
+          f"server cpu {cpu / gigabytes:6.2f} s/GB  ({received / 1024 ** 2:.0f} MB in {elapsed:.1f}s)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=256, help="size of the downloaded blob")
+    parser.add_argument("--downloads", type=int, default=4, help="sequential downloads per chunk size")
+    parser.add_argument("--chunk-kb", type=int, nargs="+", default=[64, 1024], help="reader chunk sizes to compare")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        file_id = _seed(Path(work_dir), args.size_mb * 1024 * 1024)
+        for chunk_kb in args.chunk_kb:
+            _bench(Path(work_dir), file_id, chunk_kb * 1024, args.downloads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare storage backends on the operations the file services issue: store a finished temp
+file, check it exists, stream it back, delete it.
+
+Each backend stores `--blobs` objects of `--size-kb` under sharded keys; the local backend
+writes into a throwaway directory (point `--root` at another filesystem to compare disks).
+
+    python -m benchmarks.storage_backends --blobs 500 --size-kb 256
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+from app.fileapp.storage.base import StorageBackend
+from app.fileapp.storage.local import LocalStorageBackend
+from app.fileapp.storage.memory import MemoryStorageBackend
+from app.fileapp.storage_layout import blob_relative_path
+
+
+def _timed(op: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    op()
+    return time.perf_counter() - start
+
+
+def _drain(storage: StorageBackend, key: str) -> int:
+    return sum(len(chunk) for chunk in storage.open_range(key))
+
+
+def _bench(storage: StorageBackend, staging: Path, blobs: int, size: int) -> Dict[str, List[float]]:
+    timings: Dict[str, List[float]] = {"put_file": [], "exists": [], "read": [], "delete": []}
+    keys = []
+    for i in range(blobs):
+        checksum = os.urandom(32).hex()
+        key = blob_relative_path(checksum, ".bin").as_posix()
+        temp = staging / f"temp_{i}"
+        temp.write_bytes(os.urandom(size))
+        timings["put_file"].append(_timed(lambda: storage.put_file(key, temp)))
+        keys.append(key)
+
+    for key in keys:
+        timings["exists"].append(_timed(lambda: storage.exists(key)))
+        timings["read"].append(_timed(lambda: _drain(storage, key)))
+    for key in keys:
+        timings["delete"].append(_timed(lambda: storage.delete(key)))
+    return timings
+
+
+def _report(name: str, timings: Dict[str, List[float]]) -> None:
+    for op, samples in timings.items():
+        samples.sort()
+        p95 = samples[int(len(samples) * 0.95) - 1]
+        print(f"{name:<8} {op:<9} median {statistics.median(samples) * 1e6:9.1f} us   p95 {p95 * 1e6:9.1f} us")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blobs", type=int, default=500, help="objects stored per backend")
+    parser.add_argument("--size-kb", type=int, default=256, help="size of each object")
+    parser.add_argument("--root", type=Path, default=None, help="directory for the local backend")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        staging = Path(work_dir) / "staging"
+        staging.mkdir()
+        backends = {
+            "local": LocalStorageBackend(args.root or Path(work_dir) / "blobs"),
+            "memory": MemoryStorageBackend(),
+        }
+        for name, storage in backends.items():
+            _report(name, _bench(storage, staging, args.blobs, args.size_kb * 1024))
+
+
+if __name__ == "__main__":
+    main()
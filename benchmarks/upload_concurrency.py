@@ -0,0 +1,157 @@
+"""
+Measure `GET /api/files/` latency while many slow clients upload concurrently.
+
+Runs the app under uvicorn in a child process against a throwaway sqlite database and upload
+dir (so the load generator does not share the server's GIL), then compares listing latency when idle and while `--uploads` clients trickle multipart
+bodies into the upload endpoint. `--shared-pool` routes upload io through anyio's default
+request threadpool, which reproduces the pre-async behaviour for comparison.
+
+    python -m benchmarks.upload_concurrency --uploads 60
+    python -m benchmarks.upload_concurrency --uploads 60 --shared-pool
+"""
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import anyio.to_thread
+import httpx
+import uvicorn
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.auth.dependencies import get_current_user, get_current_user_id
+from app.config import settings
+from app.database.core import Base, get_db
+from app.fileapp import upload_io
+from app.main import app
+from app.userapp.entities import DocumentUser
+from benchmarks.common import free_port, wait_for_port
+
+BOUNDARY = "benchmarkboundary"
+
+
+def _prepare_app(work_dir: Path, shared_pool: bool) -> None:
+    engine = create_engine(f"sqlite:///{work_dir / 'bench.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    session_local = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    with session_local() as session:
+        user = DocumentUser(name="bench", email="bench@example.com", hashed_pwd="x")
+        session.add(user)
+        session.commit()
+        session.refresh(user)
+        session.expunge(user)
+
+    def override_get_db():
+        db = session_local()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[get_current_user_id] = lambda: user.id
+    settings.upload_dir = work_dir / "uploads"
+
+    if shared_pool:
+        upload_io.upload_io_limiter = anyio.to_thread.current_default_thread_limiter
+
+
+def _serve(work_dir: Path, port: int, shared_pool: bool) -> None:
+    logging.getLogger().setLevel(logging.WARNING)
+    _prepare_app(work_dir, shared_pool)
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def _slow_body(size: int, chunk_size: int, delay: float):
+    yield (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="bench.txt"\r\n'
+        f"Content-Type: text/plain\r\n\r\n"
+    ).encode()
+    sent = 0
+    line = b"benchmark payload line\n"
+    chunk = (line * (chunk_size // len(line) + 1))[:chunk_size]
+    while sent < size:
+        piece = chunk[: min(chunk_size, size - sent)]
+        sent += len(piece)
+        yield piece
+        await asyncio.sleep(delay)
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+async def _upload(client: httpx.AsyncClient, endpoint: str, args) -> int:
+    response = await client.post(
+        endpoint,
+        content=_slow_body(args.size_mb * 1024 * 1024, args.chunk_kb * 1024, args.chunk_delay),
+        headers={"Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+    )
+    return response.status_code
+
+
+async def _measure_listing(client: httpx.AsyncClient, interval: float, samples: int = 0, while_running: list = ()) -> list[float]:
+    latencies = []
+    while len(latencies) < samples or any(not task.done() for task in while_running):
+        started = time.perf_counter()
+        response = await client.get("/api/files/")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+def _summary(label: str, latencies: list[float]) -> str:
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    return f"{label:<16} p50={statistics.median(ordered):8.1f} ms  p95={p95:8.1f} ms  max={ordered[-1]:8.1f} ms"
+
+
+async def _run(base_url: str, args) -> None:
+    timeout = httpx.Timeout(None)
+    async with httpx.AsyncClient(base_url=base_url, timeout=timeout, headers={"Authorization": "Bearer bench"}) as client:
+        idle = await _measure_listing(client, args.interval, samples=args.samples)
+
+        started = time.perf_counter()
+        uploads = [asyncio.create_task(_upload(client, args.endpoint, args)) for _ in range(args.uploads)]
+        loaded = await _measure_listing(client, args.interval, while_running=uploads)
+        statuses = await asyncio.gather(*uploads)
+        elapsed = time.perf_counter() - started
+
+    print(_summary("idle", idle))
+    print(_summary(f"{args.uploads} uploads", loaded))
+    print(f"uploads: {statuses.count(201)}/{len(statuses)} succeeded in {elapsed:.1f}s, {len(loaded)} listings sampled")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=60, help="concurrent slow uploads")
+    parser.add_argument("--size-mb", type=int, default=8, help="size of each upload")
+    parser.add_argument("--chunk-kb", type=int, default=64, help="client write size")
+    parser.add_argument("--chunk-delay", type=float, default=0.01, help="pause between client writes (s)")
+    parser.add_argument("--endpoint", default="/api/files/upload/stream", choices=["/api/files/upload", "/api/files/upload/stream"])
+    parser.add_argument("--samples", type=int, default=50, help="listing requests while idle")
+    parser.add_argument("--interval", type=float, default=0.05, help="pause between listing requests (s)")
+    parser.add_argument("--shared-pool", action="store_true", help="run upload io on the default request threadpool")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        port = free_port()
+        server = multiprocessing.Process(target=_serve, args=(Path(work_dir), port, args.shared_pool), daemon=True)
+        server.start()
+        try:
+            wait_for_port(port)
+            asyncio.run(_run(f"http://127.0.0.1:{port}", args))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
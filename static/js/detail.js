@@ -33,6 +33,7 @@ document.addEventListener('DOMContentLoaded', async () => {
                 const el = document.getElementById(id);
                 if (el) el.textContent = val;
             };
+            this.title = col.title;
             set('collection-title', col.title);
             set('collection-description', col.description || 'No description provided.');
             set('collection-created', UIUtils.formatDateTime(col.created_at));
@@ -101,6 +102,8 @@ document.addEventListener('DOMContentLoaded', async () => {
         setupEventListeners() {
             document.getElementById('delete-button')?.addEventListener('click', () => this.handleDeleteCollection());
             document.getElementById('upload-form')?.addEventListener('submit', (e) => this.handleUpload(e));
+            document.getElementById('download-all-button')?.addEventListener('click', () =>
+                FileUtils.downloadFrom(`/collection/${this.id}/archive`, `${this.title || 'collection'}.zip`));
 
             document.getElementById('files-list')?.addEventListener('click', (e) => {
                 const previewBtn = e.target.closest('.btn-preview');
@@ -40,8 +40,12 @@ class FileUtils {
     }
 
     static async handleDownload(fileId, filename) {
+        await FileUtils.downloadFrom(`/files/${fileId}/download`, filename);
+    }
+
+    static async downloadFrom(endpoint, filename) {
         try {
-            const response = await apiClient.request(`/files/${fileId}/download`);
+            const response = await apiClient.request(endpoint);
             if (!response.ok) throw new Error('Download failed.');
 
             const blob = await response.blob();
@@ -3,7 +3,7 @@ from faker import Faker
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.auth.dependencies import get_current_user
+from app.auth.dependencies import get_current_user, get_current_user_id
 from tests.userapp.conftest import make_test_user
 from app.collectionapp.entities import DocumentCollection
 from app.collectionapp.service import DocumentService
@@ -86,5 +86,6 @@ def mock_current_user(make_test_user):
 @pytest.fixture
 def auth_headers(client, make_test_user):
     client.app.dependency_overrides[get_current_user] = lambda: make_test_user
+    client.app.dependency_overrides[get_current_user_id] = lambda: make_test_user.id
 
     return {'Authorization': "Bearer mock_token"}
\ No newline at end of file
@@ -0,0 +1,67 @@
+import io
+import uuid
+import zipfile
+
+import pytest
+from fastapi import status
+
+from app.auth.dependencies import get_current_user_id
+
+
+@pytest.mark.integration
+@pytest.mark.collectionapp
+class TestArchiveCollectionRoute:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, auth_headers, make_test_collection, mocker, tmp_path):
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+        self._url = f"api/collection/{make_test_collection.id}/archive"
+        self._files = {}
+        for name in ("first.txt", "second.txt"):
+            content = f"{name} {uuid.uuid4().hex}\n".encode()
+            response = client.post(
+                "api/files/upload",
+                files={"file": (name, content, "text/plain")},
+                data={"document_id": str(make_test_collection.id)},
+                headers=auth_headers,
+            )
+            assert response.status_code == status.HTTP_201_CREATED
+            self._files[name] = (response.json()["data"]["id"], content)
+
+    def test_archive_whole_collection(self, client, auth_headers):
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/zip"
+        assert response.headers["content-disposition"] == (
+            "attachment; filename*=utf-8''Title%20for%20Init%20Test%20Collection.zip"
+        )
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.read("first.txt") == self._files["first.txt"][1]
+        assert archive.read("second.txt") == self._files["second.txt"][1]
+
+    def test_archive_selected_files(self, client, auth_headers):
+        file_id, content = self._files["second.txt"]
+
+        response = client.post(self._url, json={"file_ids": [file_id]}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        archive = zipfile.ZipFile(io.BytesIO(response.content))
+        assert archive.namelist() == ["second.txt"]
+        assert archive.read("second.txt") == content
+
+    def test_archive_unknown_file_id(self, client, auth_headers):
+        response = client.post(self._url, json={"file_ids": [999999]}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_archive_unknown_collection(self, client, auth_headers):
+        response = client.get("api/collection/999999/archive", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_archive_without_auth(self, client):
+        client.app.dependency_overrides.pop(get_current_user_id)
+
+        response = client.get(self._url)
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
@@ -5,8 +5,10 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock
 
+from app.auth.token_cache import get_token_cache
+from app.auth.user_cache import get_user_cache
 from app.database.core import Base, get_db
 from app.main import app
 
@@ -64,6 +66,17 @@ def client(db_session):
 
     app.dependency_overrides.clear()
 
+@pytest.fixture(autouse=True)
+def fresh_user_cache():
+    """
+    users and verified tokens are cached per process; keep one test's out of the next
+    """
+    get_user_cache().clear()
+    get_token_cache().clear()
+    yield
+    get_user_cache().clear()
+    get_token_cache().clear()
+
 # mock fixture
 
 @pytest.fixture
@@ -89,6 +102,8 @@ def mock_auth_service(mocker):
     auth_mock.generate_access_token.return_value = 'mock_access_token'
     auth_mock.generate_refresh_token.return_value = 'mock_refresh_token'
 
+    auth_mock.hash_pwd = AsyncMock()
+    auth_mock.verify_pwd = AsyncMock()
     mocker.patch('app.userapp.service.hash_pwd', auth_mock.hash_pwd)
     mocker.patch('app.userapp.service.verify_pwd', auth_mock.verify_pwd)
     auth_mock.hash_pwd.return_value = 'hashed_password_123'
@@ -1,14 +1,28 @@
 import uuid
 import pytest
+from unittest.mock import Mock
 from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.auth.dependencies import get_current_user
-from app.fileapp.entities import DocumentCollectionFile
+from app.auth.dependencies import get_current_user, get_current_user_id
+from app.fileapp.blob_cache import get_blob_cache
+from app.fileapp.entities import Blob, DocumentCollectionFile
 from app.fileapp.services.base_service import FileService
+from app.fileapp.storage.base import StorageBackend
 from tests.userapp.conftest import make_test_user
 
 
+def _blob_for(checksum: str, storage_path: str, size: int, mime_type: str, refcount: int = 1) -> Blob:
+    return Blob(checksum=checksum, storage_path=storage_path, size=size, mime_type=mime_type, refcount=refcount)
+
+
+@pytest.fixture(autouse=True)
+def fresh_blob_cache():
+    get_blob_cache.cache_clear()
+    yield
+    get_blob_cache.cache_clear()
+
+
 @pytest.fixture
 def file_service(db_session):
     return FileService(db=db_session)
@@ -16,7 +30,7 @@ def file_service(db_session):
 
 @pytest.fixture
 def mock_file_service(mock_db_session):
-    return FileService(db=mock_db_session)
+    return FileService(db=mock_db_session, storage=Mock(spec=StorageBackend))
 
 
 @pytest.fixture
@@ -25,7 +39,7 @@ def sample_file_entity(make_test_user):
         id=1,
         title="test_file.pdf",
         is_active=True,
-        file_path="/uploads/deadbeef.pdf",
+        blob=_blob_for("a" * 64, "/uploads/deadbeef.pdf", 1024, "application/pdf"),
         file_size=1024,
         mime_type="application/pdf",
         extension=".pdf",
@@ -44,7 +58,7 @@ def multiple_file_entities(make_test_user):
             id=i,
             title=f"file_{i}.txt",
             is_active=True,
-            file_path=f"/uploads/{'0' * 60}{i:04d}.txt",
+            blob=_blob_for(f"{i:064d}", f"/uploads/{'0' * 60}{i:04d}.txt", 512 * i, "text/plain"),
             file_size=512 * i,
             mime_type="text/plain",
             extension=".txt",
@@ -65,7 +79,7 @@ def make_test_file(db_engine, make_test_user):
         file_record = DocumentCollectionFile(
             title="integration_test_file.txt",
             is_active=True,
-            file_path="/tmp/nonexistent_integration_test.txt",
+            blob=_blob_for(checksum, "/tmp/nonexistent_integration_test.txt", 256, "text/plain"),
             file_size=256,
             mime_type="text/plain",
             extension=".txt",
@@ -89,7 +103,7 @@ def make_test_file_with_physical(db_engine, make_test_user, tmp_path):
         file_record = DocumentCollectionFile(
             title="downloadable.txt",
             is_active=True,
-            file_path=str(physical_file),
+            blob=_blob_for(checksum, str(physical_file), physical_file.stat().st_size, "text/plain"),
             file_size=physical_file.stat().st_size,
             mime_type="text/plain",
             extension=".txt",
@@ -106,4 +120,5 @@ def make_test_file_with_physical(db_engine, make_test_user, tmp_path):
 @pytest.fixture
 def auth_headers(client, make_test_user):
     client.app.dependency_overrides[get_current_user] = lambda: make_test_user
+    client.app.dependency_overrides[get_current_user_id] = lambda: make_test_user.id
     return {"Authorization": "Bearer mock_token"}
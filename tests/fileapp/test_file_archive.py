@@ -0,0 +1,86 @@
+import gzip
+import io
+import zipfile
+
+import pytest
+
+from app.fileapp.archive import archive_names, stream_zip
+from app.fileapp.storage.memory import MemoryStorageBackend
+from app.fileapp.value_objects import BlobDownload
+
+TEXT = b"plain text that deflates well\n" * 2000
+PNG = bytes(range(256)) * 40
+
+
+def _download(storage, key, title, mime_type, content, stored=None, codec="identity"):
+    stored = content if stored is None else stored
+    storage.put_stream(key, io.BytesIO(stored))
+    return BlobDownload(
+        title=title,
+        checksum=key,
+        mime_type=mime_type,
+        file_size=len(content),
+        storage_path=key,
+        codec=codec,
+        stored_size=len(stored),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestStreamZip:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self.storage = MemoryStorageBackend()
+
+    def _archive(self, downloads):
+        chunks = list(stream_zip(downloads, self.storage))
+        return chunks, zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    def test_entries_roundtrip(self):
+        _, archive = self._archive([
+            _download(self.storage, "a", "notes.txt", "text/plain", TEXT),
+            _download(self.storage, "b", "image.png", "image/png", PNG),
+        ])
+
+        assert archive.testzip() is None
+        assert archive.read("notes.txt") == TEXT
+        assert archive.read("image.png") == PNG
+
+    def test_compressed_types_are_stored(self):
+        _, archive = self._archive([
+            _download(self.storage, "a", "notes.txt", "text/plain", TEXT),
+            _download(self.storage, "b", "image.png", "image/png", PNG),
+        ])
+
+        assert archive.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.getinfo("image.png").compress_type == zipfile.ZIP_STORED
+
+    def test_codec_blobs_are_inflated(self):
+        _, archive = self._archive([
+            _download(self.storage, "a", "notes.txt", "text/plain", TEXT, stored=gzip.compress(TEXT), codec="gzip"),
+        ])
+
+        assert archive.read("notes.txt") == TEXT
+
+    def test_streams_in_pieces(self):
+        big = bytes(range(256)) * 20_000
+        chunks, archive = self._archive([
+            _download(self.storage, "a", "one.png", "image/png", big),
+            _download(self.storage, "b", "two.png", "image/png", big),
+        ])
+
+        assert len(chunks) > 2
+        assert max(len(chunk) for chunk in chunks) < len(big)
+        assert archive.read("two.png") == big
+
+    def test_empty_archive_is_valid(self):
+        _, archive = self._archive([])
+
+        assert archive.namelist() == []
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_archive_names_are_unique_and_flat():
+    assert archive_names(["a.txt", "a.txt", "../etc/b.txt", "a.txt"]) == ["a.txt", "a (1).txt", "b.txt", "a (2).txt"]
@@ -0,0 +1,132 @@
+from datetime import date, datetime, timezone
+from unittest.mock import Mock
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import sessionmaker
+
+from app.audit.entities import AuditLog
+from app.audit.partitions import add_months, drop_partitions_before, ensure_partitions, partition_name
+from app.audit.writer import AuditEntry, AuditLogWriter
+from app.main import app
+
+
+def _entry(request_id, path="/api/files"):
+    return AuditEntry(
+        request_id=request_id,
+        occurred_at=datetime(2026, 10, 17, tzinfo=timezone.utc),
+        user_id=1,
+        method="GET",
+        path=path,
+        status_code=200,
+        duration_ms=1.5,
+        bytes_in=0,
+        bytes_out=10,
+    )
+
+
+@pytest.fixture
+def session_factory(db_engine):
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+    yield factory
+    with factory() as db:
+        db.execute(delete(AuditLog))
+        db.commit()
+
+
+def _rows(session_factory):
+    with session_factory() as db:
+        return db.scalars(select(AuditLog).order_by(AuditLog.request_id)).all()
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestAuditLogWriter:
+    def test_flushes_in_batches(self, session_factory):
+        writer = AuditLogWriter(batch_size=2, max_buffer=10, session_factory=session_factory)
+        for i in range(5):
+            writer.record(_entry(f"r{i}"))
+
+        assert writer.flush() == 5
+
+        assert [row.request_id for row in _rows(session_factory)] == ["r0", "r1", "r2", "r3", "r4"]
+        stats = writer.stats()
+        assert (stats.buffered, stats.written, stats.dropped, stats.failed) == (0, 5, 0, 0)
+
+    def test_drops_when_buffer_is_full(self, session_factory):
+        writer = AuditLogWriter(batch_size=10, max_buffer=2, session_factory=session_factory)
+        for i in range(3):
+            writer.record(_entry(f"r{i}"))
+
+        assert writer.stats().dropped == 1
+        assert writer.flush() == 2
+
+    def test_counts_failed_batches_and_keeps_going(self, session_factory):
+        writer = AuditLogWriter(batch_size=2, max_buffer=10, session_factory=session_factory)
+        for request_id in ("dup", "dup", "ok"):
+            writer.record(_entry(request_id))
+
+        assert writer.flush() == 1
+
+        assert [row.request_id for row in _rows(session_factory)] == ["ok"]
+        assert writer.stats().failed == 2
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+def test_requests_are_recorded_and_flushed_on_shutdown(session_factory, mocker):
+    writer = AuditLogWriter(batch_size=100, max_buffer=100, session_factory=session_factory)
+    mocker.patch("app.config.settings.audit_log_enabled", True)
+    mocker.patch("app.audit.writer.get_audit_writer", return_value=writer)
+    mocker.patch("app.middleware.logging_context.get_audit_writer", return_value=writer)
+
+    with TestClient(app) as client:
+        response = client.post("/api/not-a-route", json={"name": "x"})
+        assert _rows(session_factory) == []
+
+    (row,) = _rows(session_factory)
+    assert (row.method, row.path, row.status_code, row.user_id) == ("POST", "/api/not-a-route", 404, None)
+    assert row.bytes_in == len(response.request.content)
+    assert row.bytes_out == len(response.content)
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+def test_signed_url_tokens_are_not_recorded(session_factory, mocker):
+    writer = AuditLogWriter(batch_size=100, max_buffer=100, session_factory=session_factory)
+    mocker.patch("app.config.settings.audit_log_enabled", True)
+    mocker.patch("app.audit.writer.get_audit_writer", return_value=writer)
+    mocker.patch("app.middleware.logging_context.get_audit_writer", return_value=writer)
+
+    with TestClient(app) as client:
+        client.get("/api/files/signed/download/abc.def")
+
+    (row,) = _rows(session_factory)
+    assert (row.path, row.status_code) == ("/api/files/signed/download/***", 403)
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestAuditPartitions:
+    def test_month_arithmetic_and_names(self):
+        assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+        assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert partition_name(date(2026, 3, 1)) == "audit_log_2026_03"
+
+    def test_noop_without_partitioning(self, db_session):
+        if db_session.get_bind().dialect.name == "postgresql":
+            pytest.skip("sqlite only")
+
+        assert ensure_partitions(db_session, date(2026, 10, 17)) == []
+        assert drop_partitions_before(db_session, date(2026, 4, 1)) == []
+
+    def test_failed_month_is_skipped(self):
+        db = Mock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.scalar.side_effect = [SQLAlchemyError("default partition holds rows"), "audit_log_2026_11"]
+
+        assert ensure_partitions(db, date(2026, 10, 17)) == ["audit_log_2026_11"]
+        db.rollback.assert_called_once()
+        db.commit.assert_called_once()
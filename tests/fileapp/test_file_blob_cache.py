@@ -0,0 +1,71 @@
+import pytest
+from prometheus_client import REGISTRY
+
+from app.fileapp.blob_cache import BlobCache
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestBlobCache:
+    def test_hit_and_miss_counted(self):
+        cache = BlobCache(max_bytes=100, max_object_bytes=10)
+        cache.put("a", "identity", b"12345")
+
+        assert cache.get("a", "identity") == b"12345"
+        assert cache.get("b", "identity") is None
+        assert (cache.stats().hits, cache.stats().misses) == (1, 1)
+
+    def test_codec_is_part_of_the_key(self):
+        cache = BlobCache(max_bytes=100, max_object_bytes=10)
+        cache.put("a", "gzip", b"packed")
+
+        assert cache.get("a", "identity") is None
+
+    def test_oversized_objects_rejected(self):
+        cache = BlobCache(max_bytes=100, max_object_bytes=10)
+
+        assert cache.put("a", "identity", b"x" * 11) is False
+        assert cache.stats().entries == 0
+
+    def test_evicts_least_recently_used_within_budget(self):
+        cache = BlobCache(max_bytes=20, max_object_bytes=10)
+        cache.put("a", "identity", b"a" * 10)
+        cache.put("b", "identity", b"b" * 10)
+        cache.get("a", "identity")
+        cache.put("c", "identity", b"c" * 10)
+
+        assert cache.get("b", "identity") is None
+        assert cache.get("a", "identity") is not None
+        stats = cache.stats()
+        assert (stats.evictions, stats.entries, stats.size) == (1, 2, 20)
+
+    def test_discard_drops_every_codec(self):
+        cache = BlobCache(max_bytes=100, max_object_bytes=10)
+        cache.put("a", "identity", b"plain")
+        cache.put("a", "gzip", b"packed")
+
+        cache.discard("a")
+
+        assert cache.stats().entries == 0
+        assert cache.stats().size == 0
+
+    def test_zero_budget_disables(self):
+        cache = BlobCache(max_bytes=0, max_object_bytes=10)
+
+        assert cache.fits(1) is False
+
+    def test_exported_as_metrics(self):
+        def sample(name, **labels):
+            return REGISTRY.get_sample_value(name, labels) or 0
+
+        before = (sample("blob_cache_lookups_total", result="hit"), sample("blob_cache_lookups_total", result="miss"),
+                  sample("blob_cache_evictions_total"), sample("blob_cache_bytes"))
+        cache = BlobCache(max_bytes=10, max_object_bytes=10)
+        cache.put("a", "identity", b"a" * 10)
+        cache.put("b", "identity", b"b" * 6)
+        cache.get("a", "identity")
+        cache.get("b", "identity")
+
+        after = (sample("blob_cache_lookups_total", result="hit"), sample("blob_cache_lookups_total", result="miss"),
+                 sample("blob_cache_evictions_total"), sample("blob_cache_bytes"))
+        assert tuple(a - b for a, b in zip(after, before)) == (1, 1, 1, 6)
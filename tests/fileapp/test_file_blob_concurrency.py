@@ -0,0 +1,120 @@
+import hashlib
+import io
+import random
+import threading
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database.core import Base
+from app.fileapp.entities import Blob, DocumentCollectionFile
+from app.fileapp.exceptions import FileNotFoundException
+from app.fileapp.services.base_service import FileService
+from app.fileapp.services.upload_service import FileUploadService
+from app.fileapp.storage_layout import blob_relative_path
+
+CONTENT = b"identical content uploaded by every worker\n"
+CHECKSUM = hashlib.sha256(CONTENT).hexdigest()
+WORKERS = 8
+OPS_PER_WORKER = 25
+
+
+@pytest.fixture
+def stress_engine(db_engine, tmp_path):
+    """
+    separate connections per thread; the shared in-memory test engine would serialize everything
+    """
+    if db_engine.dialect.name == "postgresql":
+        yield db_engine
+        return
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'stress.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, mocker):
+    directory = tmp_path / "uploads"
+    mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", directory)
+    return directory
+
+
+def _upload(session_factory, user_id):
+    upload = Mock()
+    upload.filename = "same.txt"
+    upload.file = io.BytesIO(CONTENT)
+    with session_factory() as db:
+        return FileUploadService(db=db).upload_file(file=upload, user_id=user_id).id
+
+
+def _delete(session_factory, user_id, file_id):
+    with session_factory() as db:
+        try:
+            FileService(db=db).delete_file(user_id=user_id, file_id=file_id)
+        except FileNotFoundException:
+            pass
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+@pytest.mark.fileapp
+def test_parallel_identical_uploads_and_deletes_keep_blob_consistent(stress_engine, upload_dir, make_test_user):
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=stress_engine)
+    user_id = make_test_user.id
+    errors = []
+    start = threading.Barrier(WORKERS)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        owned = []
+        start.wait()
+        try:
+            for _ in range(OPS_PER_WORKER):
+                if owned and rng.random() < 0.45:
+                    _delete(session_factory, user_id, owned.pop(rng.randrange(len(owned))))
+                else:
+                    owned.append(_upload(session_factory, user_id))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(WORKERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+    with session_factory() as db:
+        blob = db.get(Blob, CHECKSUM)
+        active = db.scalar(
+            select(func.count())
+            .select_from(DocumentCollectionFile)
+            .where(DocumentCollectionFile.checksum == CHECKSUM, DocumentCollectionFile.is_active.is_(True))
+        )
+
+    assert blob.refcount == active
+    assert (upload_dir / blob_relative_path(CHECKSUM, ".txt")).exists() == (active > 0)
+    assert list((upload_dir / "tmp").iterdir()) == []
+
+    for file_id in _active_ids(session_factory):
+        _delete(session_factory, user_id, file_id)
+
+    with session_factory() as db:
+        assert db.get(Blob, CHECKSUM).refcount == 0
+    assert not (upload_dir / blob_relative_path(CHECKSUM, ".txt")).exists()
+
+
+def _active_ids(session_factory):
+    with session_factory() as db:
+        return db.scalars(
+            select(DocumentCollectionFile.id)
+            .where(DocumentCollectionFile.checksum == CHECKSUM, DocumentCollectionFile.is_active.is_(True))
+        ).all()
@@ -0,0 +1,111 @@
+import hashlib
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.database.core import Base
+from app.fileapp.entities import Blob, DocumentCollectionFile
+from app.fileapp.services.relocation_service import BlobRelocationService
+from app.fileapp.storage_layout import blob_relative_path
+
+
+@pytest.fixture
+def db_session():
+    """
+    relocation walks the whole blobs table, so it gets a database of its own
+    """
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with Session(bind=engine) as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, mocker):
+    mocker.patch("app.fileapp.services.relocation_service.settings.upload_dir", tmp_path)
+    return tmp_path
+
+
+def _flat_blob(db_session, upload_dir, content: bytes, refcount: int = 1, on_disk: bool = True) -> Blob:
+    checksum = hashlib.sha256(content).hexdigest()
+    path = upload_dir / f"{checksum}.txt"
+    if on_disk:
+        path.write_bytes(content)
+    blob = Blob(checksum=checksum, storage_path=str(path), size=len(content), mime_type="text/plain", refcount=refcount)
+    db_session.add(blob)
+    db_session.commit()
+    return blob
+
+
+def test_blob_relative_path_fans_out_on_checksum_prefix():
+    checksum = "abcd" + "0" * 60
+
+    assert str(blob_relative_path(checksum, ".pdf")) == f"ab/cd/{checksum}.pdf"
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestBlobRelocation:
+    def test_relocates_flat_blobs_in_batches(self, db_session, upload_dir):
+        blobs = [_flat_blob(db_session, upload_dir, f"content {i}".encode()) for i in range(5)]
+        record = DocumentCollectionFile(
+            title="a.txt", file_size=blobs[0].size, mime_type="text/plain", extension=".txt",
+            checksum=blobs[0].checksum, user_id=1,
+        )
+        db_session.add(record)
+        db_session.commit()
+
+        relocated = BlobRelocationService(db_session).relocate_all(batch_size=2)
+
+        assert relocated == 5
+        db_session.expire_all()
+        for blob in blobs:
+            target = upload_dir / blob_relative_path(blob.checksum, ".txt")
+            assert db_session.get(Blob, blob.checksum).storage_path == blob_relative_path(blob.checksum, ".txt").as_posix()
+            assert target.exists()
+            assert not (upload_dir / f"{blob.checksum}.txt").exists()
+        assert db_session.get(DocumentCollectionFile, record.id).storage_path == (
+            blob_relative_path(blobs[0].checksum, ".txt").as_posix()
+        )
+
+    def test_rerun_is_a_no_op(self, db_session, upload_dir):
+        _flat_blob(db_session, upload_dir, b"only once")
+        service = BlobRelocationService(db_session)
+        service.relocate_all()
+
+        assert service.relocate_all() == 0
+
+    def test_relocates_legacy_paths_relative_to_the_working_directory(self, db_session, upload_dir, monkeypatch):
+        monkeypatch.chdir(upload_dir.parent)
+        blob = _flat_blob(db_session, upload_dir, b"baseline upload")
+        blob.storage_path = f"{upload_dir.name}/{blob.checksum}.txt"
+        db_session.commit()
+
+        assert BlobRelocationService(db_session).relocate_blob(blob.checksum) is True
+
+        db_session.expire_all()
+        key = blob_relative_path(blob.checksum, ".txt").as_posix()
+        assert db_session.get(Blob, blob.checksum).storage_path == key
+        assert (upload_dir / key).read_bytes() == b"baseline upload"
+        assert not (upload_dir / f"{blob.checksum}.txt").exists()
+
+    def test_live_blob_without_file_keeps_its_path(self, db_session, upload_dir):
+        blob = _flat_blob(db_session, upload_dir, b"lost on disk", on_disk=False)
+        recorded = blob.storage_path
+
+        assert BlobRelocationService(db_session).relocate_blob(blob.checksum) is False
+
+        db_session.expire_all()
+        assert db_session.get(Blob, blob.checksum).storage_path == recorded
+
+    def test_zero_ref_blob_without_file_only_rewrites_path(self, db_session, upload_dir):
+        blob = _flat_blob(db_session, upload_dir, b"already deleted", refcount=0, on_disk=False)
+
+        BlobRelocationService(db_session).relocate_blob(blob.checksum)
+
+        db_session.expire_all()
+        key = blob_relative_path(blob.checksum, ".txt").as_posix()
+        assert db_session.get(Blob, blob.checksum).storage_path == key
+        assert not (upload_dir / key).exists()
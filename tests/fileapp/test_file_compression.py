@@ -0,0 +1,64 @@
+import pytest
+
+from app.fileapp import compression
+from app.fileapp.compression import accepts_encoding, compress_file, decompress_chunks, is_compressible, resolve_codec
+
+CONTENT = b"a fairly repetitive line of text\n" * 5000
+
+
+def _roundtrip(tmp_path, codec):
+    source = tmp_path / "source"
+    source.write_bytes(CONTENT)
+    target = tmp_path / "target"
+
+    stored_size = compress_file(source, target, codec)
+    packed = target.read_bytes()
+    chunks = [packed[i:i + 1000] for i in range(0, len(packed), 1000)]
+
+    assert stored_size == len(packed) < len(CONTENT)
+    return b"".join(decompress_chunks(iter(chunks), codec))
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestCompression:
+    def test_gzip_roundtrip(self, tmp_path):
+        assert _roundtrip(tmp_path, "gzip") == CONTENT
+
+    def test_zstd_roundtrip(self, tmp_path):
+        pytest.importorskip("zstandard")
+
+        assert _roundtrip(tmp_path, "zstd") == CONTENT
+
+    def test_zstd_without_zstandard_fails(self, monkeypatch):
+        monkeypatch.setattr(compression, "zstandard", None)
+        resolve_codec.cache_clear()
+
+        with pytest.raises(RuntimeError, match="zstandard"):
+            resolve_codec("zstd")
+        resolve_codec.cache_clear()
+
+    def test_none_resolves_to_identity(self):
+        assert resolve_codec("none") == "identity"
+
+    @pytest.mark.parametrize("mime_type, expected", [
+        ("text/plain", True),
+        ("text/csv", True),
+        ("application/json", True),
+        ("application/pdf", False),
+        ("image/png", False),
+    ])
+    def test_is_compressible(self, mime_type, expected):
+        assert is_compressible(mime_type) is expected
+
+    @pytest.mark.parametrize("header, expected", [
+        ("gzip, deflate, br", True),
+        ("deflate, gzip;q=0.5", True),
+        ("identity", False),
+        ("", False),
+        ("*", True),
+        ("*, gzip;q=0", False),
+        ("GZIP", True),
+    ])
+    def test_accepts_encoding(self, header, expected):
+        assert accepts_encoding(header, "gzip") is expected
@@ -1,74 +1,56 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.fileapp.exceptions import FileNotFoundException, FileOperationException
 from app.fileapp.services.download_service import FileDownloadService
+from app.fileapp.storage.base import StorageBackend
 
 
 @pytest.fixture
 def mock_download_service(mock_db_session):
-    return FileDownloadService(db=mock_db_session)
+    return FileDownloadService(db=mock_db_session, storage=Mock(spec=StorageBackend))
 
 
 @pytest.mark.unit
 @pytest.mark.fileapp
 class TestFileDownloadService:
-    def test_get_file_path_success(self, mock_download_service, sample_file_entity):
-        mock_download_service.db.query.return_value.filter_by.return_value.first.return_value = (
-            sample_file_entity
-        )
-
-        with patch(
-            "app.fileapp.services.download_service.os.path.exists", return_value=True
-        ):
-            result = mock_download_service.get_file_path(user_id=1, file_id=1)
-
-        assert result.id == sample_file_entity.id
-        assert result.file_path == sample_file_entity.file_path
-
-    def test_get_file_path_not_found_in_db(self, mock_download_service):
+    def test_get_file_record_not_found(self, mock_download_service):
         mock_download_service.db.query.return_value.filter_by.return_value.first.return_value = (
             None
         )
 
         with pytest.raises(FileNotFoundException):
-            mock_download_service.get_file_path(user_id=1, file_id=999)
+            mock_download_service.get_file_record(user_id=99, file_id=1)
 
-    def test_get_file_path_physical_file_missing(
-        self, mock_download_service, sample_file_entity
-    ):
-        mock_download_service.db.query.return_value.filter_by.return_value.first.return_value = (
-            sample_file_entity
+        mock_download_service.db.query.return_value.filter_by.assert_called_with(
+            id=1, user_id=99, is_active=True
         )
 
-        with patch(
-            "app.fileapp.services.download_service.os.path.exists", return_value=False
-        ):
-            with pytest.raises(FileNotFoundException):
-                mock_download_service.get_file_path(user_id=1, file_id=1)
-
-    def test_get_file_path_returns_file_entity(self, mock_download_service, sample_file_entity):
+    def test_get_file_record_does_not_touch_storage(self, mock_download_service, sample_file_entity):
         mock_download_service.db.query.return_value.filter_by.return_value.first.return_value = (
             sample_file_entity
         )
 
-        with patch(
-            "app.fileapp.services.download_service.os.path.exists", return_value=True
-        ):
-            result = mock_download_service.get_file_path(user_id=1, file_id=1)
+        result = mock_download_service.get_file_record(user_id=1, file_id=1)
 
-        assert result.mime_type == sample_file_entity.mime_type
-        assert result.title == sample_file_entity.title
-        assert result.extension == sample_file_entity.extension
+        assert result is sample_file_entity
+        mock_download_service.storage.exists.assert_not_called()
 
-    def test_get_file_path_verifies_user_ownership(self, mock_download_service):
-        mock_download_service.db.query.return_value.filter_by.return_value.first.return_value = (
-            None
-        )
+    def test_get_blob_record_scoped_to_owner(self, mock_download_service):
+        query = mock_download_service.db.query.return_value.filter_by.return_value
+        query.order_by.return_value.first.return_value = None
 
         with pytest.raises(FileNotFoundException):
-            mock_download_service.get_file_path(user_id=99, file_id=1)
+            mock_download_service.get_blob_record(user_id=99, checksum="a" * 64)
 
         mock_download_service.db.query.return_value.filter_by.assert_called_with(
-            id=1, user_id=99, is_active=True
+            checksum="a" * 64, user_id=99, is_active=True
         )
+
+    def test_get_blob_record_database_error(self, mock_download_service):
+        query = mock_download_service.db.query.return_value.filter_by.return_value
+        query.order_by.return_value.first.side_effect = SQLAlchemyError("DB Error")
+
+        with pytest.raises(FileOperationException):
+            mock_download_service.get_blob_record(user_id=1, checksum="a" * 64)
@@ -0,0 +1,55 @@
+import hashlib
+import io
+
+import pytest
+
+from app.fileapp.ingest import FileIngest, ingest_stream
+
+
+class _DisconnectingStream(io.RawIOBase):
+    def read(self, size=-1):
+        raise OSError("client disconnected")
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestFileIngest:
+    def test_ingest_stream_computes_checksum_and_size(self, tmp_path):
+        content = b"hello ingest content\n" * 1000
+        target = tmp_path / "ingested.txt"
+
+        result = ingest_stream(io.BytesIO(content), target, chunk_size=4096)
+
+        assert result.path == target
+        assert result.checksum == hashlib.sha256(content).hexdigest()
+        assert result.file_size == len(content)
+        assert target.read_bytes() == content
+
+    def test_ingest_stream_sniffs_mime_from_leading_bytes(self, tmp_path):
+        content = b"%PDF-1.4\n" + b"\x00" * 200_000
+
+        result = ingest_stream(io.BytesIO(content), tmp_path / "doc.pdf", chunk_size=1024)
+
+        assert result.mime_type == "application/pdf"
+
+    def test_ingest_stream_empty_source(self, tmp_path):
+        result = ingest_stream(io.BytesIO(b""), tmp_path / "empty.txt")
+
+        assert result.file_size == 0
+        assert result.checksum == hashlib.sha256(b"").hexdigest()
+
+    def test_ingest_only_keeps_sniff_window(self, tmp_path):
+        ingest = FileIngest(tmp_path / "window.bin", sniff_size=16)
+        ingest.write(b"a" * 10)
+        ingest.write(b"b" * 10)
+
+        assert bytes(ingest._head) == b"a" * 10 + b"b" * 6
+        ingest.finish()
+
+    def test_ingest_stream_removes_partial_file_on_error(self, tmp_path):
+        target = tmp_path / "broken.txt"
+
+        with pytest.raises(OSError):
+            ingest_stream(_DisconnectingStream(), target)
+
+        assert not target.exists()
@@ -0,0 +1,273 @@
+import dataclasses
+import json
+import logging
+import queue
+
+import anyio
+import pytest
+import structlog.contextvars
+from prometheus_client import REGISTRY
+from structlog.testing import capture_logs
+
+from app.fileapp.responses import PATHSEND_EXTENSION
+from app.config import RouteLogPolicy
+from app.logger import BoundedQueueHandler
+from app.middleware.log_policy import LogPolicy, get_log_policies, resolve_log_policy
+from app.middleware.logging_context import LoggingContextMiddleware, redact_path
+
+
+def _scope(headers=(), extensions=None):
+    return {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/things",
+        "raw_path": b"/api/things",
+        "query_string": b"",
+        "headers": [(k.encode(), v.encode()) for k, v in headers],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+        "extensions": extensions or {},
+    }
+
+
+def _run(app, scope, chunks=(b"",)):
+    incoming = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    with capture_logs() as logs:
+        anyio.run(LoggingContextMiddleware(app), scope, receive, send)
+    return sent, {entry["event"]: entry for entry in logs}
+
+
+def _use_policy(mocker, **overrides):
+    policy = LogPolicy(sample_rate=1.0, capture_errors=True, max_payload_bytes=16384,
+                       header_allowlist=None, metadata_only=False)
+    mocker.patch("app.middleware.logging_context.resolve_log_policy",
+                 return_value=dataclasses.replace(policy, **overrides))
+
+
+def _echo_app(content_type=b"application/json", response_chunks=None, status=200):
+    """reads the whole request and sends it back in the given chunks"""
+    async def app(scope, receive, send):
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        await send({"type": "http.response.start", "status": status, "headers": [(b"content-type", content_type)]})
+        for chunk in response_chunks or [body]:
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+    return app
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestLoggingContextMiddleware:
+    def test_logs_small_json_bodies_masked_and_replays_them(self):
+        body = json.dumps({"name": "a", "password": "secret"}).encode()
+        scope = _scope([("content-type", "application/json"), ("content-length", str(len(body)))])
+
+        sent, logs = _run(_echo_app(), scope, [body[:5], body[5:]])
+
+        assert b"".join(m.get("body", b"") for m in sent[1:]) == body
+        assert logs["Request started"]["payload"] == {"name": "a", "password": "***"}
+        assert logs["Request finished"]["payload"] == {"name": "a", "password": "***"}
+        assert logs["Request finished"]["status_code"] == 200
+
+    def test_masks_urlencoded_forms(self):
+        body = b"username=a%40b.c&password=secret"
+        scope = _scope([("content-type", "application/x-www-form-urlencoded"), ("content-length", str(len(body)))])
+
+        _, logs = _run(_echo_app(), scope, [body])
+
+        assert logs["Request started"]["payload"] == {"username": "a@b.c", "password": "***"}
+
+    def test_multipart_streams_through_unlogged(self):
+        chunks = [b"--b\r\n", b"x" * 1000, b"--b--\r\n"]
+        scope = _scope([("content-type", "multipart/form-data; boundary=b"), ("content-length", "1012")])
+        seen = []
+
+        async def app(scope, receive, send):
+            while True:
+                message = await receive()
+                seen.append(message["body"])
+                if not message["more_body"]:
+                    break
+            await send({"type": "http.response.start", "status": 201, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        _, logs = _run(app, scope, chunks)
+
+        assert seen == chunks
+        assert logs["Request started"]["payload"] is None
+
+    def test_oversized_bodies_are_not_logged(self, mocker):
+        _use_policy(mocker, max_payload_bytes=8)
+        body = json.dumps({"name": "long enough"}).encode()
+        scope = _scope([("content-type", "application/json"), ("content-length", str(len(body)))])
+
+        sent, logs = _run(_echo_app(response_chunks=[body[:4], body[4:]]), scope, [body])
+
+        assert [m["body"] for m in sent[1:-1]] == [body[:4], body[4:]]
+        assert logs["Request started"]["payload"] is None
+        assert logs["Request finished"]["payload"] is None
+
+    def test_passes_pathsend_through_to_the_app(self):
+        seen = {}
+
+        async def app(scope, receive, send):
+            seen.update(scope["extensions"])
+            await send({"type": "http.response.start", "status": 200,
+                        "headers": [(b"content-disposition", b"attachment")]})
+            await send({"type": PATHSEND_EXTENSION, "path": "/blob"})
+
+        sent, logs = _run(app, _scope(extensions={PATHSEND_EXTENSION: {}}))
+
+        assert PATHSEND_EXTENSION in seen
+        assert sent[-1] == {"type": PATHSEND_EXTENSION, "path": "/blob"}
+        assert "Request finished (file response)" in logs
+
+    def test_redacts_signed_url_tokens_from_the_logged_path(self, mocker):
+        bind = mocker.spy(structlog.contextvars, "bind_contextvars")
+        path = "/api/files/signed/download/abc.def"
+        _run(_echo_app(), {**_scope(), "path": path, "raw_path": path.encode()})
+
+        assert bind.call_args_list[0].kwargs["path"] == "/api/files/signed/download/***"
+
+    def test_redact_path(self):
+        assert redact_path("/api/files/signed/upload/tok.sig") == "/api/files/signed/upload/***"
+        assert redact_path("/api/files/signed/download/tok.sig/") == "/api/files/signed/download/***/"
+        assert redact_path("/api/files/12/signed-url") == "/api/files/12/signed-url"
+
+    def test_logs_and_reraises_app_errors(self):
+        async def app(scope, receive, send):
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError), capture_logs() as logs:
+            anyio.run(LoggingContextMiddleware(app), _scope(), None, None)
+
+        assert logs[-1]["event"] == "Request failed with exception"
+
+
+def _json_request(payload, extra_headers=()):
+    body = json.dumps(payload).encode()
+    headers = [("content-type", "application/json"), ("content-length", str(len(body))), *extra_headers]
+    return _scope(headers), body
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestLoggingPolicies:
+    def test_unsampled_success_logs_no_payloads(self, mocker):
+        _use_policy(mocker, sample_rate=0.0)
+        scope, body = _json_request({"name": "a"})
+
+        sent, logs = _run(_echo_app(), scope, [body])
+
+        assert sent[1]["body"] == body
+        assert logs["Request started"]["payload"] is None
+        assert logs["Request finished"]["payload"] is None
+        assert "request_payload" not in logs["Request finished"]
+
+    def test_unsampled_errors_log_both_payloads(self, mocker):
+        _use_policy(mocker, sample_rate=0.0)
+        scope, body = _json_request({"name": "a", "password": "secret"})
+
+        _, logs = _run(_echo_app(status=422), scope, [body])
+
+        assert logs["Request started"]["payload"] is None
+        assert logs["Request finished"]["request_payload"] == {"name": "a", "password": "***"}
+        assert logs["Request finished"]["payload"] == {"name": "a", "password": "***"}
+
+    def test_errors_are_not_captured_when_disabled(self, mocker):
+        _use_policy(mocker, sample_rate=0.0, capture_errors=False)
+        scope, body = _json_request({"name": "a"})
+
+        _, logs = _run(_echo_app(status=500), scope, [body])
+
+        assert logs["Request finished"]["payload"] is None
+        assert "request_payload" not in logs["Request finished"]
+
+    def test_header_allowlist(self, mocker):
+        _use_policy(mocker, header_allowlist=frozenset({"user-agent", "authorization"}))
+        scope, body = _json_request({}, [("user-agent", "t"), ("authorization", "Bearer x"), ("cookie", "c")])
+
+        _, logs = _run(_echo_app(), scope, [body])
+
+        assert logs["Request started"]["headers"] == {"user-agent": "t", "authorization": "***"}
+        assert logs["Request finished"]["headers"] == {}
+
+    def test_metadata_only(self, mocker):
+        _use_policy(mocker, metadata_only=True)
+        scope, body = _json_request({"name": "a"})
+
+        _, logs = _run(_echo_app(status=500), scope, [body])
+
+        finished = logs["Request finished"]
+        assert (finished["payload"], finished["headers"], finished["status_code"]) == (None, None, 500)
+        assert finished["duration_ms"] >= 0
+
+    def test_route_policies_override_defaults_by_longest_prefix(self, mocker):
+        mocker.patch("app.middleware.log_policy.settings.log_header_allowlist", "User-Agent")
+        mocker.patch("app.middleware.log_policy.settings.log_route_policies", [
+            RouteLogPolicy(path_prefix="/api", sample_rate=0.5),
+            RouteLogPolicy(path_prefix="/api/files", sample_rate=0.01, header_allowlist=["X-Request-Id"]),
+        ])
+        get_log_policies.cache_clear()
+        try:
+            files, api, other = (resolve_log_policy(p) for p in ("/api/files/1", "/api/collection", "/login"))
+        finally:
+            get_log_policies.cache_clear()
+
+        assert (files.sample_rate, files.header_allowlist) == (0.01, frozenset({"x-request-id"}))
+        assert (api.sample_rate, api.header_allowlist) == (0.5, frozenset({"user-agent"}))
+        assert (other.sample_rate, other.capture_errors) == (1.0, True)
+
+
+def _record(msg, *args):
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestBoundedQueueHandler:
+    def test_drops_and_counts_when_full(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_seconds=None)
+        before = REGISTRY.get_sample_value("log_records_dropped_total") or 0
+
+        handler.handle(_record("kept"))
+        handler.handle(_record("dropped"))
+
+        assert handler.queue.qsize() == 1
+        assert handler.dropped == 1
+        assert REGISTRY.get_sample_value("log_records_dropped_total") == before + 1
+
+    def test_block_policy_waits_then_drops(self):
+        handler = BoundedQueueHandler(queue.Queue(maxsize=1), block_seconds=0.01)
+
+        handler.handle(_record("kept"))
+        handler.handle(_record("dropped"))
+
+        assert handler.dropped == 1
+
+    def test_queues_event_dicts_unrendered_and_merges_foreign_args(self):
+        handler = BoundedQueueHandler(queue.Queue(), block_seconds=None)
+        event = {"event": "hello", "user_id": 1}
+
+        handler.handle(_record(event))
+        handler.handle(_record("%s items", 3))
+
+        assert handler.queue.get_nowait().msg is event
+        foreign = handler.queue.get_nowait()
+        assert (foreign.msg, foreign.args) == ("3 items", None)
@@ -0,0 +1,100 @@
+import asyncio
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import QueuePool
+
+from app.auth.hashing import hash_pwd
+from app.database.pool import TimedQueuePool, instrument_pool
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestRequestMetrics:
+    def test_requests_are_labelled_by_route_template(self, client, auth_headers, make_test_file):
+        labels = {"method": "GET", "route": "/api/files/{file_id}"}
+        before = _sample("http_requests_total", status="200", **labels)
+        before_count = _sample("http_request_duration_seconds_count", **labels)
+
+        client.get(f"api/files/{make_test_file.id}", headers=auth_headers)
+        client.get(f"api/files/{make_test_file.id}", headers=auth_headers)
+
+        assert _sample("http_requests_total", status="200", **labels) == before + 2
+        assert _sample("http_request_duration_seconds_count", **labels) == before_count + 2
+
+    def test_body_bytes_are_counted_as_sent(self, client, auth_headers, make_test_file):
+        route = {"route": "/api/files/{file_id}"}
+        before = _sample("http_response_body_bytes_total", **route)
+
+        response = client.get(f"api/files/{make_test_file.id}", headers=auth_headers)
+
+        assert _sample("http_response_body_bytes_total", **route) == before + len(response.content)
+
+    def test_unmatched_paths_share_one_series(self, client):
+        labels = {"method": "GET", "route": "<unmatched>", "status": "404"}
+        before = _sample("http_requests_total", **labels)
+
+        client.get("/no/such/path/1")
+        client.get("/no/such/path/2")
+
+        assert _sample("http_requests_total", **labels) == before + 2
+
+    def test_metrics_endpoint_exposes_text_format(self, client):
+        client.get("/no/such/path")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in response.text
+        assert "db_pool_checked_out_connections" in response.text
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_password_hashing_is_timed():
+    before = _sample("password_hash_seconds_count")
+
+    asyncio.run(hash_pwd("password"))
+
+    assert _sample("password_hash_seconds_count") == before + 1
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_pool_reports_checked_out_and_overflow_once_per_checkout(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=QueuePool, pool_size=1, max_overflow=1)
+    instrument_pool(engine)
+    checked_out = _sample("db_pool_checked_out_connections")
+
+    first, second = engine.connect(), engine.connect()
+
+    assert _sample("db_pool_checked_out_connections") == checked_out + 2
+    assert _sample("db_pool_overflow_connections") == 1
+
+    first.close()
+    second.close()
+    assert _sample("db_pool_checked_out_connections") == checked_out
+    assert _sample("db_pool_overflow_connections") == 0
+    engine.dispose()
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_checkout_wait_is_timed_when_the_session_first_uses_the_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=TimedQueuePool)
+    waits = _sample("db_pool_wait_seconds_count")
+
+    with Session(engine) as db:
+        assert _sample("db_pool_wait_seconds_count") == waits
+        db.execute(text("select 1"))
+        db.execute(text("select 1"))
+
+    assert _sample("db_pool_wait_seconds_count") == waits + 1
+    engine.dispose()
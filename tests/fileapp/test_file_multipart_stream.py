@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+
+import pytest
+
+from app.fileapp.exceptions import MultipartStreamException
+from app.fileapp.multipart_stream import MultipartUploadStream, receive_multipart_upload
+
+_BOUNDARY = "testboundary1234"
+_CONTENT_TYPE = f"multipart/form-data; boundary={_BOUNDARY}"
+
+
+def _field_part(name: str, value: str) -> bytes:
+    return (
+        f"--{_BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{name}"\r\n\r\n'
+        f"{value}\r\n"
+    ).encode()
+
+
+def _file_part(filename: str, content: bytes, name: str = "file") -> bytes:
+    return (
+        f"--{_BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode() + content + b"\r\n"
+
+
+def _body(*parts: bytes) -> bytes:
+    return b"".join(parts) + f"--{_BOUNDARY}--\r\n".encode()
+
+
+def _feed_in_chunks(stream: MultipartUploadStream, body: bytes, size: int = 7) -> None:
+    for i in range(0, len(body), size):
+        stream.feed(body[i:i + size])
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestMultipartUploadStream:
+    def test_file_part_written_into_temp_dir(self, tmp_path):
+        content = b"streamed file content " * 50
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+
+        _feed_in_chunks(stream, _body(_file_part("notes.txt", content)))
+        result = stream.finish()
+
+        assert result.filename == "notes.txt"
+        assert result.ingested.path.parent == tmp_path
+        assert result.ingested.path.read_bytes() == content
+        assert result.ingested.checksum == hashlib.sha256(content).hexdigest()
+        assert result.ingested.file_size == len(content)
+
+    def test_form_fields_collected_before_and_after_file(self, tmp_path):
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+
+        _feed_in_chunks(stream, _body(
+            _field_part("document_id", "5"),
+            _file_part("notes.txt", b"abc"),
+            _field_part("extra", "value"),
+        ))
+        result = stream.finish()
+
+        assert result.fields == {"document_id": "5", "extra": "value"}
+
+    def test_too_many_form_fields_rejected(self, tmp_path, mocker):
+        mocker.patch("app.fileapp.multipart_stream.settings.upload_max_form_fields", 2)
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+
+        with pytest.raises(MultipartStreamException):
+            stream.feed(_body(*(_field_part("extra", "value") for _ in range(3)), _file_part("a.txt", b"a")))
+
+    def test_missing_boundary_raises(self, tmp_path):
+        with pytest.raises(MultipartStreamException):
+            MultipartUploadStream("multipart/form-data", tmp_path)
+
+    def test_no_file_part_raises(self, tmp_path):
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+        stream.feed(_body(_field_part("document_id", "5")))
+
+        with pytest.raises(MultipartStreamException):
+            stream.finish()
+
+    def test_second_file_part_rejected(self, tmp_path):
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+
+        with pytest.raises(MultipartStreamException):
+            stream.feed(_body(_file_part("a.txt", b"a"), _file_part("b.txt", b"b")))
+
+    def test_unexpected_file_field_rejected(self, tmp_path):
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+
+        with pytest.raises(MultipartStreamException):
+            stream.feed(_body(_file_part("a.txt", b"a", name="attachment")))
+
+    def test_truncated_body_raises_and_abort_cleans_up(self, tmp_path):
+        stream = MultipartUploadStream(_CONTENT_TYPE, tmp_path)
+        stream.feed(_file_part("notes.txt", b"partial content"))
+
+        with pytest.raises(MultipartStreamException):
+            stream.finish()
+        stream.abort()
+
+        assert list(tmp_path.iterdir()) == []
+
+    def test_receive_removes_temp_file_on_error(self, tmp_path):
+        async def body_stream():
+            yield _file_part("notes.txt", b"partial content")
+
+        with pytest.raises(MultipartStreamException):
+            asyncio.run(receive_multipart_upload(body_stream(), _CONTENT_TYPE, tmp_path))
+
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,69 @@
+import anyio
+import pytest
+
+from app.fileapp.responses import PATHSEND_EXTENSION, BlobFileResponse
+
+CONTENT = b"x" * 5000
+
+
+def _scope(method="GET", extensions=None):
+    return {
+        "type": "http",
+        "method": method,
+        "path": "/download",
+        "raw_path": b"/download",
+        "query_string": b"",
+        "headers": [],
+        "client": ("127.0.0.1", 1234),
+        "server": ("testserver", 80),
+        "scheme": "http",
+        "root_path": "",
+        "http_version": "1.1",
+        "extensions": extensions or {},
+    }
+
+
+async def _receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def _call(app, scope):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    anyio.run(app, scope, _receive, send)
+    return messages
+
+
+@pytest.fixture
+def blob_file(tmp_path):
+    path = tmp_path / "blob.bin"
+    path.write_bytes(CONTENT)
+    return path
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestBlobFileResponse:
+    def test_uses_pathsend_when_server_offers_it(self, blob_file):
+        messages = _call(BlobFileResponse(blob_file), _scope(extensions={PATHSEND_EXTENSION: {}}))
+
+        assert [m["type"] for m in messages] == ["http.response.start", PATHSEND_EXTENSION]
+        assert messages[1]["path"] == str(blob_file)
+
+    def test_streams_configured_chunks_without_pathsend(self, blob_file, mocker):
+        mocker.patch("app.fileapp.responses.settings.download_chunk_size", 2048)
+
+        messages = _call(BlobFileResponse(blob_file), _scope())
+
+        bodies = [m["body"] for m in messages if m["type"] == "http.response.body"]
+        assert [len(b) for b in bodies] == [2048, 2048, 904]
+        assert b"".join(bodies) == CONTENT
+
+    def test_head_request_does_not_pathsend(self, blob_file):
+        messages = _call(BlobFileResponse(blob_file), _scope(method="HEAD", extensions={PATHSEND_EXTENSION: {}}))
+
+        assert [m["type"] for m in messages] == ["http.response.start", "http.response.body"]
+
@@ -0,0 +1,102 @@
+import pytest
+from fastapi import status
+from sqlalchemy.orm import Session
+
+from app.fileapp.entities import DocumentCollectionFile
+from app.userapp.entities import DocumentUser
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestCreateFileFromChecksumRoute:
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        self._url = "api/files/from-checksum"
+
+    def _payload(self, source, **overrides):
+        payload = {
+            "title": "copy.txt",
+            "checksum": source.checksum,
+            "file_size": source.file_size,
+        }
+        payload.update(overrides)
+        return payload
+
+    def test_known_checksum_creates_file(self, client, auth_headers, make_test_file_with_physical):
+        response = client.post(self._url, json=self._payload(make_test_file_with_physical), headers=auth_headers)
+
+        assert response.status_code == status.HTTP_201_CREATED
+        body = response.json()
+        assert body["upload_required"] is False
+        assert body["data"]["title"] == "copy.txt"
+        assert body["data"]["checksum"] == make_test_file_with_physical.checksum
+        assert body["data"]["id"] != make_test_file_with_physical.id
+        assert response.headers["Location"] == f"/api/files/{body['data']['id']}"
+
+        download = client.get(f"api/files/{body['data']['id']}/download", headers=auth_headers)
+        assert download.content == b"hello test content for download"
+
+    def test_unknown_checksum_requires_upload(self, client, auth_headers, make_test_file_with_physical):
+        response = client.post(
+            self._url,
+            json=self._payload(make_test_file_with_physical, checksum="f" * 64),
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["upload_required"] is True
+        assert "data" not in response.json()
+
+    def test_size_mismatch_requires_upload(self, client, auth_headers, make_test_file_with_physical):
+        response = client.post(
+            self._url,
+            json=self._payload(make_test_file_with_physical, file_size=make_test_file_with_physical.file_size + 1),
+            headers=auth_headers,
+        )
+
+        assert response.json()["upload_required"] is True
+
+    def test_blob_only_referenced_by_another_user_requires_upload(
+        self, client, auth_headers, db_engine, make_test_file_with_physical
+    ):
+        with Session(bind=db_engine) as session:
+            other = DocumentUser(name="Other User", email="other-checksum@example.com", hashed_pwd="hashed_pwd_123")
+            session.add(other)
+            session.flush()
+            session.query(DocumentCollectionFile).filter_by(id=make_test_file_with_physical.id).update(
+                {"user_id": other.id}
+            )
+            session.commit()
+
+        response = client.post(self._url, json=self._payload(make_test_file_with_physical), headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["upload_required"] is True
+
+    def test_missing_physical_file_requires_upload(self, client, auth_headers, make_test_file):
+        response = client.post(self._url, json=self._payload(make_test_file), headers=auth_headers)
+
+        assert response.json()["upload_required"] is True
+
+    def test_extension_not_matching_content_returns_400(self, client, auth_headers, make_test_file_with_physical):
+        response = client.post(
+            self._url,
+            json=self._payload(make_test_file_with_physical, title="copy.pdf"),
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_invalid_checksum_format_returns_422(self, client, auth_headers):
+        response = client.post(
+            self._url,
+            json={"title": "copy.txt", "checksum": "not-a-sha", "file_size": 1},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_without_auth(self, client):
+        response = client.post(self._url, json={"title": "copy.txt", "checksum": "a" * 64, "file_size": 1})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
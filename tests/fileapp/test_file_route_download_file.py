@@ -1,6 +1,14 @@
+import io
+import uuid
+
 import pytest
 from fastapi import status
 
+from app.fileapp.blob_cache import get_blob_cache
+from app.fileapp.entities import Blob
+from app.fileapp.services import upload_service
+from app.fileapp.storage.memory import MemoryStorageBackend
+
 
 @pytest.mark.integration
 @pytest.mark.fileapp
@@ -50,3 +58,223 @@ class TestDownloadFileRoute:
         response = client.get(url, headers=auth_headers)
 
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_download_streams_from_backend_without_local_path(
+        self, client, auth_headers, make_test_file, mocker
+    ):
+        storage = MemoryStorageBackend()
+        storage.put_stream(make_test_file.storage_path, io.BytesIO(b"held in memory"))
+        mocker.patch("app.fileapp.services.base_service.get_storage_backend", return_value=storage)
+
+        url = self._url.format(file_id=make_test_file.id)
+        response = client.get(url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"held in memory"
+        assert response.headers["content-disposition"] == 'attachment; filename="integration_test_file.txt"'
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestDownloadCompressedFileRoute:
+    LINES = b"the quick brown fox jumps over the lazy dog\n" * 2000
+
+    @pytest.fixture(autouse=True)
+    def setup(self, client, auth_headers, db_session, mocker, tmp_path):
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+        mocker.patch("app.fileapp.services.upload_service.settings.storage_compression", "gzip")
+        # unique per test: the shared test database would otherwise dedup onto an earlier tmp_path
+        self.CONTENT = f"report {uuid.uuid4().hex}\n".encode() + self.LINES
+        response = client.post(
+            "api/files/upload",
+            files={"file": ("report.txt", self.CONTENT, "text/plain")},
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        self._url = f"api/files/{response.json()['data']['id']}/download"
+        self._blob = db_session.get(Blob, response.json()["data"]["checksum"])
+
+    def test_blob_is_stored_compressed(self):
+        assert self._blob.codec == "gzip"
+        assert self._blob.size == len(self.CONTENT)
+        assert self._blob.stored_size < self._blob.size
+
+    def test_dedup_hit_skips_compression(self, client, auth_headers, mocker):
+        compress = mocker.spy(upload_service, "compress_file")
+        response = client.post(
+            "api/files/upload",
+            files={"file": ("copy.txt", self.CONTENT, "text/plain")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        compress.assert_not_called()
+
+    def test_client_accepting_gzip_gets_stored_bytes(self, client, auth_headers):
+        response = client.get(self._url, headers={**auth_headers, "Accept-Encoding": "gzip"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) == self._blob.stored_size
+        assert response.headers["etag"] == f'"{self._blob.checksum}-gzip"'
+        assert response.content == self.CONTENT
+
+    def test_client_without_gzip_gets_inflated_content(self, client, auth_headers):
+        response = client.get(self._url, headers={**auth_headers, "Accept-Encoding": "identity"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert "content-encoding" not in response.headers
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.content == self.CONTENT
+        assert response.headers["etag"] == f'"{self._blob.checksum}"'
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestDownloadOffloadRoute:
+    @pytest.fixture(autouse=True)
+    def setup(self, client, auth_headers, db_session, mocker, tmp_path):
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+        self.CONTENT = f"offloaded {uuid.uuid4().hex}\n".encode()
+        response = client.post(
+            "api/files/upload",
+            files={"file": ("résumé notes.txt", self.CONTENT, "text/plain")},
+            headers=auth_headers,
+        )
+        assert response.status_code == status.HTTP_201_CREATED
+        self._url = f"api/files/{response.json()['data']['id']}/download"
+        self._blob = db_session.get(Blob, response.json()["data"]["checksum"])
+        self._tmp_path = tmp_path
+
+    def test_x_accel_redirect_points_at_internal_location(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.download_offload", "x-accel-redirect")
+        mocker.patch("app.fileapp.routers.download_file.settings.download_offload_prefix", "/protected-blobs/")
+
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b""
+        assert response.headers["x-accel-redirect"] == f"/protected-blobs/{self._blob.storage_path}"
+        assert response.headers["content-disposition"] == (
+            "attachment; filename*=utf-8''r%C3%A9sum%C3%A9%20notes.txt"
+        )
+        assert "text/plain" in response.headers["content-type"]
+
+    def test_x_sendfile_points_at_filesystem_path(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.download_offload", "x-sendfile")
+
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b""
+        assert response.headers["x-sendfile"] == str(self._tmp_path / self._blob.storage_path)
+
+    def test_offload_still_checks_ownership(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.download_offload", "x-accel-redirect")
+
+        response = client.get("api/files/999999/download", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        assert "x-accel-redirect" not in response.headers
+
+    def test_offload_disabled_serves_bytes(self, client, auth_headers):
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.content == self.CONTENT
+        assert "x-accel-redirect" not in response.headers
+        assert "x-sendfile" not in response.headers
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestDownloadCachingRoute:
+    @pytest.fixture(autouse=True)
+    def setup(self, make_test_file_with_physical):
+        self._file = make_test_file_with_physical
+        self._url = f"api/files/{self._file.id}/download"
+        self._blob_url = f"api/files/blobs/{self._file.checksum}"
+
+    def test_download_carries_strong_checksum_etag(self, client, auth_headers):
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.headers["etag"] == f'"{self._file.checksum}"'
+        assert response.headers["cache-control"] == "private, no-cache"
+
+    def test_matching_if_none_match_returns_304_without_storage(self, client, auth_headers, mocker):
+        exists = mocker.patch("app.fileapp.storage.local.LocalStorageBackend.exists")
+
+        response = client.get(
+            self._url, headers={**auth_headers, "If-None-Match": f'W/"other", "{self._file.checksum}"'}
+        )
+
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+        assert response.headers["etag"] == f'"{self._file.checksum}"'
+        exists.assert_not_called()
+
+    def test_stale_if_none_match_returns_content(self, client, auth_headers):
+        response = client.get(self._url, headers={**auth_headers, "If-None-Match": '"stale"'})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"hello test content for download"
+
+    def test_blob_url_disabled_by_default(self, client, auth_headers):
+        response = client.get(self._blob_url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_blob_url_is_immutable(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.immutable_blob_urls", True)
+
+        response = client.get(self._blob_url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"hello test content for download"
+        assert response.headers["etag"] == f'"{self._file.checksum}"'
+        assert "immutable" in response.headers["cache-control"]
+
+    def test_blob_url_requires_a_file_of_the_caller(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.immutable_blob_urls", True)
+
+        response = client.get(f"api/files/blobs/{'0' * 64}", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_blob_url_rejects_malformed_checksum(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.routers.download_file.settings.immutable_blob_urls", True)
+
+        response = client.get("api/files/blobs/not-a-checksum", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_small_blob_served_from_cache_without_storage(self, client, auth_headers, mocker):
+        assert client.get(self._url, headers=auth_headers).status_code == status.HTTP_200_OK
+        exists = mocker.patch("app.fileapp.storage.local.LocalStorageBackend.exists")
+        open_range = mocker.patch("app.fileapp.storage.local.LocalStorageBackend.open_range")
+
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"hello test content for download"
+        assert response.headers["etag"] == f'"{self._file.checksum}"'
+        assert get_blob_cache().stats().hits == 1
+        exists.assert_not_called()
+        open_range.assert_not_called()
+
+    def test_cache_skipped_for_blobs_over_object_limit(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.blob_cache.settings.blob_cache_max_object_bytes", 4)
+        get_blob_cache.cache_clear()
+
+        client.get(self._url, headers=auth_headers)
+
+        assert get_blob_cache().stats().entries == 0
+
+    def test_disabled_cache_serves_file_response(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.blob_cache.settings.blob_cache_max_bytes", 0)
+        get_blob_cache.cache_clear()
+
+        response = client.get(self._url, headers=auth_headers)
+
+        assert response.content == b"hello test content for download"
+        assert "last-modified" in response.headers
+        assert get_blob_cache().stats().misses == 0
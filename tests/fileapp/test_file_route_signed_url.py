@@ -0,0 +1,72 @@
+import uuid
+
+import pytest
+from fastapi import status
+
+from app.auth.dependencies import get_current_user
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestSignedUrlRoutes:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker, tmp_path):
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+
+    def _mint_upload(self, client, auth_headers, **payload):
+        response = client.post("api/files/signed-upload-url", json=payload, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()["data"]["url"]
+
+    def test_signed_download_needs_no_auth_or_db(self, client, auth_headers, make_test_file_with_physical, mocker):
+        response = client.post(f"api/files/{make_test_file_with_physical.id}/signed-url", headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        url = response.json()["data"]["url"]
+
+        client.app.dependency_overrides.pop(get_current_user)
+        query = mocker.patch("sqlalchemy.orm.Session.query")
+        response = client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.content == b"hello test content for download"
+        assert response.headers["etag"] == f'"{make_test_file_with_physical.checksum}"'
+        assert response.headers["cache-control"].startswith("public, max-age=")
+        query.assert_not_called()
+
+    def test_signed_download_url_requires_ownership(self, client, auth_headers):
+        response = client.post("api/files/999999/signed-url", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_tampered_download_token_forbidden(self, client, auth_headers, make_test_file_with_physical):
+        url = client.post(
+            f"api/files/{make_test_file_with_physical.id}/signed-url", headers=auth_headers
+        ).json()["data"]["url"]
+
+        response = client.get(url[:-2] + ("AA" if not url.endswith("AA") else "BB"))
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_non_ascii_download_token_forbidden(self, client):
+        response = client.get("api/files/signed/download/abc.%C3%A9")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_signed_upload_creates_file_for_grantee(self, client, auth_headers, make_test_user):
+        url = self._mint_upload(client, auth_headers, ttl_seconds=60)
+        client.app.dependency_overrides.pop(get_current_user)
+        content = f"signed upload {uuid.uuid4().hex}\n".encode()
+
+        response = client.post(url, files={"file": ("signed.txt", content, "text/plain")})
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.json()["data"]["user_id"] == make_test_user.id
+        assert response.json()["data"]["file_size"] == len(content)
+
+    def test_upload_token_cannot_download(self, client, auth_headers):
+        url = self._mint_upload(client, auth_headers)
+        token = url.rsplit("/", 1)[1]
+
+        response = client.get(f"api/files/signed/download/{token}")
+
+        assert response.status_code == status.HTTP_403_FORBIDDEN
@@ -0,0 +1,102 @@
+from datetime import datetime
+
+import pytest
+from fastapi import status
+
+from app.fileapp.exceptions import DocumentNotFoundException
+from app.fileapp.model import FileRead
+from app.fileapp.services.upload_service import FileUploadService
+from app.fileapp.storage_layout import blob_relative_path
+
+
+def _sample_file_read(**overrides):
+    data = dict(
+        id=1,
+        title="test.txt",
+        is_active=True,
+        file_size=13,
+        mime_type="text/plain",
+        extension=".txt",
+        checksum="deadbeef",
+        created_at=datetime.now(),
+        updated_at=None,
+        document_id=None,
+        user_id=1,
+    )
+    data.update(overrides)
+    return FileRead(**data)
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestUploadFileStreamRoute:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker, tmp_path):
+        self._url = "api/files/upload/stream"
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+        self._upload_dir = tmp_path
+
+    def test_upload_stream_success(self, client, auth_headers, mocker):
+        upload = mocker.patch.object(FileUploadService, "upload_streamed_file", return_value=_sample_file_read())
+
+        response = client.post(
+            self._url,
+            files={"file": ("test.txt", b"hello content", "text/plain")},
+            data={"document_id": "3"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        assert response.headers["Location"] == "/api/files/1"
+        streamed = upload.call_args.kwargs["upload"]
+        assert streamed.filename == "test.txt"
+        assert streamed.fields == {"document_id": "3"}
+        assert streamed.ingested.path.parent == self._upload_dir / "tmp"
+
+    def test_upload_stream_without_auth(self, client):
+        response = client.post(
+            self._url,
+            files={"file": ("test.txt", b"hello content", "text/plain")},
+        )
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_upload_stream_without_file_returns_400(self, client, auth_headers):
+        response = client.post(self._url, files={"document_id": (None, "3")}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_upload_stream_not_multipart_returns_400(self, client, auth_headers):
+        response = client.post(self._url, json={"file": "nope"}, headers=auth_headers)
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_upload_stream_document_not_found_returns_404(self, client, auth_headers, mocker):
+        mocker.patch.object(
+            FileUploadService,
+            "upload_streamed_file",
+            side_effect=DocumentNotFoundException("document_collection-99 does not exist"),
+        )
+
+        response = client.post(
+            self._url,
+            files={"file": ("test.txt", b"hello content", "text/plain")},
+            data={"document_id": "99"},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_upload_stream_persists_file(self, client, auth_headers):
+        response = client.post(
+            self._url,
+            files={"file": ("notes.txt", b"plain text streamed upload", "text/plain")},
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_201_CREATED
+        data = response.json()["data"]
+        assert data["title"] == "notes.txt"
+        assert data["file_size"] == len(b"plain text streamed upload")
+        assert list((self._upload_dir / "tmp").iterdir()) == []
+        assert (self._upload_dir / blob_relative_path(data["checksum"], ".txt")).exists()
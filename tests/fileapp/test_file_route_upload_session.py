@@ -0,0 +1,217 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import status
+
+from app.config import settings
+from app.fileapp import upload_parts
+from app.fileapp.entities import UploadSession
+from app.fileapp.services.upload_service import FileUploadService
+from app.fileapp.services.upload_session_service import STALE_COMPLETION, UploadSessionService
+
+
+@pytest.mark.integration
+@pytest.mark.fileapp
+class TestUploadSessionRoutes:
+    @pytest.fixture(autouse=True)
+    def setup(self, mocker, tmp_path):
+        self._sessions_url = "api/files/upload-sessions"
+        self._session_url = "api/files/upload-sessions/{session_id}"
+        self._part_url = "api/files/upload-sessions/{session_id}/parts/{part_number}"
+        self._complete_url = "api/files/upload-sessions/{session_id}/complete"
+        mocker.patch("app.fileapp.services.upload_service.settings.upload_dir", tmp_path)
+        self._sessions_dir = settings.upload_temp_path / "sessions"
+
+    def _create(self, client, auth_headers, **payload):
+        payload.setdefault("filename", "notes.txt")
+        response = client.post(self._sessions_url, json=payload, headers=auth_headers)
+        assert response.status_code == status.HTTP_201_CREATED
+        return response.json()["data"]["id"]
+
+    def test_parts_in_any_order_then_complete(self, client, auth_headers):
+        parts = [b"first part of the text file\n", b"second part\n", b"third and last part\n"]
+        content = b"".join(parts)
+        session_id = self._create(client, auth_headers, total_size=len(content))
+
+        for part_number in (3, 1, 2):
+            response = client.put(
+                self._part_url.format(session_id=session_id, part_number=part_number),
+                content=parts[part_number - 1],
+                headers=auth_headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+            assert response.json()["data"]["size"] == len(parts[part_number - 1])
+
+        session = client.get(self._session_url.format(session_id=session_id), headers=auth_headers)
+        assert session.json()["data"]["received_parts"] == [1, 2, 3]
+
+        complete = client.post(self._complete_url.format(session_id=session_id), headers=auth_headers)
+        assert complete.status_code == status.HTTP_201_CREATED
+        data = complete.json()["data"]
+        assert data["checksum"] == hashlib.sha256(content).hexdigest()
+        assert data["file_size"] == len(content)
+        assert complete.headers["Location"] == f"/api/files/{data['id']}"
+
+        gone = client.get(self._session_url.format(session_id=session_id), headers=auth_headers)
+        assert gone.status_code == status.HTTP_404_NOT_FOUND
+        assert not (self._sessions_dir / session_id).exists()
+
+    def test_resending_a_part_replaces_it(self, client, auth_headers):
+        session_id = self._create(client, auth_headers)
+        url = self._part_url.format(session_id=session_id, part_number=1)
+
+        client.put(url, content=b"truncated", headers=auth_headers)
+        client.put(url, content=b"complete text content\n", headers=auth_headers)
+        complete = client.post(self._complete_url.format(session_id=session_id), headers=auth_headers)
+
+        assert complete.json()["data"]["file_size"] == len(b"complete text content\n")
+
+    def test_complete_with_missing_part_returns_409(self, client, auth_headers):
+        session_id = self._create(client, auth_headers)
+        client.put(self._part_url.format(session_id=session_id, part_number=2), content=b"tail", headers=auth_headers)
+
+        response = client.post(self._complete_url.format(session_id=session_id), headers=auth_headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_complete_with_size_mismatch_returns_409(self, client, auth_headers):
+        session_id = self._create(client, auth_headers, total_size=100)
+        client.put(self._part_url.format(session_id=session_id, part_number=1), content=b"short", headers=auth_headers)
+
+        response = client.post(self._complete_url.format(session_id=session_id), headers=auth_headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+
+    def test_part_too_large_returns_413(self, client, auth_headers, mocker):
+        mocker.patch("app.fileapp.services.upload_session_service.settings.upload_part_max_size", 4)
+        session_id = self._create(client, auth_headers)
+
+        response = client.put(
+            self._part_url.format(session_id=session_id, part_number=1),
+            content=b"too large",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+        assert client.get(
+            self._session_url.format(session_id=session_id), headers=auth_headers
+        ).json()["data"]["received_parts"] == []
+
+    def test_expired_session_returns_410(self, client, auth_headers, db_session):
+        session_id = self._create(client, auth_headers)
+        session = db_session.get(UploadSession, session_id)
+        session.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db_session.commit()
+
+        response = client.put(
+            self._part_url.format(session_id=session_id, part_number=1),
+            content=b"late",
+            headers=auth_headers,
+        )
+
+        assert response.status_code == status.HTTP_410_GONE
+
+    def test_expired_sessions_purged_on_create(self, client, auth_headers, db_session):
+        expired_id = self._create(client, auth_headers)
+        session = db_session.get(UploadSession, expired_id)
+        session.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db_session.commit()
+
+        self._create(client, auth_headers)
+
+        db_session.expire_all()
+        assert db_session.get(UploadSession, expired_id) is None
+        assert not (self._sessions_dir / expired_id).exists()
+
+    def test_abort_removes_session(self, client, auth_headers):
+        session_id = self._create(client, auth_headers)
+        client.put(self._part_url.format(session_id=session_id, part_number=1), content=b"data", headers=auth_headers)
+
+        response = client.delete(self._session_url.format(session_id=session_id), headers=auth_headers)
+
+        assert response.status_code == status.HTTP_204_NO_CONTENT
+        assert not (self._sessions_dir / session_id).exists()
+
+    def test_completing_session_rejects_parts_and_abort(self, client, auth_headers, db_session):
+        session_id = self._create(client, auth_headers)
+        client.put(self._part_url.format(session_id=session_id, part_number=1), content=b"data", headers=auth_headers)
+        db_session.get(UploadSession, session_id).status = "completing"
+        db_session.commit()
+
+        part = client.put(self._part_url.format(session_id=session_id, part_number=2), content=b"late", headers=auth_headers)
+        abort = client.delete(self._session_url.format(session_id=session_id), headers=auth_headers)
+
+        assert part.status_code == status.HTTP_409_CONFLICT
+        assert abort.status_code == status.HTTP_409_CONFLICT
+        assert (self._sessions_dir / session_id / "000001").exists()
+
+    def test_part_streamed_while_completion_claims_the_session_is_dropped(self, client, auth_headers, db_session, mocker):
+        session_id = self._create(client, auth_headers)
+        commit = mocker.patch("app.fileapp.upload_parts.UploadPartWriter.commit")
+        real_drain = upload_parts.drain_stream
+
+        async def drain_then_claim(stream, write):
+            await real_drain(stream, write)
+            db_session.get(UploadSession, session_id).status = "completing"
+            db_session.commit()
+
+        mocker.patch("app.fileapp.upload_parts.drain_stream", drain_then_claim)
+
+        response = client.put(self._part_url.format(session_id=session_id, part_number=1), content=b"x", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_409_CONFLICT
+        commit.assert_not_called()
+
+    def test_purge_skips_sessions_being_completed(self, client, auth_headers, db_session):
+        session_id = self._create(client, auth_headers)
+        session = db_session.get(UploadSession, session_id)
+        session.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        session.status = "completing"
+        db_session.commit()
+
+        self._create(client, auth_headers)
+
+        db_session.expire_all()
+        assert db_session.get(UploadSession, session_id) is not None
+        assert (self._sessions_dir / session_id).exists()
+
+    def test_open_part_releases_the_connection_while_the_part_streams(
+            self, client, auth_headers, db_session, make_test_user):
+        session_id = self._create(client, auth_headers)
+        service = UploadSessionService(db_session, FileUploadService(db_session))
+
+        writer = service.open_part(user_id=make_test_user.id, session_id=session_id, part_number=1)
+
+        assert not db_session.in_transaction()
+        writer.abort()
+
+    def test_stale_completion_claims_are_purged(self, client, auth_headers, db_session):
+        session_id = self._create(client, auth_headers)
+        session = db_session.get(UploadSession, session_id)
+        session.expires_at = datetime.now(timezone.utc) - STALE_COMPLETION - timedelta(minutes=1)
+        session.status = "completing"
+        db_session.commit()
+
+        self._create(client, auth_headers)
+
+        db_session.expire_all()
+        assert db_session.get(UploadSession, session_id) is None
+        assert not (self._sessions_dir / session_id).exists()
+
+    def test_unknown_session_returns_404(self, client, auth_headers):
+        response = client.put(self._part_url.format(session_id="missing", part_number=1), content=b"x", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_part_number_returns_422(self, client, auth_headers):
+        session_id = self._create(client, auth_headers)
+
+        response = client.put(self._part_url.format(session_id=session_id, part_number=0), content=b"x", headers=auth_headers)
+
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+    def test_create_without_auth(self, client):
+        response = client.post(self._sessions_url, json={"filename": "notes.txt"})
+
+        assert response.status_code == status.HTTP_401_UNAUTHORIZED
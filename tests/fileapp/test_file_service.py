@@ -1,7 +1,8 @@
 import pytest
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 from sqlalchemy.exc import SQLAlchemyError, OperationalError
 
+from app.fileapp.entities import Blob
 from app.fileapp.exceptions import FileNotFoundException, FileOperationException
 
 
@@ -79,70 +80,86 @@ class TestFileServiceFetch:
 @pytest.mark.unit
 @pytest.mark.fileapp
 class TestFileServiceDelete:
+    @staticmethod
+    def _arrange(service, entity, refcount):
+        service.db.query.return_value.filter_by.return_value.first.return_value = entity
+        service.db.execute.return_value.rowcount = 1
+        service.db.execute.return_value.one_or_none.return_value = Mock(refcount=refcount)
+        service.db.get.return_value = Blob(
+            checksum=entity.checksum, storage_path=entity.storage_path, size=1, mime_type="text/plain", refcount=refcount
+        )
+
     def test_delete_file_soft_deletes_record(self, mock_file_service, sample_file_entity):
-        get_query = Mock()
-        get_query.filter_by.return_value.first.return_value = sample_file_entity
-        count_query = Mock()
-        count_query.filter.return_value.count.return_value = 1
-        mock_file_service.db.query.side_effect = [get_query, count_query]
+        self._arrange(mock_file_service, sample_file_entity, refcount=1)
 
-        with patch("app.fileapp.services.base_service.os.path.exists"), patch(
-            "app.fileapp.services.base_service.os.remove"
-        ) as mock_remove:
-            result = mock_file_service.delete_file(user_id=1, file_id=1)
+        result = mock_file_service.delete_file(user_id=1, file_id=1)
 
         assert result is True
-        assert sample_file_entity.is_active is False
+        deactivate = str(mock_file_service.db.execute.call_args_list[0].args[0])
+        assert "UPDATE document_files SET is_active" in deactivate
         mock_file_service.db.commit.assert_called_once()
-        mock_remove.assert_not_called()
+        mock_file_service.storage.delete.assert_not_called()
 
     def test_delete_file_hard_deletes_physical_when_last_ref(
         self, mock_file_service, sample_file_entity
     ):
-        get_query = Mock()
-        get_query.filter_by.return_value.first.return_value = sample_file_entity
-        count_query = Mock()
-        count_query.filter.return_value.count.return_value = 0
-        mock_file_service.db.query.side_effect = [get_query, count_query]
+        self._arrange(mock_file_service, sample_file_entity, refcount=0)
 
-        with patch(
-            "app.fileapp.services.base_service.os.path.exists", return_value=True
-        ), patch("app.fileapp.services.base_service.os.remove") as mock_remove:
-            mock_file_service.delete_file(user_id=1, file_id=1)
+        mock_file_service.delete_file(user_id=1, file_id=1)
 
-        mock_remove.assert_called_once_with(sample_file_entity.file_path)
+        mock_file_service.storage.delete.assert_called_once_with(sample_file_entity.storage_path)
 
     def test_delete_file_preserves_physical_when_other_refs_exist(
         self, mock_file_service, sample_file_entity
     ):
-        get_query = Mock()
-        get_query.filter_by.return_value.first.return_value = sample_file_entity
-        count_query = Mock()
-        count_query.filter.return_value.count.return_value = 2
-        mock_file_service.db.query.side_effect = [get_query, count_query]
+        self._arrange(mock_file_service, sample_file_entity, refcount=2)
 
-        with patch("app.fileapp.services.base_service.os.path.exists"), patch(
-            "app.fileapp.services.base_service.os.remove"
-        ) as mock_remove:
-            mock_file_service.delete_file(user_id=1, file_id=1)
+        mock_file_service.delete_file(user_id=1, file_id=1)
 
-        mock_remove.assert_not_called()
+        mock_file_service.storage.delete.assert_not_called()
 
-    def test_delete_file_skips_remove_if_physical_missing(
+    def test_delete_file_preserves_physical_when_blob_revived(
         self, mock_file_service, sample_file_entity
     ):
-        get_query = Mock()
-        get_query.filter_by.return_value.first.return_value = sample_file_entity
-        count_query = Mock()
-        count_query.filter.return_value.count.return_value = 0
-        mock_file_service.db.query.side_effect = [get_query, count_query]
+        self._arrange(mock_file_service, sample_file_entity, refcount=0)
+        mock_file_service.db.get.return_value.refcount = 1
 
-        with patch(
-            "app.fileapp.services.base_service.os.path.exists", return_value=False
-        ), patch("app.fileapp.services.base_service.os.remove") as mock_remove:
-            mock_file_service.delete_file(user_id=1, file_id=1)
+        mock_file_service.delete_file(user_id=1, file_id=1)
+
+        mock_file_service.storage.delete.assert_not_called()
 
-        mock_remove.assert_not_called()
+    def test_delete_file_tolerates_physical_already_missing(
+        self, mock_file_service, sample_file_entity
+    ):
+        self._arrange(mock_file_service, sample_file_entity, refcount=0)
+
+        mock_file_service.storage.delete.return_value = False
+
+        assert mock_file_service.delete_file(user_id=1, file_id=1) is True
+        mock_file_service.storage.delete.assert_called_once_with(sample_file_entity.storage_path)
+
+    def test_delete_file_already_deleted_does_not_decrement(
+        self, mock_file_service, sample_file_entity
+    ):
+        self._arrange(mock_file_service, sample_file_entity, refcount=0)
+        mock_file_service.db.execute.return_value.rowcount = 0
+
+        mock_file_service.delete_file(user_id=1, file_id=1)
+
+        mock_file_service.db.execute.assert_called_once()
+        mock_file_service.storage.delete.assert_not_called()
+
+    def test_delete_file_decrements_blob_refcount_in_same_commit(
+        self, mock_file_service, sample_file_entity
+    ):
+        self._arrange(mock_file_service, sample_file_entity, refcount=1)
+
+        mock_file_service.delete_file(user_id=1, file_id=1)
+
+        statement = mock_file_service.db.execute.call_args[0][0]
+        assert "UPDATE blobs SET refcount" in str(statement)
+        mock_file_service.db.commit.assert_called_once()
+        mock_file_service.db.query.return_value.filter.assert_not_called()
 
     def test_delete_file_not_found(self, mock_file_service):
         mock_file_service.db.query.return_value.filter_by.return_value.first.return_value = None
@@ -1,19 +1,20 @@
 import uuid
 import pytest
 
-from app.fileapp.entities import DocumentCollectionFile
+from app.fileapp.entities import Blob, DocumentCollectionFile
 from app.fileapp.exceptions import FileNotFoundException
 
 
 def _make_file_record(user_id: int, document_id=None):
+    checksum = (uuid.uuid4().hex * 2)[:64]
     return DocumentCollectionFile(
         title="integration_file.txt",
         is_active=True,
-        file_path="/tmp/nonexistent.txt",
+        blob=Blob(checksum=checksum, storage_path="/tmp/nonexistent.txt", size=512, mime_type="text/plain", refcount=1),
         file_size=512,
         mime_type="text/plain",
         extension=".txt",
-        checksum=(uuid.uuid4().hex * 2)[:64],
+        checksum=checksum,
         user_id=user_id,
         document_id=document_id,
     )
@@ -91,6 +92,29 @@ class TestFileServiceIntegration:
         updated = db_session.get(DocumentCollectionFile, file_id)
         assert updated.is_active is False
 
+    def test_delete_shared_blob_unlinks_only_after_last_ref(self, file_service, db_session, make_test_user, tmp_path):
+        physical = tmp_path / "shared.txt"
+        physical.write_text("shared content")
+        first = _make_file_record(make_test_user.id)
+        first.blob.storage_path = str(physical)
+        first.blob.refcount = 2
+        second = _make_file_record(make_test_user.id)
+        second.checksum, second.blob = first.checksum, first.blob
+        db_session.add_all([first, second])
+        db_session.commit()
+
+        file_service.delete_file(user_id=make_test_user.id, file_id=first.id)
+
+        db_session.expire_all()
+        assert db_session.get(Blob, first.checksum).refcount == 1
+        assert physical.exists()
+
+        file_service.delete_file(user_id=make_test_user.id, file_id=second.id)
+
+        db_session.expire_all()
+        assert db_session.get(Blob, first.checksum).refcount == 0
+        assert not physical.exists()
+
     def test_delete_file_not_found(self, file_service, make_test_user):
         with pytest.raises(FileNotFoundException):
             file_service.delete_file(user_id=make_test_user.id, file_id=999999)
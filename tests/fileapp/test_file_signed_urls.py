@@ -0,0 +1,67 @@
+import pytest
+
+from app.fileapp import signed_urls
+from app.fileapp.exceptions import SignedUrlException
+from app.fileapp.signed_urls import resolve_ttl, sign_download, sign_upload, verify_download, verify_upload
+from app.fileapp.value_objects import BlobDownload, UploadGrant
+
+DOWNLOAD = BlobDownload(
+    title="report.txt",
+    checksum="a" * 64,
+    mime_type="text/plain",
+    file_size=10,
+    storage_path="aa/aa/" + "a" * 64 + ".txt",
+    codec="identity",
+    stored_size=10,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestSignedUrls:
+    def test_download_roundtrip(self):
+        token, expires = sign_download(DOWNLOAD, ttl=60)
+
+        assert verify_download(token) == (DOWNLOAD, expires)
+
+    def test_upload_roundtrip(self):
+        token, _ = sign_upload(UploadGrant(user_id=7, document_id=3), ttl=60)
+
+        assert verify_upload(token) == UploadGrant(user_id=7, document_id=3)
+
+    def test_tampered_payload_rejected(self):
+        token, _ = sign_upload(UploadGrant(user_id=7), ttl=60)
+        forged, _ = sign_upload(UploadGrant(user_id=8), ttl=60)
+
+        with pytest.raises(SignedUrlException):
+            verify_upload(f"{forged.split('.')[0]}.{token.split('.')[1]}")
+
+    def test_non_ascii_token_rejected(self):
+        with pytest.raises(SignedUrlException):
+            verify_download("abc.\u00e9")
+
+    def test_expired_token_rejected(self, monkeypatch):
+        token, expires = sign_download(DOWNLOAD, ttl=60)
+        monkeypatch.setattr(signed_urls.time, "time", lambda: expires + 1)
+
+        with pytest.raises(SignedUrlException, match="expired"):
+            verify_download(token)
+
+    def test_purpose_is_bound(self):
+        token, _ = sign_upload(UploadGrant(user_id=7), ttl=60)
+
+        with pytest.raises(SignedUrlException):
+            verify_download(token)
+
+    def test_other_secret_rejected(self, mocker):
+        token, _ = sign_download(DOWNLOAD, ttl=60)
+        mocker.patch("app.fileapp.signed_urls.settings.secret_key", "rotated")
+
+        with pytest.raises(SignedUrlException):
+            verify_download(token)
+
+    def test_ttl_is_capped(self, mocker):
+        mocker.patch("app.fileapp.signed_urls.settings.signed_url_max_ttl_seconds", 600)
+
+        assert resolve_ttl(None) == 300
+        assert resolve_ttl(10_000) == 600
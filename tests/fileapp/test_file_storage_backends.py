@@ -0,0 +1,90 @@
+import io
+from pathlib import Path
+
+import pytest
+
+from app.fileapp.storage.local import LocalStorageBackend
+from app.fileapp.storage.memory import MemoryStorageBackend
+from app.fileapp.storage_layout import legacy_key
+
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture(params=["local", "memory"])
+def storage(request, tmp_path):
+    if request.param == "local":
+        return LocalStorageBackend(tmp_path / "blobs")
+    return MemoryStorageBackend()
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestStorageBackend:
+    def test_put_stream_then_read_back(self, storage):
+        written = storage.put_stream("ab/cd/key.bin", io.BytesIO(CONTENT))
+
+        assert written == len(CONTENT)
+        assert b"".join(storage.open_range("ab/cd/key.bin", chunk_size=1000)) == CONTENT
+
+    def test_open_range_returns_the_requested_slice(self, storage):
+        storage.put_stream("key", io.BytesIO(CONTENT))
+
+        assert b"".join(storage.open_range("key", start=100, length=3000, chunk_size=512)) == CONTENT[100:3100]
+        assert b"".join(storage.open_range("key", start=len(CONTENT) - 5)) == CONTENT[-5:]
+
+    def test_put_file_consumes_the_source(self, storage, tmp_path):
+        source = tmp_path / "temp_upload"
+        source.write_bytes(CONTENT)
+
+        storage.put_file("key", source)
+
+        assert not source.exists()
+        assert b"".join(storage.open_range("key")) == CONTENT
+
+    def test_exists_stat_and_delete(self, storage):
+        assert storage.exists("key") is False
+        assert storage.stat("key") is None
+
+        storage.put_stream("key", io.BytesIO(CONTENT))
+
+        assert storage.exists("key") is True
+        assert storage.stat("key").size == len(CONTENT)
+        assert storage.delete("key") is True
+        assert storage.delete("key") is False
+        assert storage.exists("key") is False
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_local_backend_resolves_legacy_absolute_keys(tmp_path):
+    legacy = tmp_path / "flat.txt"
+    legacy.write_bytes(b"old layout")
+    storage = LocalStorageBackend(tmp_path / "blobs")
+
+    assert storage.exists(str(legacy))
+    assert storage.local_path(str(legacy)) == legacy
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+@pytest.mark.parametrize("upload_dir", ["uploads", "uploads/", "./uploads"])
+def test_legacy_relative_paths_become_keys(tmp_path, monkeypatch, upload_dir):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "uploads").mkdir()
+    (tmp_path / "uploads" / "abc.pdf").write_bytes(b"baseline upload")
+    storage = LocalStorageBackend(Path(upload_dir))
+
+    key = legacy_key("uploads/abc.pdf", Path(upload_dir))
+
+    assert key == "abc.pdf"
+    assert storage.exists(key)
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+def test_legacy_key_handles_absolute_paths_and_leaves_keys_alone(tmp_path):
+    upload_dir = tmp_path / "uploads"
+
+    assert legacy_key(str(upload_dir / "abc.pdf"), upload_dir) == "abc.pdf"
+    assert legacy_key("ab/cd/abcd.pdf", upload_dir) == "ab/cd/abcd.pdf"
+    assert legacy_key("/elsewhere/abc.pdf", upload_dir) == "/elsewhere/abc.pdf"
@@ -2,14 +2,18 @@ import io
 from datetime import datetime
 import pytest
 from unittest.mock import Mock, mock_open, patch
+from prometheus_client import REGISTRY
 from sqlalchemy.exc import SQLAlchemyError
 
+from app.fileapp.entities import Blob, DocumentCollectionFile
 from app.fileapp.exceptions import (
     DocumentNotFoundException,
     FileUploadException,
     InvalidFileTypeException,
+    MultipartStreamException,
 )
 from app.fileapp.services.upload_service import FileUploadService
+from app.fileapp.value_objects import IngestResult, StreamedUpload
 
 
 @pytest.fixture
@@ -25,6 +29,19 @@ def _make_upload_file(filename="test.txt", content=b"hello test content"):
     return f
 
 
+def _db_get(document=None, blob=None):
+    """db.get stand-in answering the document existence check and the blob lookup separately"""
+    return lambda model, key, **kwargs: blob if model is Blob else document
+
+
+def _dedup_count(result):
+    return REGISTRY.get_sample_value("file_dedup_total", {"source": "upload", "result": result}) or 0
+
+
+def _upload_bytes():
+    return REGISTRY.get_sample_value("file_upload_bytes_total") or 0
+
+
 def _refresh_side_effect(obj):
     """mimics what a real db.refresh() would populate after insert, for FileRead validation"""
     obj.id = 1
@@ -35,37 +52,78 @@ def _refresh_side_effect(obj):
 @pytest.mark.unit
 @pytest.mark.fileapp
 class TestFileUploadServiceUpload:
-    def test_upload_new_file_creates_db_record(self, upload_service, mocker):
+    def test_upload_new_file_creates_db_record(self, upload_service, mocker, tmp_path):
         mock_file = _make_upload_file("test.txt", b"hello content")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="text/plain",
         )
-        upload_service.db.query.return_value.filter_by.return_value.first.return_value = None
+        upload_service.db.get.side_effect = _db_get()
         upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
+        misses = _dedup_count("miss")
+        received = _upload_bytes()
 
         upload_service.upload_file(file=mock_file, user_id=1, document_id=None)
 
-        upload_service.db.add.assert_called_once()
+        assert _dedup_count("miss") == misses + 1
+        assert _upload_bytes() == received + len(b"hello content")
+        blob, record = [c.args[0] for c in upload_service.db.add.call_args_list]
+        assert isinstance(blob, Blob) and blob.refcount == 1
+        assert isinstance(record, DocumentCollectionFile) and record.checksum == blob.checksum
+        assert (tmp_path / blob.storage_path).exists()
         upload_service.db.commit.assert_called_once()
 
-    def test_upload_dedup_reuses_existing_file_path(self, upload_service, mocker):
+    def test_upload_dedup_increments_live_blob(self, upload_service, mocker):
         mock_file = _make_upload_file("test.txt", b"hello content")
-        existing = Mock()
-        existing.id = 42
-        existing.file_path = "/uploads/existing_deadbeef.txt"
+        existing = Blob(checksum="d" * 64, storage_path="/uploads/existing.txt", size=13, mime_type="text/plain", refcount=2)
 
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="text/plain",
         )
-        upload_service.db.query.return_value.filter_by.return_value.first.return_value = existing
+        mock_put = mocker.patch.object(upload_service.storage, "put_file")
+        upload_service.db.get.side_effect = _db_get(blob=existing)
         upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
+        hits = _dedup_count("hit")
 
         upload_service.upload_file(file=mock_file, user_id=1, document_id=None)
 
-        added_entity = upload_service.db.add.call_args[0][0]
-        assert added_entity.file_path == existing.file_path
+        assert _dedup_count("hit") == hits + 1
+        mock_put.assert_not_called()
+        upload_service.db.add.assert_called_once()
+        assert "refcount + " in str(existing.refcount)
+
+    def test_upload_revives_zero_ref_blob(self, upload_service, mocker, tmp_path):
+        mock_file = _make_upload_file("test.txt", b"hello content")
+        dead = Blob(checksum="d" * 64, storage_path="/uploads/gone.txt", size=13, mime_type="text/plain", refcount=0)
+
+        mocker.patch(
+            "app.fileapp.ingest.magic.from_buffer",
+            return_value="text/plain",
+        )
+        upload_service.db.get.side_effect = _db_get(blob=dead)
+        upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
+
+        upload_service.upload_file(file=mock_file, user_id=1, document_id=None)
+
+        assert dead.refcount == 1
+        assert (tmp_path / dead.storage_path).exists()
+
+    def test_upload_db_error_removes_newly_stored_file(self, upload_service, mocker, tmp_path):
+        mock_file = _make_upload_file("test.txt", b"hello content")
+        mocker.patch(
+            "app.fileapp.ingest.magic.from_buffer",
+            return_value="text/plain",
+        )
+        upload_service.db.get.side_effect = _db_get()
+        upload_service.db.commit.side_effect = SQLAlchemyError("DB Error")
+        received = _upload_bytes()
+
+        with pytest.raises(FileUploadException):
+            upload_service.upload_file(file=mock_file, user_id=1, document_id=None)
+
+        assert [p for p in tmp_path.rglob("*") if p.is_file()] == []
+        assert _upload_bytes() == received
 
     def test_upload_raises_document_not_found(self, upload_service):
         upload_service.db.get.return_value = None
@@ -78,7 +136,7 @@ class TestFileUploadServiceUpload:
     def test_upload_raises_invalid_type_bad_extension(self, upload_service, mocker):
         mock_file = _make_upload_file("malware.exe", b"MZ\x90\x00")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="application/x-dosexec",
         )
 
@@ -88,7 +146,7 @@ class TestFileUploadServiceUpload:
     def test_upload_raises_invalid_type_on_mime_mismatch(self, upload_service, mocker):
         mock_file = _make_upload_file("fake.txt", b"MZ\x90\x00")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="application/x-dosexec",
         )
 
@@ -98,10 +156,10 @@ class TestFileUploadServiceUpload:
     def test_upload_db_error_rolls_back(self, upload_service, mocker):
         mock_file = _make_upload_file("test.txt", b"hello content")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="text/plain",
         )
-        upload_service.db.query.return_value.filter_by.return_value.first.return_value = None
+        upload_service.db.get.side_effect = _db_get()
         upload_service.db.commit.side_effect = SQLAlchemyError("DB Error")
 
         with pytest.raises(FileUploadException):
@@ -112,7 +170,7 @@ class TestFileUploadServiceUpload:
     def test_upload_cleans_temp_file_on_invalid_type(self, upload_service, mocker):
         mock_file = _make_upload_file("fake.txt", b"content")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="application/x-dosexec",
         )
         mock_remove = mocker.patch("app.fileapp.services.upload_service.os.remove")
@@ -125,11 +183,10 @@ class TestFileUploadServiceUpload:
     def test_upload_with_valid_document_id_succeeds(self, upload_service, mocker):
         mock_file = _make_upload_file("test.txt", b"hello content")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="text/plain",
         )
-        upload_service.db.get.return_value = Mock()
-        upload_service.db.query.return_value.filter_by.return_value.first.return_value = None
+        upload_service.db.get.side_effect = _db_get(document=Mock())
         upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
 
         upload_service.upload_file(file=mock_file, user_id=1, document_id=5)
@@ -140,13 +197,62 @@ class TestFileUploadServiceUpload:
     def test_upload_sets_correct_user_id(self, upload_service, mocker):
         mock_file = _make_upload_file("test.txt", b"hello content")
         mocker.patch(
-            "app.fileapp.services.upload_service.magic.from_file",
+            "app.fileapp.ingest.magic.from_buffer",
             return_value="text/plain",
         )
-        upload_service.db.query.return_value.filter_by.return_value.first.return_value = None
+        upload_service.db.get.side_effect = _db_get()
         upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
 
         upload_service.upload_file(file=mock_file, user_id=42, document_id=None)
 
         added_entity = upload_service.db.add.call_args[0][0]
         assert added_entity.user_id == 42
+
+
+def _make_streamed_upload(tmp_path, filename="test.txt", content=b"hello content", fields=None):
+    temp_path = tmp_path / "temp_streamed"
+    temp_path.write_bytes(content)
+    ingested = IngestResult(path=temp_path, checksum="c" * 64, file_size=len(content), mime_type="text/plain")
+    return StreamedUpload(filename=filename, ingested=ingested, fields=fields or {})
+
+
+@pytest.mark.unit
+@pytest.mark.fileapp
+class TestFileUploadServiceStreamed:
+    def test_streamed_upload_creates_record(self, upload_service, tmp_path):
+        upload = _make_streamed_upload(tmp_path, fields={"document_id": "5"})
+        upload_service.db.get.side_effect = _db_get(document=Mock())
+        upload_service.db.refresh = Mock(side_effect=_refresh_side_effect)
+
+        upload_service.upload_streamed_file(upload=upload, user_id=7)
+
+        added_entity = upload_service.db.add.call_args[0][0]
+        assert added_entity.document_id == 5
+        assert added_entity.user_id == 7
+        assert added_entity.checksum == "c" * 64
+        assert not upload.ingested.path.exists()
+
+    def test_streamed_upload_invalid_document_id_removes_temp(self, upload_service, tmp_path):
+        upload = _make_streamed_upload(tmp_path, fields={"document_id": "abc"})
+
+        with pytest.raises(MultipartStreamException):
+            upload_service.upload_streamed_file(upload=upload, user_id=1)
+
+        assert not upload.ingested.path.exists()
+
+    def test_streamed_upload_document_not_found_removes_temp(self, upload_service, tmp_path):
+        upload = _make_streamed_upload(tmp_path, fields={"document_id": "99"})
+        upload_service.db.get.return_value = None
+
+        with pytest.raises(DocumentNotFoundException):
+            upload_service.upload_streamed_file(upload=upload, user_id=1)
+
+        assert not upload.ingested.path.exists()
+
+    def test_streamed_upload_invalid_type_removes_temp(self, upload_service, tmp_path):
+        upload = _make_streamed_upload(tmp_path, filename="malware.exe")
+
+        with pytest.raises(InvalidFileTypeException):
+            upload_service.upload_streamed_file(upload=upload, user_id=1)
+
+        assert not upload.ingested.path.exists()
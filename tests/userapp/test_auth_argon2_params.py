@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+from argon2 import PasswordHasher
+
+from app.auth import calibration
+from app.auth.calibration import CalibrationResult, calibrate, write_env
+from app.auth.hashing import current_parameter_version, hash_pwd, parameter_distribution, parameter_version
+from app.userapp.entities import DocumentUser
+from app.userapp.service import UserService
+
+
+def _fake_cost(per_pass_ms_at_64mib):
+    """latency model: linear in time_cost and memory"""
+    def measure_ms(time_cost, memory_cost, parallelism, samples):
+        return per_pass_ms_at_64mib * time_cost * memory_cost / 65536
+    return measure_ms
+
+
+@pytest.mark.unit
+@pytest.mark.userapp
+class TestArgon2Calibration:
+    def test_raises_time_cost_within_budget(self, monkeypatch):
+        monkeypatch.setattr(calibration, "measure_ms", _fake_cost(12))
+
+        result = calibrate(budget_ms=50, memory_cost=65536, parallelism=2)
+
+        assert (result.time_cost, result.memory_cost, result.median_ms) == (4, 65536, 48)
+
+    def test_halves_memory_when_one_pass_is_over_budget(self, monkeypatch):
+        monkeypatch.setattr(calibration, "measure_ms", _fake_cost(120))
+
+        result = calibrate(budget_ms=50, memory_cost=65536, parallelism=2)
+
+        # 16 MiB would fit but is below the floor, so the best it can do is 32 MiB at one pass
+        assert (result.time_cost, result.memory_cost) == (1, 32768)
+
+    def test_write_env_replaces_and_appends(self, tmp_path):
+        env = tmp_path / ".env"
+        env.write_text("SECRET_KEY=x\nARGON2_TIME_COST=3\n")
+
+        write_env(env, CalibrationResult(time_cost=2, memory_cost=32768, parallelism=1, median_ms=40, peak_rss_mib=90))
+
+        assert env.read_text().splitlines() == [
+            "SECRET_KEY=x", "ARGON2_TIME_COST=2", "ARGON2_MEMORY_COST=32768", "ARGON2_PARALLELISM=1",
+        ]
+
+
+@pytest.mark.unit
+@pytest.mark.userapp
+class TestParameterVersions:
+    def test_hash_uses_settings_parameters(self):
+        assert parameter_version(asyncio.run(hash_pwd("password"))) == current_parameter_version()
+
+    def test_distribution_counts_versions(self):
+        old = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("password")
+
+        distribution = parameter_distribution([old, old, asyncio.run(hash_pwd("password")), "$2b$12$notargon"])
+
+        assert distribution == {(1, 8, 1): 2, current_parameter_version(): 1, None: 1}
+
+
+@pytest.mark.integration
+@pytest.mark.userapp
+def test_service_reports_distribution_across_users(db_session, make_test_user):
+    total = db_session.query(DocumentUser).count()
+
+    distribution = UserService(db_session).password_parameter_distribution()
+
+    assert sum(distribution.values()) == total
+    assert distribution[parameter_version(make_test_user.hashed_pwd)] >= 1
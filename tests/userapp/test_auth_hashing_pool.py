@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import status
+from prometheus_client import REGISTRY
+
+from app.auth.exceptions import PasswordHashingBusyException
+from app.auth.hashing import hash_pwd, verify_pwd
+from app.auth.hashing_pool import PasswordHashingPool
+
+
+@pytest.mark.unit
+@pytest.mark.userapp
+class TestPasswordHashingPool:
+    def test_runs_on_pool_thread_and_counts(self):
+        pool = PasswordHashingPool(workers=1, queue_size=0)
+
+        assert pool.run(lambda: threading.current_thread().name).startswith("argon2")
+        stats = pool.stats()
+        assert (stats.completed, stats.queued, stats.running, stats.rejected) == (1, 0, 0, 0)
+        assert stats.run_seconds_total >= 0
+
+    def test_rejects_fast_when_saturated(self):
+        pool = PasswordHashingPool(workers=1, queue_size=0)
+        started, release = threading.Event(), threading.Event()
+        holder = threading.Thread(target=pool.run, args=(lambda: (started.set(), release.wait()),))
+        holder.start()
+        started.wait()
+
+        with pytest.raises(PasswordHashingBusyException):
+            pool.run(lambda: None)
+
+        release.set()
+        holder.join()
+        assert pool.stats().rejected == 1
+        assert pool.run(lambda: "free again") == "free again"
+
+    def test_exports_queued_and_running_gauges(self):
+        pool = PasswordHashingPool(workers=1, queue_size=0)
+
+        def sample(name):
+            return REGISTRY.get_sample_value(name) or 0
+
+        assert pool.run(lambda: (sample("password_hash_queued"), sample("password_hash_running"))) == (0, 1)
+        assert (sample("password_hash_queued"), sample("password_hash_running")) == (0, 0)
+
+    def test_exceptions_propagate(self):
+        pool = PasswordHashingPool(workers=1, queue_size=0)
+
+        with pytest.raises(ZeroDivisionError):
+            pool.run(lambda: 1 / 0)
+        assert pool.run(lambda: 1) == 1
+
+    def test_hash_and_verify_go_through_pool(self):
+        hashed = asyncio.run(hash_pwd("correct horse"))
+
+        assert asyncio.run(verify_pwd(hashed, "correct horse")) == (True, False)
+        assert asyncio.run(verify_pwd(hashed, "wrong horse")) == (False, False)
+
+    def test_run_async_awaits_without_blocking_the_loop(self):
+        pool = PasswordHashingPool(workers=1, queue_size=0)
+        release = threading.Event()
+
+        async def scenario():
+            pending = asyncio.ensure_future(pool.run_async(release.wait))
+            await asyncio.sleep(0)
+            # the loop keeps running while the pool task is blocked
+            assert not pending.done()
+            release.set()
+            return await pending
+
+        assert asyncio.run(scenario()) is True
+        assert pool.stats().completed == 1
+
+
+@pytest.mark.integration
+@pytest.mark.userapp
+def test_register_returns_503_when_hashing_saturated(client, valid_user_data, disable_rate_limiter, mocker):
+    pool = mocker.patch("app.auth.hashing.get_hashing_pool").return_value
+    pool.run_async.side_effect = PasswordHashingBusyException("too many concurrent sign-ins, retry shortly")
+
+    response = client.post("api/users/register", json=valid_user_data)
+
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+    assert response.headers["retry-after"] == "1"
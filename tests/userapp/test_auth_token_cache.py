@@ -0,0 +1,64 @@
+import pytest
+from fastapi import Request, status
+
+from app.auth import service as auth_service
+from app.auth import token_cache
+from app.auth.service import AuthenticationService
+from app.auth.token_cache import TokenCache, remember_verified_token, verified_token_user
+
+
+@pytest.mark.unit
+@pytest.mark.userapp
+class TestTokenCache:
+    def test_entry_lives_until_token_exp(self, monkeypatch):
+        monkeypatch.setattr(token_cache.time, "time", lambda: 1000.0)
+        cache = TokenCache(max_entries=10)
+        cache.put("t", {"sub": "1", "exp": 1060})
+
+        assert cache.get("t") == {"sub": "1", "exp": 1060}
+        monkeypatch.setattr(token_cache.time, "time", lambda: 1060.0)
+        assert cache.get("t") is None
+
+    def test_bounded_lru(self):
+        cache = TokenCache(max_entries=1)
+        cache.put("a", {"exp": 9e12})
+        cache.put("b", {"exp": 9e12})
+
+        assert cache.get("a") is None
+        assert cache.get("b") is not None
+
+    def test_repeat_verification_skips_decode(self, mocker):
+        token = AuthenticationService.generate_access_token(7)
+        decode = mocker.spy(auth_service.jwt, "decode")
+
+        assert AuthenticationService.get_user_from_token(token, "access") == 7
+        assert AuthenticationService.get_user_from_token(token, "access") == 7
+        assert decode.call_count == 1
+
+    def test_cached_token_still_type_checked(self):
+        token = AuthenticationService.generate_refresh_token(7)
+        AuthenticationService.verify_token(token, "refresh")
+
+        assert AuthenticationService.verify_token(token, "access") is None
+
+    def test_request_state_only_matches_same_token(self):
+        request = Request({"type": "http", "headers": []})
+        remember_verified_token(request, "token-a", 7)
+
+        assert verified_token_user(request, "token-a") == (True, 7)
+        assert verified_token_user(request, "token-b") == (False, None)
+
+
+@pytest.mark.integration
+@pytest.mark.userapp
+def test_request_verifies_token_once(client, make_test_user, mocker):
+    mocker.patch("app.auth.token_cache.settings.token_cache_max_entries", 0)
+    token_cache.get_token_cache.cache_clear()
+    token = AuthenticationService.generate_access_token(make_test_user.id)
+    decode = mocker.spy(auth_service.jwt, "decode")
+
+    response = client.get("api/files/", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert decode.call_count == 1
+    token_cache.get_token_cache.cache_clear()
@@ -0,0 +1,86 @@
+import pytest
+from fastapi import HTTPException, Request, status
+from unittest.mock import Mock
+
+from app.auth import user_cache
+from app.auth.dependencies import get_current_user, get_current_user_id
+from app.auth.service import AuthenticationService
+from app.auth.user_cache import AuthenticatedUser, UserCache, get_user_cache, load_user
+from app.userapp.entities import DocumentUser
+
+ALICE = AuthenticatedUser(id=1, name="alice", email="alice@example.com")
+
+
+def _request():
+    return Request({"type": "http", "headers": []})
+
+
+@pytest.mark.unit
+@pytest.mark.userapp
+class TestUserCache:
+    def test_entry_expires_after_ttl(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(user_cache.time, "monotonic", lambda: now[0])
+        cache = UserCache(ttl_seconds=60, max_entries=10)
+        cache.put(ALICE)
+
+        assert cache.get(1) == ALICE
+        now[0] += 61
+        assert cache.get(1) is None
+
+    def test_least_recently_used_dropped_beyond_max_entries(self):
+        cache = UserCache(ttl_seconds=60, max_entries=2)
+        for user_id in (1, 2):
+            cache.put(AuthenticatedUser(id=user_id, name="u", email=f"{user_id}@example.com"))
+        cache.get(1)
+        cache.put(AuthenticatedUser(id=3, name="u", email="3@example.com"))
+
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+
+    def test_zero_ttl_disables(self):
+        cache = UserCache(ttl_seconds=0, max_entries=10)
+        cache.put(ALICE)
+
+        assert cache.get(1) is None
+
+    def test_load_user_queries_once(self, mock_db_session):
+        mock_db_session.get = Mock(return_value=DocumentUser(id=1, name="alice", email="alice@example.com"))
+
+        assert load_user(mock_db_session, 1) == ALICE
+        assert load_user(mock_db_session, 1) == ALICE
+        mock_db_session.get.assert_called_once()
+
+    def test_claims_only_dependency_needs_no_database(self):
+        token = AuthenticationService.generate_access_token(42)
+
+        assert get_current_user_id(_request(), token) == 42
+
+    def test_claims_only_dependency_rejects_refresh_token(self):
+        token = AuthenticationService.generate_refresh_token(42)
+
+        with pytest.raises(HTTPException) as exc:
+            get_current_user_id(_request(), token)
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.integration
+@pytest.mark.userapp
+class TestUserCacheInvalidation:
+    def test_update_through_orm_invalidates(self, db_session, make_test_user):
+        assert get_current_user(make_test_user.id, db_session).name == "Test User"
+
+        user = db_session.get(DocumentUser, make_test_user.id)
+        user.name = "Renamed User"
+        db_session.commit()
+
+        assert get_user_cache().get(make_test_user.id) is None
+        assert get_current_user(make_test_user.id, db_session).name == "Renamed User"
+
+        user.name = "Test User"
+        db_session.commit()
+
+    def test_unknown_user_rejected(self, db_session):
+        with pytest.raises(HTTPException) as exc:
+            get_current_user(999999, db_session)
+        assert exc.value.status_code == status.HTTP_401_UNAUTHORIZED